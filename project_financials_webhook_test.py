@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Project financials rollup check for escrow webhooks
+
+Creates a fresh client project with two milestones, then posts escrow
+provider webhooks for them the way the mock escrow service does and checks
+that each one moves the project's project_financials rollup (as embedded in
+GET /api/projects/[id]):
+
+    new project          financials row present, all zero
+    payin.success x2     funded_amount = both milestones
+    payout.success       released_amount = first milestone
+    refund.success       refunded_amount = second milestone
+
+Webhooks are applied asynchronously by the inbox worker, so each check polls
+the project until the rollup matches or --timeout expires.
+
+Usage: python3 project_financials_webhook_test.py [--timeout SECONDS]
+       WORKBRIDGE_URL=http://localhost:3000 python3 project_financials_webhook_test.py
+"""
+
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, timezone
+
+import requests
+
+
+class ProjectFinancialsWebhookTester:
+    def __init__(self, base_url="http://localhost:3000", timeout=30):
+        self.base_url = base_url
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.failures = []
+
+    def call(self, name, method, endpoint, data=None, expected_status=200):
+        url = f"{self.base_url}{endpoint}"
+        response = self.session.request(method, url, json=data, headers={'Content-Type': 'application/json'})
+
+        if response.status_code != expected_status:
+            print(f"❌ {name}: expected {expected_status}, got {response.status_code} - {response.text[:200]}")
+            self.failures.append(name)
+            return None
+
+        return response
+
+    def webhook(self, event, data):
+        """Post one provider event, unique per call like the mock service's"""
+        timestamp = datetime.now(timezone.utc).isoformat()
+        return self.call(f"Webhook {event}", "POST", "/api/webhooks/escrow",
+                         {"event": event, "data": data, "timestamp": timestamp}, expected_status=202)
+
+    def financials(self, project_id):
+        response = self.call("Get project", "GET", f"/api/projects/{project_id}")
+        if response is None:
+            return None
+        return response.json()['project'].get('financials')
+
+    def expect_rollup(self, name, project_id, expected):
+        """Poll the project until every expected rollup field matches"""
+        deadline = time.time() + self.timeout
+        financials = None
+        while time.time() < deadline:
+            financials = self.financials(project_id)
+            if financials and all(float(financials.get(field) or 0) == value for field, value in expected.items()):
+                print(f"✅ {name}: {', '.join(f'{field}={value:g}' for field, value in expected.items())}")
+                return True
+            time.sleep(0.5)
+
+        print(f"❌ {name}: expected {expected}, rollup is {financials}")
+        self.failures.append(name)
+        return False
+
+    def run(self):
+        print("🚀 Project financials webhook check")
+        print(f"   Server: {self.base_url}")
+
+        timestamp = datetime.now().strftime('%Y%m%d%H%M%S%f')
+        email = f"financials_{timestamp}@workbridge.test"
+
+        if not self.call("Signup", "POST", "/api/signup", {"email": email, "password": "Financials123!"}):
+            return False
+        self.call("Update role", "POST", "/api/user/update-role", {"role": "client"})
+
+        response = self.call("Create project", "POST", "/api/projects", {
+            "title": f"Financials rollup {timestamp}",
+            "description": "Created by project_financials_webhook_test.py",
+            "budget": 2000,
+        })
+        if response is None:
+            return False
+        project_id = response.json()['project']['id']
+
+        financials = self.financials(project_id)
+        if financials is None:
+            print("❌ New project: no financials row")
+            self.failures.append("New project")
+        else:
+            print("✅ New project: financials row present")
+
+        escrows = []
+        for title, amount in (("Release milestone", 500), ("Refund milestone", 300)):
+            response = self.call(f"Create {title.lower()}", "POST", f"/api/projects/{project_id}/milestones", {
+                "title": title,
+                "description": "Financials rollup milestone",
+                "amount": amount,
+            })
+            if response is None:
+                return False
+
+        response = self.call("List milestones", "GET", f"/api/projects/{project_id}/milestones")
+        if response is None:
+            return False
+        for milestone in response.json()['milestones']:
+            escrows.append((milestone['escrows'][0]['external_escrow_id'], float(milestone['amount'])))
+        (release_escrow, release_amount), (refund_escrow, refund_amount) = escrows
+
+        now = datetime.now(timezone.utc).isoformat()
+        for escrow_id, amount in escrows:
+            self.webhook("payin.success", {"escrowId": escrow_id, "amount": amount, "fundedAt": now})
+        self.expect_rollup("Funded", project_id, {"funded_amount": release_amount + refund_amount})
+
+        self.webhook("payout.success", {
+            "escrowId": release_escrow,
+            "transactionId": f"payout_{timestamp}",
+            "freelancerAmount": release_amount * 0.95,
+            "platformFee": release_amount * 0.05,
+            "releasedAt": now,
+        })
+        self.expect_rollup("Released", project_id, {"released_amount": release_amount})
+
+        self.webhook("refund.success", {
+            "escrowId": refund_escrow,
+            "refundId": f"refund_{timestamp}",
+            "amount": refund_amount,
+            "refundedAt": now,
+        })
+        self.expect_rollup("Refunded", project_id, {"refunded_amount": refund_amount})
+
+        print(f"\n📊 {len(self.failures)} failure(s)")
+        return not self.failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check that escrow webhooks update project financials")
+    parser.add_argument('--timeout', type=float, default=30, help="seconds to wait for each rollup change (default 30)")
+    args = parser.parse_args()
+
+    tester = ProjectFinancialsWebhookTester(os.environ.get('WORKBRIDGE_URL', "http://localhost:3000"), args.timeout)
+    try:
+        success = tester.run()
+    except requests.exceptions.ConnectionError:
+        print(f"❌ Could not connect to {tester.base_url} - is the dev server running?")
+        success = False
+
+    sys.exit(0 if success else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Database round-trip budget check for the WorkBridge API
+
+Runs a fresh client through the main API flows against a dev server (which
+talks to the local stand-in database) and reads the round-trip report each
+budgeted route returns in its response headers:
+
+    X-Db-Round-Trips               database calls made by the request
+    X-Db-Waves                     how many sequential steps they took
+    X-Round-Trip-Budget            the route's declared budget
+    X-Round-Trip-Budget-Exceeded   1 when the request went over it
+    X-Round-Trip-Findings          repeated calls / back-to-back reads
+
+The report is on by default under `next dev` (set ROUND_TRIP_BUDGETS=on for
+`next start`). Exits non-zero when any route exceeds its budget, so it can
+gate a benchmark run.
+
+Usage: python3 round_trip_budget_test.py [--repeat N]
+       WORKBRIDGE_URL=http://localhost:3000 python3 round_trip_budget_test.py
+"""
+
+import argparse
+import os
+import sys
+from datetime import datetime
+
+import requests
+
+
+class RoundTripBudgetTester:
+    def __init__(self, base_url="http://localhost:3000", repeat=2):
+        self.base_url = base_url
+        self.repeat = repeat
+        self.session = requests.Session()
+        self.results = []
+        self.errors = []
+
+    def call(self, name, method, endpoint, data=None, expected_status=200):
+        """Make one request and record its round-trip report"""
+        url = f"{self.base_url}{endpoint}"
+        response = self.session.request(method, url, json=data, headers={'Content-Type': 'application/json'})
+
+        if response.status_code != expected_status:
+            print(f"❌ {name}: expected {expected_status}, got {response.status_code} - {response.text[:200]}")
+            self.errors.append(name)
+            return None
+
+        if 'X-Db-Round-Trips' not in response.headers:
+            print(f"❌ {name}: no round-trip report (is ROUND_TRIP_BUDGETS enabled on the server?)")
+            self.errors.append(name)
+            return response
+
+        result = {
+            'name': name,
+            'round_trips': int(response.headers['X-Db-Round-Trips']),
+            'waves': int(response.headers.get('X-Db-Waves', 0)),
+            'budget': response.headers.get('X-Round-Trip-Budget'),
+            'exceeded': response.headers.get('X-Round-Trip-Budget-Exceeded') == '1',
+            'findings': response.headers.get('X-Round-Trip-Findings'),
+        }
+        self.results.append(result)
+
+        status = "❌" if result['exceeded'] else "✅"
+        budget = result['budget'] or 'no budget'
+        print(f"{status} {name}: {result['round_trips']} calls in {result['waves']} wave(s) (budget {budget})")
+        if result['findings']:
+            print(f"   ⚠️  {result['findings']}")
+
+        return response
+
+    def measure(self, name, method, endpoint, data=None, expected_status=200):
+        """Repeat a read-only request; the first run may warm caches"""
+        response = None
+        for i in range(self.repeat):
+            response = self.call(f"{name} #{i + 1}", method, endpoint, data, expected_status)
+        return response
+
+    def run(self):
+        print("🚀 WorkBridge round-trip budget check")
+        print(f"   Server: {self.base_url}")
+
+        timestamp = datetime.now().strftime('%Y%m%d%H%M%S%f')
+        email = f"round_trip_{timestamp}@workbridge.test"
+
+        # Fresh client account
+        if not self.call("Signup", "POST", "/api/signup", {"email": email, "password": "RoundTrip123!"}):
+            return False
+        self.call("Update role", "POST", "/api/user/update-role", {"role": "client"})
+
+        self.measure("Current user", "GET", "/api/user/me")
+        self.measure("Dashboard bootstrap", "GET", "/api/dashboard/bootstrap")
+        self.measure("List projects", "GET", "/api/projects")
+
+        response = self.call("Create project", "POST", "/api/projects", {
+            "title": f"Round-trip budget {timestamp}",
+            "description": "Created by round_trip_budget_test.py",
+            "budget": 1500,
+        })
+        if response is not None and response.ok:
+            project_id = response.json()['project']['id']
+            self.measure("Get project", "GET", f"/api/projects/{project_id}")
+            self.call("Create milestone", "POST", f"/api/projects/{project_id}/milestones", {
+                "title": "First milestone",
+                "description": "Round-trip budget milestone",
+                "amount": 500,
+            })
+            self.measure("List milestones", "GET", f"/api/projects/{project_id}/milestones")
+
+        self.measure("List transactions", "GET", "/api/transactions")
+        self.measure("List disputes", "GET", "/api/disputes")
+
+        response = self.call("Start chat", "POST", "/api/chat/conversations")
+        if response is not None and response.ok:
+            conversation_id = response.json()['data']['id']
+            self.call("Send message", "POST", f"/api/chat/conversations/{conversation_id}/messages", {
+                "message": "Round-trip budget check",
+            })
+            self.measure("List messages", "GET", f"/api/chat/conversations/{conversation_id}/messages")
+        self.measure("List conversations", "GET", "/api/chat/conversations")
+
+        return self.report()
+
+    def report(self):
+        exceeded = [result for result in self.results if result['exceeded']]
+        flagged = [result for result in self.results if result['findings']]
+
+        print("\n📊 Summary")
+        print(f"   Requests checked: {len(self.results)}")
+        print(f"   Over budget: {len(exceeded)}")
+        print(f"   With findings: {len(flagged)}")
+        print(f"   Errors: {len(self.errors)}")
+
+        for result in exceeded:
+            print(f"   ❌ {result['name']}: {result['round_trips']} calls / {result['waves']} wave(s), budget {result['budget']}")
+
+        return not exceeded and not self.errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check API routes against their database round-trip budgets")
+    parser.add_argument('--repeat', type=int, default=2, help="runs per read-only request (default 2)")
+    args = parser.parse_args()
+
+    tester = RoundTripBudgetTester(os.environ.get('WORKBRIDGE_URL', "http://localhost:3000"), args.repeat)
+    try:
+        success = tester.run()
+    except requests.exceptions.ConnectionError:
+        print(f"❌ Could not connect to {tester.base_url} - is the dev server running?")
+        success = False
+
+    sys.exit(0 if success else 1)
+
+
+if __name__ == "__main__":
+    main()
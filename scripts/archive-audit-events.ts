@@ -0,0 +1,64 @@
+// Archive cold audit_events partitions
+//
+// Exports every monthly partition older than the retention window to
+// gzipped NDJSON, verifies the row count, then drops the partition. Daily
+// event counts (audit_event_daily_counts) are kept.
+//
+//   npm run audit:archive -- --retention-months 13 --dir ./audit-archive
+//   npm run audit:archive -- --dry-run      # list what would be archived
+//   npm run audit:archive -- --keep         # export without dropping
+//
+// Upload the resulting files to cold storage before deleting them locally.
+import { config } from "dotenv";
+config({ path: ".env.local" });
+
+function flag(name: string): boolean {
+  return process.argv.includes(`--${name}`);
+}
+
+function option(name: string, fallback: string): string {
+  const index = process.argv.indexOf(`--${name}`);
+  return index === -1 ? fallback : process.argv[index + 1];
+}
+
+const retentionMonths = Number(option("retention-months", process.env.AUDIT_RETENTION_MONTHS || "13"));
+const dir = option("dir", process.env.AUDIT_ARCHIVE_DIR || "audit-archive");
+const dryRun = flag("dry-run");
+const keep = flag("keep");
+
+async function main() {
+  // Imported after dotenv so the shared client sees .env.local
+  const { archiveAuditPartition, dropAuditPartition, listColdAuditPartitions } = await import(
+    "../src/lib/audit-partitions"
+  );
+
+  const partitions = await listColdAuditPartitions(retentionMonths);
+  if (partitions.length === 0) {
+    console.log(`No audit partitions older than ${retentionMonths} months`);
+    return;
+  }
+
+  for (const partition of partitions) {
+    if (dryRun) {
+      console.log(`Would archive ${partition.partition_name} (${partition.range_start} - ${partition.range_end})`);
+      continue;
+    }
+
+    const started = Date.now();
+    const archive = await archiveAuditPartition(partition, dir);
+    console.log(
+      `Archived ${archive.rows} events from ${archive.partition} to ${archive.file} ` +
+        `(${(archive.bytes / 1024 / 1024).toFixed(1)} MB, ${((Date.now() - started) / 1000).toFixed(1)}s)`
+    );
+
+    if (!keep) {
+      await dropAuditPartition(partition.partition_name);
+      console.log(`Dropped ${partition.partition_name}`);
+    }
+  }
+}
+
+main().catch(error => {
+  console.error(error);
+  process.exit(1);
+});
@@ -0,0 +1,99 @@
+// Local load test for KYC document processing
+//
+// Generates synthetic Aadhaar-sized scans into the filesystem storage stand-in
+// and runs them through processKycDocument with bounded concurrency, reporting
+// throughput, latency percentiles, peak RSS and preview size vs. original.
+//
+//   npm run kyc:bench -- --documents 200 --concurrency 4
+//
+// Set KYC_STORAGE_DIR to choose where files are written (default .kyc-storage).
+import { config } from "dotenv";
+config({ path: ".env.local" });
+
+// Processing never touches the database, but the shared client is created on
+// import, so the app modules are imported dynamically after this
+process.env.NEXT_PUBLIC_SUPABASE_URL ||= "http://localhost:54321";
+process.env.SUPABASE_SERVICE_ROLE_KEY ||= "bench";
+process.env.KYC_STORAGE = "filesystem";
+
+function arg(name: string, fallback: number): number {
+  const index = process.argv.indexOf(`--${name}`);
+  return index === -1 ? fallback : Number(process.argv[index + 1]);
+}
+
+const documents = arg("documents", 100);
+const concurrency = arg("concurrency", 2);
+const width = arg("width", 3000);
+const height = arg("height", 2000);
+
+function percentile(sorted: number[], p: number): number {
+  return sorted[Math.min(sorted.length - 1, Math.floor((p / 100) * sorted.length))];
+}
+
+async function main() {
+  const { default: sharp } = await import("sharp");
+  const { settleWithConcurrency } = await import("../src/lib/concurrency");
+  const { getKycStorage } = await import("../src/lib/kyc-storage");
+  const { processKycDocument } = await import("../src/lib/kyc-processing");
+  const storage = getKycStorage();
+
+  // A noisy photo-like scan compresses about as badly as a real phone capture
+  console.log(`Generating ${documents} documents (${width}x${height})...`);
+  const noise = Buffer.alloc(width * height * 3);
+  for (let i = 0; i < noise.length; i++) noise[i] = (Math.random() * 64 + (i % 3) * 60) | 0;
+  const original = await sharp(noise, { raw: { width, height, channels: 3 } }).jpeg({ quality: 92 }).toBuffer();
+
+  const paths: string[] = [];
+  for (let i = 0; i < documents; i++) {
+    const documentPath = `kyc/bench/${i}-aadhaar.jpg`;
+    await storage.put(documentPath, original, "image/jpeg");
+    paths.push(documentPath);
+  }
+
+  let peakRss = process.memoryUsage().rss;
+  const sampler = setInterval(() => {
+    peakRss = Math.max(peakRss, process.memoryUsage().rss);
+  }, 50);
+
+  const latencies: number[] = [];
+  const started = Date.now();
+
+  const results = await settleWithConcurrency(paths, concurrency, async (documentPath, index) => {
+    const t0 = performance.now();
+    const result = await processKycDocument(storage, documentPath, `bench/${index}`);
+    latencies.push(performance.now() - t0);
+    return result;
+  });
+
+  clearInterval(sampler);
+  const elapsed = (Date.now() - started) / 1000;
+  const failed = results.filter(result => result.status === "rejected");
+  const sorted = latencies.sort((a, b) => a - b);
+
+  const sample = results.find(result => result.status === "fulfilled");
+  let previewBytes = 0;
+  let thumbnailBytes = 0;
+  if (sample?.status === "fulfilled" && sample.value.previewPath && sample.value.thumbnailPath) {
+    const fs = await import("fs");
+    const path = await import("path");
+    const root = process.env.KYC_STORAGE_DIR || ".kyc-storage";
+    previewBytes = fs.statSync(path.join(root, sample.value.previewPath)).size;
+    thumbnailBytes = fs.statSync(path.join(root, sample.value.thumbnailPath)).size;
+  }
+
+  console.log(`Processed ${documents - failed.length}/${documents} documents in ${elapsed.toFixed(1)}s`);
+  console.log(`Throughput: ${((documents - failed.length) / elapsed).toFixed(1)} documents/s at concurrency ${concurrency}`);
+  console.log(`Latency: p50 ${percentile(sorted, 50).toFixed(0)}ms, p95 ${percentile(sorted, 95).toFixed(0)}ms, max ${sorted[sorted.length - 1].toFixed(0)}ms`);
+  console.log(`Peak RSS: ${(peakRss / 1024 / 1024).toFixed(0)}MB`);
+  console.log(`Original ${(original.length / 1024).toFixed(0)}KB -> preview ${(previewBytes / 1024).toFixed(0)}KB, thumbnail ${(thumbnailBytes / 1024).toFixed(0)}KB`);
+
+  if (failed.length > 0) {
+    console.error(`${failed.length} documents failed, first error:`, (failed[0] as PromiseRejectedResult).reason);
+    process.exit(1);
+  }
+}
+
+main().catch(error => {
+  console.error(error);
+  process.exit(1);
+});
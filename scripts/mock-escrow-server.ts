@@ -0,0 +1,78 @@
+// Standalone mock escrow provider for local load tests
+//
+// Runs the MockEscrowProvider as its own process so escrow state, scheduled
+// events and webhook delivery are independent of the Next.js server. Point the
+// app at it with MOCK_ESCROW_URL=http://localhost:4010.
+//
+//   npm run escrow:mock
+//
+// Tuning (see loadMockEscrowConfig in src/lib/mock-escrow.ts):
+//   MOCK_ESCROW_PAYIN_LATENCY=lognormal:1500,0.6  MOCK_ESCROW_PAYIN_FAILURE_RATE=0.02
+//   MOCK_ESCROW_WEBHOOK_BATCH_SIZE=200            MOCK_ESCROW_STATE_FILE=.mock-escrow/load.ndjson
+import { config } from "dotenv";
+config({ path: ".env.local" }); // load env BEFORE creating the provider
+
+import http from "http";
+import { MockEscrowProvider, loadMockEscrowConfig } from "../src/lib/mock-escrow";
+
+const port = Number(process.env.MOCK_ESCROW_PORT || 4010);
+const provider = new MockEscrowProvider(loadMockEscrowConfig());
+
+async function readBody(req: http.IncomingMessage): Promise<Record<string, unknown>> {
+  const chunks: Buffer[] = [];
+  for await (const chunk of req) chunks.push(chunk as Buffer);
+  if (chunks.length === 0) return {};
+  return JSON.parse(Buffer.concat(chunks).toString("utf8"));
+}
+
+function send(res: http.ServerResponse, status: number, body: unknown) {
+  res.writeHead(status, { "Content-Type": "application/json" });
+  res.end(JSON.stringify(body));
+}
+
+const server = http.createServer(async (req, res) => {
+  try {
+    const url = new URL(req.url || "/", `http://localhost:${port}`);
+    const [, resource, escrowId, action] = url.pathname.split("/");
+
+    if (req.method === "GET" && resource === "stats") {
+      return send(res, 200, provider.getStats());
+    }
+
+    if (resource !== "escrows") {
+      return send(res, 404, { error: "Not found" });
+    }
+
+    const body = req.method === "POST" ? await readBody(req) : {};
+
+    if (req.method === "POST" && !escrowId) {
+      return send(res, 200, await provider.createEscrow(Number(body.amount), (body.metadata as Record<string, unknown>) || {}));
+    }
+
+    if (req.method === "GET" && escrowId && !action) {
+      return send(res, 200, await provider.getEscrowStatus(escrowId));
+    }
+
+    if (req.method === "POST" && escrowId) {
+      switch (action) {
+        case "payin":
+          return send(res, 200, await provider.initiatePayIn(escrowId));
+        case "release":
+          return send(res, 200, await provider.releaseFunds(escrowId, body.amount as number | undefined));
+        case "refund":
+          return send(res, 200, await provider.initiateRefund(escrowId, body.amount as number | undefined, body.reason as string | undefined));
+        case "fail":
+          await provider.simulatePaymentFailure(escrowId, body.reason as string | undefined);
+          return send(res, 200, { success: true });
+      }
+    }
+
+    send(res, 404, { error: "Not found" });
+  } catch (error) {
+    send(res, 400, { error: error instanceof Error ? error.message : "Request failed" });
+  }
+});
+
+server.listen(port, () => {
+  console.log(`🏦 Mock escrow provider listening on http://localhost:${port}`);
+});
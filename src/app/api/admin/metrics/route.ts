@@ -0,0 +1,51 @@
+import { NextRequest, NextResponse } from 'next/server';
+import { getCurrentUser } from '@/lib/auth';
+import { auditWriter } from '@/lib/audit-log';
+import { passwordHasher } from '@/lib/password-hashing';
+import { formatTimingHistograms, getTimingHistograms } from '@/lib/request-timing';
+
+// GET /api/admin/metrics - Call latency histograms for this server process (admins only)
+// Query: format=prometheus for the text exposition format
+export async function GET(request: NextRequest) {
+  try {
+    const user = await getCurrentUser(request);
+    if (!user) {
+      return NextResponse.json(
+        { success: false, error: 'Authentication required' },
+        { status: 401 }
+      );
+    }
+
+    if (user.role !== 'admin') {
+      return NextResponse.json(
+        { success: false, error: 'Admin access required' },
+        { status: 403 }
+      );
+    }
+
+    const { searchParams } = new URL(request.url);
+
+    if (searchParams.get('format') === 'prometheus') {
+      return new NextResponse(formatTimingHistograms(), {
+        headers: { 'Content-Type': 'text/plain; version=0.0.4; charset=utf-8' },
+      });
+    }
+
+    return NextResponse.json({
+      success: true,
+      data: {
+        pid: process.pid,
+        uptimeSeconds: Math.round(process.uptime()),
+        calls: getTimingHistograms(),
+        passwordHasher: passwordHasher.getStats(),
+        auditWriter: auditWriter.getStats(),
+      },
+    });
+  } catch (error) {
+    console.error('Error in admin metrics API:', error);
+    return NextResponse.json(
+      { success: false, error: 'Internal server error' },
+      { status: 500 }
+    );
+  }
+}
@@ -1,23 +1,22 @@
 import { NextRequest, NextResponse } from 'next/server';
 import { supabase } from '@/app/lib/supabase';
-import { verifyToken } from '@/lib/auth';
+import { getCurrentUser } from '@/lib/auth';
+import { withServerTiming } from '@/lib/request-timing';
 
-export async function PATCH(
+export const PATCH = withServerTiming(async function PATCH(
   request: NextRequest,
   { params }: { params: Promise<{ id: string }> }
 ) {
   try {
-    const token = request.cookies.get('auth-token')?.value;
-    
-    if (!token) {
+    const user = await getCurrentUser(request);
+    if (!user) {
       return NextResponse.json(
         { success: false, error: 'Authentication required' },
         { status: 401 }
       );
     }
 
-    const user = await verifyToken(token);
-    if (!user || user.role !== 'admin') {
+    if (user.role !== 'admin') {
       return NextResponse.json(
         { success: false, error: 'Admin access required' },
         { status: 403 }
@@ -70,4 +69,4 @@ export async function PATCH(
       { status: 500 }
     );
   }
-}
\ No newline at end of file
+});
\ No newline at end of file
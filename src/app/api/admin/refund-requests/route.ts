@@ -1,46 +1,116 @@
 import { NextRequest, NextResponse } from 'next/server';
 import { supabase } from '@/app/lib/supabase';
-import { verifyToken } from '@/lib/auth';
+import { getCurrentUser } from '@/lib/auth';
+import { decodeCursor, nextCursor } from '@/lib/cursor';
+import { withServerTiming } from '@/lib/request-timing';
 
-export async function GET(request: NextRequest) {
+const REFUND_STATUSES = ['pending', 'approved', 'rejected'];
+const MAX_PAGE_SIZE = 200;
+
+// GET /api/admin/refund-requests - Paginated refund queue (admins only)
+// Query: status, from, to (created_at range), limit, cursor
+export const GET = withServerTiming(async function GET(request: NextRequest) {
   try {
-    const token = request.cookies.get('auth-token')?.value;
-    
-    if (!token) {
+    const user = await getCurrentUser(request);
+    if (!user) {
       return NextResponse.json(
         { success: false, error: 'Authentication required' },
         { status: 401 }
       );
     }
 
-    const user = await verifyToken(token);
-    if (!user || user.role !== 'admin') {
+    if (user.role !== 'admin') {
       return NextResponse.json(
         { success: false, error: 'Admin access required' },
         { status: 403 }
       );
     }
 
-    // Get all refund requests with user and project details
-    const { data: refundRequests, error } = await supabase
+    const { searchParams } = new URL(request.url);
+    const status = searchParams.get('status');
+    const from = searchParams.get('from');
+    const to = searchParams.get('to');
+    const limit = Math.min(Math.max(parseInt(searchParams.get('limit') || '50') || 50, 1), MAX_PAGE_SIZE);
+    const cursorParam = searchParams.get('cursor');
+    const cursor = decodeCursor(cursorParam);
+
+    if (status && !REFUND_STATUSES.includes(status)) {
+      return NextResponse.json(
+        { success: false, error: `Invalid status, expected one of: ${REFUND_STATUSES.join(', ')}` },
+        { status: 400 }
+      );
+    }
+
+    if ((from && isNaN(Date.parse(from))) || (to && isNaN(Date.parse(to)))) {
+      return NextResponse.json(
+        { success: false, error: 'from and to must be ISO dates' },
+        { status: 400 }
+      );
+    }
+
+    if (cursorParam && !cursor) {
+      return NextResponse.json(
+        { success: false, error: 'Invalid cursor' },
+        { status: 400 }
+      );
+    }
+
+    // One page of refund requests with user details, newest first
+    let query = supabase
       .from('refund_requests')
       .select(`
         *,
         users!refund_requests_user_id_fkey(email, role)
       `)
-      .order('created_at', { ascending: false });
+      .order('created_at', { ascending: false })
+      .order('id', { ascending: false })
+      .limit(limit);
 
-    if (error) {
-      console.error('Error fetching refund requests:', error);
+    if (status) {
+      query = query.eq('status', status);
+    }
+    if (from) {
+      query = query.gte('created_at', from);
+    }
+    if (to) {
+      query = query.lt('created_at', to);
+    }
+    if (cursor) {
+      // The bound on created_at alone is what the index range scan can use;
+      // the OR then only breaks ties within the cursor's timestamp
+      query = query.lte('created_at', cursor.created_at).or(
+        `created_at.lt."${cursor.created_at}",and(created_at.eq."${cursor.created_at}",id.lt.${cursor.id})`
+      );
+    }
+
+    // Count-by-status summary for the same date range, fetched alongside the page
+    const [pageResult, summaryResult] = await Promise.all([
+      query,
+      supabase.rpc('count_refund_requests_by_status', {
+        p_from: from,
+        p_to: to,
+      }),
+    ]);
+
+    if (pageResult.error || summaryResult.error) {
+      console.error('Error fetching refund requests:', pageResult.error || summaryResult.error);
       return NextResponse.json(
         { success: false, error: 'Failed to fetch refund requests' },
         { status: 500 }
       );
     }
 
+    const refundRequests = pageResult.data || [];
+    const summary: Record<string, number> = Object.fromEntries(REFUND_STATUSES.map(s => [s, 0]));
+    for (const row of (summaryResult.data || []) as { status: string; count: number }[]) {
+      summary[row.status] = Number(row.count);
+    }
+
     return NextResponse.json({
       success: true,
-      data: refundRequests || [],
+      data: refundRequests,
+      summary,
+      next_cursor: nextCursor(refundRequests, limit),
     });
   } catch (error) {
     console.error('Error in admin refund requests API:', error);
@@ -49,4 +119,4 @@ export async function GET(request: NextRequest) {
       { status: 500 }
     );
   }
-}
\ No newline at end of file
+});
\ No newline at end of file
@@ -0,0 +1,110 @@
+import { NextRequest, NextResponse } from "next/server";
+import { getCurrentUser } from "@/lib/auth";
+import { supabase } from "@/app/lib/supabase";
+import { keysetAfterFilter, walkKeyset } from "@/lib/cursor";
+import { exportResponse, parseExportFormat, type ExportColumn } from "@/lib/export-stream";
+import { withServerTiming } from "@/lib/request-timing";
+
+interface AuditExportRow {
+  id: string;
+  created_at: string;
+  event_type: string;
+  user_id: string | null;
+  project_id: string | null;
+  milestone_id: string | null;
+  escrow_id: string | null;
+  dispute_id: string | null;
+  data: Record<string, unknown>;
+  ip_address: string | null;
+  user: { email: string } | null;
+}
+
+const COLUMNS: ExportColumn<AuditExportRow>[] = [
+  { header: 'id', value: row => row.id },
+  { header: 'created_at', value: row => row.created_at },
+  { header: 'event_type', value: row => row.event_type },
+  { header: 'user_id', value: row => row.user_id },
+  { header: 'user_email', value: row => row.user?.email },
+  { header: 'project_id', value: row => row.project_id },
+  { header: 'milestone_id', value: row => row.milestone_id },
+  { header: 'escrow_id', value: row => row.escrow_id },
+  { header: 'dispute_id', value: row => row.dispute_id },
+  { header: 'ip_address', value: row => row.ip_address },
+  { header: 'data', value: row => row.data },
+];
+
+// GET /api/audit/export - Stream audit events as CSV or NDJSON, oldest first
+// Query: format (csv|ndjson), from, to (created_at range), event_type, project_id, user_id (admins)
+export const GET = withServerTiming(async function GET(req: NextRequest) {
+  try {
+    const user = await getCurrentUser(req);
+    if (!user) {
+      return NextResponse.json({ error: "Not authenticated" }, { status: 401 });
+    }
+
+    const { searchParams } = new URL(req.url);
+    const format = parseExportFormat(searchParams.get('format'));
+    const from = searchParams.get('from');
+    const to = searchParams.get('to');
+    const event_type = searchParams.get('event_type');
+    const project_id = searchParams.get('project_id');
+    const user_id = searchParams.get('user_id');
+
+    if (!format) {
+      return NextResponse.json({ error: "format must be csv or ndjson" }, { status: 400 });
+    }
+
+    if ((from && isNaN(Date.parse(from))) || (to && isNaN(Date.parse(to)))) {
+      return NextResponse.json({ error: "from and to must be ISO dates" }, { status: 400 });
+    }
+
+    if (project_id && user.role !== 'admin') {
+      const { data: project } = await supabase
+        .from('projects')
+        .select('client_id, freelancer_id')
+        .eq('id', project_id)
+        .maybeSingle();
+
+      if (project && project.client_id !== user.userId && project.freelancer_id !== user.userId) {
+        return NextResponse.json({ error: "Access denied to project audit logs" }, { status: 403 });
+      }
+    }
+
+    // Non-admins can only export events they're involved in
+    const actorId = user.role === 'admin' ? user_id : user.userId;
+
+    // A from/to range lets the planner prune to the months it covers
+    const pages = walkKeyset<AuditExportRow>((after, limit) => {
+      let query = supabase
+        .from('audit_events')
+        .select(`
+          id, created_at, event_type, user_id, project_id, milestone_id, escrow_id, dispute_id,
+          data, ip_address,
+          user:users(email)
+        `)
+        .order('created_at', { ascending: true })
+        .order('id', { ascending: true })
+        .limit(limit);
+
+      if (actorId) query = query.eq('user_id', actorId);
+      if (event_type) query = query.eq('event_type', event_type);
+      if (project_id) query = query.eq('project_id', project_id);
+      if (from) query = query.gte('created_at', from);
+      if (to) query = query.lt('created_at', to);
+      if (after) query = query.gte('created_at', after.created_at).or(keysetAfterFilter(after));
+
+      return query;
+    });
+
+    return exportResponse({
+      format,
+      filename: `audit-events-${new Date().toISOString().slice(0, 10)}`,
+      columns: COLUMNS,
+      pages,
+    });
+
+  } catch (error) {
+    console.error('Audit export API error:', error);
+    return NextResponse.json({ error: "Internal server error" }, { status: 500 });
+  }
+});
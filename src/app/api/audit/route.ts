@@ -1,9 +1,10 @@
 import { NextRequest, NextResponse } from "next/server";
 import { getCurrentUser } from "@/lib/auth";
 import { supabase } from "@/app/lib/supabase";
+import { withServerTiming } from "@/lib/request-timing";
 
 // GET /api/audit - List audit events (admins only, or user's own events)
-export async function GET(req: NextRequest) {
+export const GET = withServerTiming(async function GET(req: NextRequest) {
   try {
     const user = await getCurrentUser();
     if (!user) {
@@ -74,19 +75,23 @@ export async function GET(req: NextRequest) {
       return NextResponse.json({ error: "Failed to fetch audit events" }, { status: 500 });
     }
 
-    // Get event type summary for admins
+    // Get event type summary for admins, from the daily rollup
     let eventSummary: Record<string, number> | null = null;
     if (user.role === 'admin') {
-      const { data: summaryData } = await supabase
-        .from('audit_events')
-        .select('event_type')
-        .gte('created_at', new Date(Date.now() - 30 * 24 * 60 * 60 * 1000).toISOString()); // Last 30 days
+      const { data: summaryData, error: summaryError } = await supabase.rpc('audit_event_summary', {
+        p_since: new Date(Date.now() - 30 * 24 * 60 * 60 * 1000).toISOString(), // Last 30 days
+      });
 
-      if (summaryData) {
-        eventSummary = summaryData.reduce((acc: Record<string, number>, event) => {
-          acc[event.event_type] = (acc[event.event_type] || 0) + 1;
-          return acc;
-        }, {});
+      if (summaryError) {
+        console.error('Audit summary fetch error:', summaryError);
+      } else if (summaryData) {
+        eventSummary = (summaryData as { event_type: string; count: number }[]).reduce(
+          (acc: Record<string, number>, row) => {
+            acc[row.event_type] = Number(row.count);
+            return acc;
+          },
+          {}
+        );
       }
     }
 
@@ -104,4 +109,4 @@ export async function GET(req: NextRequest) {
     console.error('Audit API error:', error);
     return NextResponse.json({ error: "Internal server error" }, { status: 500 });
   }
-}
\ No newline at end of file
+});
\ No newline at end of file
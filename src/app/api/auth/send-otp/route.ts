@@ -2,8 +2,9 @@ import { NextRequest, NextResponse } from 'next/server';
 import { sendOTPEmail } from '@/lib/resend-client';
 import { otpManager } from '@/lib/otp-manager';
 import { supabase } from '@/app/lib/supabase';
+import { withServerTiming } from '@/lib/request-timing';
 
-export async function POST(request: NextRequest) {
+export const POST = withServerTiming(async function POST(request: NextRequest) {
   try {
     const { email } = await request.json();
 
@@ -80,4 +81,4 @@ export async function POST(request: NextRequest) {
       { status: 500 }
     );
   }
-}
\ No newline at end of file
+});
\ No newline at end of file
@@ -1,11 +1,11 @@
 import { NextRequest, NextResponse } from 'next/server';
 import { otpManager } from '@/lib/otp-manager';
 import { supabase } from '@/app/lib/supabase';
-import { SignJWT } from 'jose';
+import { createSessionToken, setSessionCookie } from '@/lib/session';
+import { invalidateUserProfile } from '@/lib/user-profile-cache';
+import { withServerTiming } from '@/lib/request-timing';
 
-const jwtSecret = new TextEncoder().encode(process.env.JWT_SECRET || 'your-secret-key');
-
-export async function POST(request: NextRequest) {
+export const POST = withServerTiming(async function POST(request: NextRequest) {
   try {
     const { email, otp, role, isLogin } = await request.json();
 
@@ -118,16 +118,15 @@ export async function POST(request: NextRequest) {
       );
     }
 
+    // Role and email verification may have changed above
+    invalidateUserProfile(user.id);
+
     // Generate JWT token
-    const token = await new SignJWT({ 
+    const token = await createSessionToken({ 
       userId: user.id, 
       email: user.email, 
       role: user.role 
-    })
-      .setProtectedHeader({ alg: 'HS256' })
-      .setExpirationTime('7d')
-      .setIssuedAt()
-      .sign(jwtSecret);
+    });
 
     // Create response with httpOnly cookie
     const response = NextResponse.json({
@@ -146,12 +145,7 @@ export async function POST(request: NextRequest) {
     });
 
     // Set httpOnly cookie
-    response.cookies.set('auth-token', token, {
-      httpOnly: true,
-      secure: process.env.NODE_ENV === 'production',
-      sameSite: 'lax',
-      maxAge: 7 * 24 * 60 * 60, // 7 days
-    });
+    setSessionCookie(response, token);
 
     return response;
   } catch (error) {
@@ -161,4 +155,4 @@ export async function POST(request: NextRequest) {
       { status: 500 }
     );
   }
-}
\ No newline at end of file
+});
\ No newline at end of file
@@ -1,23 +1,15 @@
 import { NextRequest, NextResponse } from 'next/server';
 import { supabase } from '@/app/lib/supabase';
-import { verifyToken } from '@/lib/auth';
+import { getCurrentUser } from '@/lib/auth';
+import { withServerTiming } from '@/lib/request-timing';
 
 // Close a chat conversation
-export async function PATCH(
+export const PATCH = withServerTiming(async function PATCH(
   request: NextRequest,
   context: { params: Promise<{ id: string }> }
 ) {
   try {
-    const token = request.cookies.get('auth-token')?.value;
-    
-    if (!token) {
-      return NextResponse.json(
-        { success: false, error: 'Authentication required' },
-        { status: 401 }
-      );
-    }
-
-    const user = await verifyToken(token);
+    const user = await getCurrentUser(request);
     if (!user || !['support', 'admin'].includes(user.role)) {
       return NextResponse.json(
         { success: false, error: 'Access denied. Support agents only.' },
@@ -140,24 +132,15 @@ export async function PATCH(
       { status: 500 }
     );
   }
-}
+});
 
 // Reopen a closed conversation (admin only)
-export async function POST(
+export const POST = withServerTiming(async function POST(
   request: NextRequest,
   context: { params: Promise<{ id: string }> }
 ) {
   try {
-    const token = request.cookies.get('auth-token')?.value;
-    
-    if (!token) {
-      return NextResponse.json(
-        { success: false, error: 'Authentication required' },
-        { status: 401 }
-      );
-    }
-
-    const user = await verifyToken(token);
+    const user = await getCurrentUser(request);
     if (!user || user.role !== 'admin') {
       return NextResponse.json(
         { success: false, error: 'Access denied. Admin access required.' },
@@ -218,4 +201,4 @@ export async function POST(
       { status: 500 }
     );
   }
-}
\ No newline at end of file
+});
\ No newline at end of file
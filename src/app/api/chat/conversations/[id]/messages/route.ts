@@ -1,26 +1,18 @@
 import { NextRequest, NextResponse } from 'next/server';
 import { supabase } from '@/app/lib/supabase';
-import { verifyToken } from '@/lib/auth';
+import { getCurrentUser } from '@/lib/auth';
+import { withServerTiming } from '@/lib/request-timing';
 
 // Send message to conversation
-export async function POST(
+export const POST = withServerTiming(async function POST(
   request: NextRequest,
   { params }: { params: Promise<{ id: string }> }
 ) {
   try {
-    const token = request.cookies.get('auth-token')?.value;
-    
-    if (!token) {
-      return NextResponse.json(
-        { success: false, error: 'Authentication required' },
-        { status: 401 }
-      );
-    }
-
-    const user = await verifyToken(token);
+    const user = await getCurrentUser(request);
     if (!user) {
       return NextResponse.json(
-        { success: false, error: 'Invalid token' },
+        { success: false, error: 'Authentication required' },
         { status: 401 }
       );
     }
@@ -99,11 +91,8 @@ export async function POST(
       );
     }
 
-    // Update conversation updated_at
-    await supabase
-      .from('chat_conversations')
-      .update({ updated_at: new Date().toISOString() })
-      .eq('id', conversationId);
+    // The conversation's updated_at is bumped by a trigger on chat_messages
+    // (at most once a minute, see migration 019)
 
     return NextResponse.json({
       success: true,
@@ -117,27 +106,18 @@ export async function POST(
       { status: 500 }
     );
   }
-}
+});
 
 // Get messages for conversation
-export async function GET(
+export const GET = withServerTiming(async function GET(
   request: NextRequest,
   { params }: { params: Promise<{ id: string }> }
 ) {
   try {
-    const token = request.cookies.get('auth-token')?.value;
-    
-    if (!token) {
-      return NextResponse.json(
-        { success: false, error: 'Authentication required' },
-        { status: 401 }
-      );
-    }
-
-    const user = await verifyToken(token);
+    const user = await getCurrentUser(request);
     if (!user) {
       return NextResponse.json(
-        { success: false, error: 'Invalid token' },
+        { success: false, error: 'Authentication required' },
         { status: 401 }
       );
     }
@@ -210,4 +190,4 @@ export async function GET(
       { status: 500 }
     );
   }
-}
\ No newline at end of file
+});
\ No newline at end of file
@@ -1,23 +1,15 @@
 import { NextRequest, NextResponse } from 'next/server';
 import { supabase } from '@/app/lib/supabase';
-import { verifyToken } from '@/lib/auth';
+import { getCurrentUser } from '@/lib/auth';
+import { withServerTiming } from '@/lib/request-timing';
 
 // Create new conversation or get existing active conversation
-export async function POST(request: NextRequest) {
+export const POST = withServerTiming(async function POST(request: NextRequest) {
   try {
-    const token = request.cookies.get('auth-token')?.value;
-    
-    if (!token) {
-      return NextResponse.json(
-        { success: false, error: 'Authentication required' },
-        { status: 401 }
-      );
-    }
-
-    const user = await verifyToken(token);
+    const user = await getCurrentUser(request);
     if (!user) {
       return NextResponse.json(
-        { success: false, error: 'Invalid token' },
+        { success: false, error: 'Authentication required' },
         { status: 401 }
       );
     }
@@ -88,24 +80,15 @@ export async function POST(request: NextRequest) {
       { status: 500 }
     );
   }
-}
+});
 
 // Get user's conversations (for support agents or conversation history)
-export async function GET(request: NextRequest) {
+export const GET = withServerTiming(async function GET(request: NextRequest) {
   try {
-    const token = request.cookies.get('auth-token')?.value;
-    
-    if (!token) {
-      return NextResponse.json(
-        { success: false, error: 'Authentication required' },
-        { status: 401 }
-      );
-    }
-
-    const user = await verifyToken(token);
+    const user = await getCurrentUser(request);
     if (!user) {
       return NextResponse.json(
-        { success: false, error: 'Invalid token' },
+        { success: false, error: 'Authentication required' },
         { status: 401 }
       );
     }
@@ -149,4 +132,4 @@ export async function GET(request: NextRequest) {
       { status: 500 }
     );
   }
-}
\ No newline at end of file
+});
\ No newline at end of file
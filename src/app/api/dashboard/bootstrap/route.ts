@@ -0,0 +1,32 @@
+import { NextRequest, NextResponse } from "next/server";
+import { getCurrentUserWithFreshData } from "@/lib/auth";
+import { withServerTiming } from "@/lib/request-timing";
+
+// GET /api/dashboard/bootstrap - What a dashboard renders on first paint, in one round-trip
+// The dashboards only read the signed-in user's profile here, served from the
+// shared profile cache; their project, transaction and application panels are
+// still populated from demo data. Add sections to this payload as the pages
+// start rendering them, fetched concurrently so first paint stays a single request.
+export const GET = withServerTiming(async function GET(req: NextRequest) {
+  try {
+    const user = await getCurrentUserWithFreshData(req);
+    if (!user) {
+      return NextResponse.json({ error: "Not authenticated" }, { status: 401 });
+    }
+
+    return NextResponse.json({
+      user: {
+        userId: user.userId,
+        email: user.email,
+        role: user.role,
+        kyc_status: user.kyc_status ?? null,
+        email_verified: user.email_verified ?? null,
+        skills: user.skills ?? [],
+      },
+    });
+
+  } catch (error) {
+    console.error('Dashboard bootstrap API error:', error);
+    return NextResponse.json({ error: "Internal server error" }, { status: 500 });
+  }
+});
@@ -1,7 +1,8 @@
 import { NextResponse } from "next/server";
 import { getCurrentUser } from "@/lib/auth";
+import { withServerTiming } from "@/lib/request-timing";
 
-export async function GET() {
+export const GET = withServerTiming(async function GET() {
   try {
     console.log("Debug auth endpoint called");
     
@@ -20,4 +21,4 @@ export async function GET() {
       timestamp: new Date().toISOString()
     }, { status: 500 });
   }
-}
\ No newline at end of file
+});
\ No newline at end of file
@@ -1,10 +1,12 @@
 import { NextRequest, NextResponse } from "next/server";
 import { getCurrentUser } from "@/lib/auth";
 import { supabase } from "@/app/lib/supabase";
-import { escrowService } from "@/lib/mock-escrow";
+import { checkTransition, conflictResponseBody, runTransition } from "@/lib/escrow-state-machine";
+import { DISPUTE_RESOLUTIONS, executeDisputeResolution, RESOLVABLE_DISPUTE_STATUSES, resolutionAction } from "@/lib/dispute-resolution";
+import { withServerTiming } from "@/lib/request-timing";
 
 // POST /api/disputes/[id]/resolve - Resolve dispute (admins only)
-export async function POST(req: NextRequest, { params }: { params: Promise<{ id: string }> }) {
+export const POST = withServerTiming(async function POST(req: NextRequest, { params }: { params: Promise<{ id: string }> }) {
   try {
     const resolvedParams = await params;
     const user = await getCurrentUser();
@@ -14,7 +16,7 @@ export async function POST(req: NextRequest, { params }: { params: Promise<{ id:
 
     const { resolution, admin_notes } = await req.json();
 
-    if (!resolution || !['release_funds', 'refund_client', 'partial_release'].includes(resolution)) {
+    if (!resolution || !DISPUTE_RESOLUTIONS.includes(resolution)) {
       return NextResponse.json({ 
         error: "Valid resolution required: release_funds, refund_client, or partial_release" 
       }, { status: 400 });
@@ -42,124 +44,83 @@ export async function POST(req: NextRequest, { params }: { params: Promise<{ id:
       return NextResponse.json({ error: "Dispute not found" }, { status: 404 });
     }
 
-    if (dispute.status !== 'open') {
+    if (!RESOLVABLE_DISPUTE_STATUSES.includes(dispute.status)) {
       return NextResponse.json({ 
         error: `Cannot resolve dispute in status: ${dispute.status}` 
       }, { status: 400 });
     }
 
     const escrow = dispute.milestone.escrows[0];
-    if (!escrow || escrow.status !== 'funded') {
+    const action = resolutionAction(resolution);
+    if (!escrow || checkTransition(action, dispute.milestone.status, escrow.status)) {
       return NextResponse.json({ 
         error: "No funded escrow found for this dispute" 
       }, { status: 400 });
     }
 
-    let resolvedStatus;
-    let milestoneStatus;
-
-    try {
-      // Execute resolution based on admin decision
-      switch (resolution) {
-        case 'release_funds':
-          await escrowService.releaseToFreelancer(escrow.external_escrow_id);
-          resolvedStatus = 'resolved_release';
-          milestoneStatus = 'paid';
-          break;
-        
-        case 'refund_client':
-          await escrowService.refundToClient(
-            escrow.external_escrow_id, 
-            undefined, 
-            `Admin dispute resolution: ${admin_notes || 'Dispute resolved in favor of client'}`
-          );
-          resolvedStatus = 'resolved_refund';
-          milestoneStatus = 'cancelled';
-          break;
-        
-        case 'partial_release':
-          // Split funds between client and freelancer based on admin decision
-          const halfAmount = dispute.milestone.amount / 2;
-          await escrowService.releaseToFreelancer(escrow.external_escrow_id, halfAmount);
-          // The remaining would be refunded (handled by the escrow service)
-          resolvedStatus = 'resolved_release';
-          milestoneStatus = 'paid';
-          break;
-        
-        default:
-          throw new Error('Invalid resolution type');
-      }
-
-      // Update dispute
-      const { data: updatedDispute, error: updateError } = await supabase
-        .from('disputes')
-        .update({
-          status: resolvedStatus,
+    // Claim the dispute, milestone and escrow transition, then move the funds
+    const { transition, result } = await runTransition(
+      {
+        action,
+        userId: user.userId,
+        milestone: dispute.milestone,
+        escrow,
+        dispute: {
+          ...dispute,
           resolution,
-          resolved_by: user.userId,
-          resolved_at: new Date().toISOString(),
           admin_notes: admin_notes || `Dispute resolved: ${resolution}`
-        })
-        .eq('id', resolvedParams.id)
-        .select(`
-          *,
-          milestone:milestones(
-            *,
-            project:projects(
-              *,
-              client:users!projects_client_id_fkey(id, email),
-              freelancer:users!projects_freelancer_id_fkey(id, email)
-            )
-          ),
-          raised_by_user:users!disputes_raised_by_fkey(id, email),
-          resolved_by_user:users!disputes_resolved_by_fkey(id, email)
-        `)
-        .single();
-
-      if (updateError) {
-        console.error('Dispute update error:', updateError);
-        return NextResponse.json({ error: "Failed to update dispute" }, { status: 500 });
-      }
-
-      // Update milestone status
-      await supabase
-        .from('milestones')
-        .update({
-          status: milestoneStatus,
-          updated_at: new Date().toISOString()
-        })
-        .eq('id', dispute.milestone_id);
-
-      // Log audit event
-      await supabase
-        .from('audit_events')
-        .insert({
+        },
+        audit: {
           event_type: 'dispute_resolved',
-          user_id: user.userId,
-          project_id: dispute.milestone.project_id,
-          milestone_id: dispute.milestone_id,
-          dispute_id: resolvedParams.id,
           data: { 
             resolution, 
             admin_notes,
             previous_status: dispute.status 
           }
-        });
+        }
+      },
+      () => executeDisputeResolution(resolution, escrow.external_escrow_id, dispute.milestone.amount, admin_notes)
+    );
 
-      return NextResponse.json({ 
-        dispute: updatedDispute,
-        message: `Dispute resolved: ${resolution}` 
-      });
+    if (!transition.ok) {
+      return NextResponse.json(conflictResponseBody(transition), { status: 409 });
+    }
 
-    } catch (escrowError) {
-      console.error('Escrow resolution error:', escrowError);
+    if (!result) {
       return NextResponse.json({ 
         error: "Failed to execute resolution in escrow system" 
       }, { status: 500 });
     }
 
+    const { data: updatedDispute, error: refetchError } = await supabase
+      .from('disputes')
+      .select(`
+        *,
+        milestone:milestones(
+          *,
+          project:projects(
+            *,
+            client:users!projects_client_id_fkey(id, email),
+            freelancer:users!projects_freelancer_id_fkey(id, email)
+          )
+        ),
+        raised_by_user:users!disputes_raised_by_fkey(id, email),
+        resolved_by_user:users!disputes_resolved_by_fkey(id, email)
+      `)
+      .eq('id', resolvedParams.id)
+      .single();
+
+    if (refetchError) {
+      console.error('Dispute fetch error:', refetchError);
+    }
+
+    return NextResponse.json({ 
+      dispute: updatedDispute,
+      message: `Dispute resolved: ${resolution}` 
+    });
+
   } catch (error) {
     console.error('Dispute resolution API error:', error);
     return NextResponse.json({ error: "Internal server error" }, { status: 500 });
   }
-}
\ No newline at end of file
+});
\ No newline at end of file
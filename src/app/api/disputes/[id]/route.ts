@@ -0,0 +1,59 @@
+import { NextRequest, NextResponse } from "next/server";
+import { getCurrentUser } from "@/lib/auth";
+import { supabase } from "@/app/lib/supabase";
+import { withServerTiming } from "@/lib/request-timing";
+
+// GET /api/disputes/[id] - Full dispute detail (participants and admins)
+// The list endpoint only returns summary rows; this loads the nested detail on demand.
+export const GET = withServerTiming(async function GET(req: NextRequest, { params }: { params: Promise<{ id: string }> }) {
+  try {
+    const resolvedParams = await params;
+    const user = await getCurrentUser();
+    if (!user) {
+      return NextResponse.json({ error: "Not authenticated" }, { status: 401 });
+    }
+
+    const { data: dispute, error } = await supabase
+      .from('disputes')
+      .select(`
+        *,
+        milestone:milestones(
+          *,
+          project:projects(
+            *,
+            client:users!projects_client_id_fkey(id, email),
+            freelancer:users!projects_freelancer_id_fkey(id, email)
+          ),
+          escrows(id, status, amount, funded_at, released_at, refunded_at)
+        ),
+        raised_by_user:users!disputes_raised_by_fkey(id, email),
+        resolved_by_user:users!disputes_resolved_by_fkey(id, email)
+      `)
+      .eq('id', resolvedParams.id)
+      .maybeSingle();
+
+    if (error) {
+      console.error('Dispute fetch error:', error);
+      return NextResponse.json({ error: "Failed to fetch dispute" }, { status: 500 });
+    }
+
+    if (!dispute) {
+      return NextResponse.json({ error: "Dispute not found" }, { status: 404 });
+    }
+
+    const hasAccess =
+      user.role === 'admin' ||
+      dispute.milestone?.project?.client_id === user.userId ||
+      dispute.milestone?.project?.freelancer_id === user.userId;
+
+    if (!hasAccess) {
+      return NextResponse.json({ error: "Access denied" }, { status: 403 });
+    }
+
+    return NextResponse.json({ dispute });
+
+  } catch (error) {
+    console.error('Dispute detail API error:', error);
+    return NextResponse.json({ error: "Internal server error" }, { status: 500 });
+  }
+});
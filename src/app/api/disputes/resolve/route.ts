@@ -0,0 +1,68 @@
+import { NextRequest, NextResponse } from "next/server";
+import { getCurrentUser } from "@/lib/auth";
+import {
+  DISPUTE_RESOLUTIONS,
+  MAX_DISPUTES_PER_BATCH,
+  resolveDisputes,
+  type DisputeResolutionItem,
+} from "@/lib/dispute-resolution";
+import { withServerTiming } from "@/lib/request-timing";
+
+// POST /api/disputes/resolve - Resolve many disputes in one request (admins only)
+// Body: { resolutions: [{ dispute_id, resolution, admin_notes? }, ...] }
+// Returns one outcome per item, in request order.
+export const POST = withServerTiming(async function POST(req: NextRequest) {
+  try {
+    const user = await getCurrentUser();
+    if (!user || user.role !== 'admin') {
+      return NextResponse.json({ error: "Only admins can resolve disputes" }, { status: 403 });
+    }
+
+    const { resolutions } = await req.json();
+
+    if (!Array.isArray(resolutions) || resolutions.length === 0) {
+      return NextResponse.json({ error: "A non-empty resolutions array is required" }, { status: 400 });
+    }
+
+    if (resolutions.length > MAX_DISPUTES_PER_BATCH) {
+      return NextResponse.json({
+        error: `At most ${MAX_DISPUTES_PER_BATCH} disputes can be resolved per request`
+      }, { status: 400 });
+    }
+
+    const seen = new Set<string>();
+    const invalid = resolutions
+      .map((item: Partial<DisputeResolutionItem>, index: number) => {
+        if (!item?.dispute_id || !item.resolution || !DISPUTE_RESOLUTIONS.includes(item.resolution)) {
+          return { index, error: "dispute_id and a valid resolution (release_funds, refund_client, partial_release) are required" };
+        }
+        if (seen.has(item.dispute_id)) {
+          return { index, error: "Duplicate dispute_id" };
+        }
+        seen.add(item.dispute_id);
+        return null;
+      })
+      .filter(Boolean);
+
+    if (invalid.length > 0) {
+      return NextResponse.json({ error: "Invalid resolutions", details: invalid }, { status: 400 });
+    }
+
+    const outcomes = await resolveDisputes(
+      user.userId,
+      resolutions.map(({ dispute_id, resolution, admin_notes }: DisputeResolutionItem) => ({ dispute_id, resolution, admin_notes }))
+    );
+
+    const resolved = outcomes.filter(outcome => outcome.status === 'resolved').length;
+
+    return NextResponse.json({
+      outcomes,
+      resolved,
+      failed: outcomes.length - resolved,
+    });
+
+  } catch (error) {
+    console.error('Batch dispute resolution API error:', error);
+    return NextResponse.json({ error: "Internal server error" }, { status: 500 });
+  }
+});
@@ -1,9 +1,16 @@
 import { NextRequest, NextResponse } from "next/server";
 import { getCurrentUser } from "@/lib/auth";
 import { supabase } from "@/app/lib/supabase";
+import { auditWriter } from "@/lib/audit-log";
+import { refreshProjectFinancials } from "@/lib/project-financials";
+import { decodeCursor, nextCursor } from "@/lib/cursor";
+import { withServerTiming } from "@/lib/request-timing";
+
+const MAX_PAGE_SIZE = 100;
 
 // GET /api/disputes - List disputes (role-based filtering)
-export async function GET(req: NextRequest) {
+// Query: status, limit, cursor (from next_cursor of the previous page)
+export const GET = withServerTiming(async function GET(req: NextRequest) {
   try {
     const user = await getCurrentUser();
     if (!user) {
@@ -12,58 +19,42 @@ export async function GET(req: NextRequest) {
 
     const { searchParams } = new URL(req.url);
     const status = searchParams.get('status');
-    const limit = parseInt(searchParams.get('limit') || '20');
-    const offset = parseInt(searchParams.get('offset') || '0');
+    const limit = Math.min(Math.max(parseInt(searchParams.get('limit') || '20') || 20, 1), MAX_PAGE_SIZE);
+    const cursorParam = searchParams.get('cursor');
+    const cursor = decodeCursor(cursorParam);
 
-    let query = supabase
-      .from('disputes')
-      .select(`
-        *,
-        milestone:milestones(
-          *,
-          project:projects(
-            *,
-            client:users!projects_client_id_fkey(id, email),
-            freelancer:users!projects_freelancer_id_fkey(id, email)
-          )
-        ),
-        raised_by_user:users!disputes_raised_by_fkey(id, email),
-        resolved_by_user:users!disputes_resolved_by_fkey(id, email)
-      `)
-      .range(offset, offset + limit - 1)
-      .order('created_at', { ascending: false });
-
-    // Apply role-based filtering
-    if (user.role === 'client' || user.role === 'freelancer') {
-      // Users can only see disputes related to their projects
-      query = query.or(`
-        milestone.project.client_id.eq.${user.userId},
-        milestone.project.freelancer_id.eq.${user.userId}
-      `);
-    }
-    // Admin can see all disputes
-
-    if (status) {
-      query = query.eq('status', status);
+    if (cursorParam && !cursor) {
+      return NextResponse.json({ error: "Invalid cursor" }, { status: 400 });
     }
 
-    const { data: disputes, error } = await query;
+    // Flat list rows from the dispute_list view, newest first (keyset paginated)
+    // Admin can see all disputes; users only disputes on their projects
+    const { data: disputes, error } = await supabase.rpc('list_disputes', {
+      p_participant_id: user.role === 'admin' ? null : user.userId,
+      p_status: status,
+      p_before_created_at: cursor?.created_at ?? null,
+      p_before_id: cursor?.id ?? null,
+      p_limit: limit,
+    });
 
     if (error) {
       console.error('Disputes fetch error:', error);
       return NextResponse.json({ error: "Failed to fetch disputes" }, { status: 500 });
     }
 
-    return NextResponse.json({ disputes });
+    return NextResponse.json({
+      disputes,
+      next_cursor: nextCursor(disputes || [], limit)
+    });
 
   } catch (error) {
     console.error('Disputes API error:', error);
     return NextResponse.json({ error: "Internal server error" }, { status: 500 });
   }
-}
+});
 
 // POST /api/disputes - Create new dispute
-export async function POST(req: NextRequest) {
+export const POST = withServerTiming(async function POST(req: NextRequest) {
   try {
     const user = await getCurrentUser();
     if (!user) {
@@ -156,17 +147,17 @@ export async function POST(req: NextRequest) {
       })
       .eq('id', milestone_id);
 
+    await refreshProjectFinancials(milestone.project_id);
+
     // Log audit event
-    await supabase
-      .from('audit_events')
-      .insert({
-        event_type: 'dispute_raised',
-        user_id: user.userId,
-        project_id: milestone.project_id,
-        milestone_id,
-        dispute_id: dispute.id,
-        data: { reason }
-      });
+    auditWriter.enqueue({
+      event_type: 'dispute_raised',
+      user_id: user.userId,
+      project_id: milestone.project_id,
+      milestone_id,
+      dispute_id: dispute.id,
+      data: { reason }
+    });
 
     return NextResponse.json({ dispute });
 
@@ -174,4 +165,4 @@ export async function POST(req: NextRequest) {
     console.error('Dispute creation API error:', error);
     return NextResponse.json({ error: "Internal server error" }, { status: 500 });
   }
-}
\ No newline at end of file
+});
\ No newline at end of file
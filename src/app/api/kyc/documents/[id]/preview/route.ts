@@ -0,0 +1,87 @@
+import { NextRequest, NextResponse } from 'next/server';
+import { supabase } from '@/app/lib/supabase';
+import { getCurrentUser } from '@/lib/auth';
+import { getKycStorage, KycStorageError } from '@/lib/kyc-storage';
+import { withServerTiming } from '@/lib/request-timing';
+
+// GET /api/kyc/documents/[id]/preview?variant=thumbnail|preview
+// Serves the compressed review images produced by the KYC processing worker
+// (admins and the document owner only).
+export const GET = withServerTiming(async function GET(request: NextRequest, { params }: { params: Promise<{ id: string }> }) {
+  try {
+    const { id } = await params;
+    const user = await getCurrentUser(request);
+
+    if (!user) {
+      return NextResponse.json(
+        { success: false, error: 'Authentication required' },
+        { status: 401 }
+      );
+    }
+
+    const variant = new URL(request.url).searchParams.get('variant') || 'preview';
+    if (!['preview', 'thumbnail'].includes(variant)) {
+      return NextResponse.json(
+        { success: false, error: 'variant must be preview or thumbnail' },
+        { status: 400 }
+      );
+    }
+
+    const { data: document, error } = await supabase
+      .from('kyc_verifications')
+      .select('user_id, processing_status, preview_url, thumbnail_url')
+      .eq('id', id)
+      .maybeSingle();
+
+    if (error) {
+      console.error('Error fetching KYC document:', error);
+      return NextResponse.json(
+        { success: false, error: 'Failed to fetch KYC document' },
+        { status: 500 }
+      );
+    }
+
+    if (!document || (user.role !== 'admin' && document.user_id !== user.userId)) {
+      return NextResponse.json(
+        { success: false, error: 'KYC document not found' },
+        { status: 404 }
+      );
+    }
+
+    const previewPath = variant === 'thumbnail' ? document.thumbnail_url : document.preview_url;
+    if (!previewPath) {
+      return NextResponse.json(
+        {
+          success: false,
+          error: document.processing_status === 'processed'
+            ? 'No preview available for this document'
+            : 'Preview is still being generated',
+        },
+        { status: 404 }
+      );
+    }
+
+    const body = await getKycStorage().download(previewPath);
+
+    return new NextResponse(body, {
+      headers: {
+        'Content-Type': 'image/jpeg',
+        // Previews are immutable per document
+        'Cache-Control': 'private, max-age=86400, immutable',
+      },
+    });
+  } catch (error) {
+    if (error instanceof KycStorageError && error.status === 404) {
+      return NextResponse.json(
+        { success: false, error: 'Preview not found' },
+        { status: 404 }
+      );
+    }
+
+    console.error('Error in KYC preview API:', error);
+    return NextResponse.json(
+      { success: false, error: 'Internal server error' },
+      { status: 500 }
+    );
+  }
+});
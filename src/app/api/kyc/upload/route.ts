@@ -1,22 +1,18 @@
 import { NextRequest, NextResponse } from 'next/server';
 import { supabase } from '@/app/lib/supabase';
-import { verifyToken } from '@/lib/auth';
-
-export async function POST(request: NextRequest) {
+import { getCurrentUser } from '@/lib/auth';
+import { asKycUploadError, uploadKycDocument } from '@/lib/kyc-upload';
+import { kycProcessingWorker } from '@/lib/kyc-processing';
+import { withServerTiming } from '@/lib/request-timing';
+
+// POST /api/kyc/upload - Submit a KYC document in a single multipart request
+// Kept for simple clients; large or flaky uploads should use /api/kyc/uploads.
+export const POST = withServerTiming(async function POST(request: NextRequest) {
   try {
-    const token = request.cookies.get('auth-token')?.value;
-    
-    if (!token) {
-      return NextResponse.json(
-        { success: false, error: 'Authentication required' },
-        { status: 401 }
-      );
-    }
-
-    const user = await verifyToken(token);
+    const user = await getCurrentUser(request);
     if (!user) {
       return NextResponse.json(
-        { success: false, error: 'Invalid token' },
+        { success: false, error: 'Authentication required' },
         { status: 401 }
       );
     }
@@ -32,47 +28,20 @@ export async function POST(request: NextRequest) {
       );
     }
 
-    // Validate Aadhaar number format (12 digits)
-    if (!/^\d{12}$/.test(aadhaarNumber)) {
-      return NextResponse.json(
-        { success: false, error: 'Invalid Aadhaar number format' },
-        { status: 400 }
-      );
-    }
+    // Stream the document to storage in chunks; the type is checked from its
+    // magic bytes rather than the client-provided file.type
+    let kycData;
+    try {
+      kycData = await uploadKycDocument(user.userId, aadhaarNumber, aadhaarFile);
+    } catch (uploadError) {
+      const validationError = asKycUploadError(uploadError);
+      if (validationError && validationError.status < 500) {
+        return NextResponse.json(
+          { success: false, error: validationError.message },
+          { status: validationError.status }
+        );
+      }
 
-    // Validate file type and size
-    const allowedTypes = ['image/jpeg', 'image/jpg', 'image/png', 'application/pdf'];
-    if (!allowedTypes.includes(aadhaarFile.type)) {
-      return NextResponse.json(
-        { success: false, error: 'Only JPEG, PNG, and PDF files are allowed' },
-        { status: 400 }
-      );
-    }
-
-    const maxSize = 10 * 1024 * 1024; // 10MB
-    if (aadhaarFile.size > maxSize) {
-      return NextResponse.json(
-        { success: false, error: 'File size must be less than 10MB' },
-        { status: 400 }
-      );
-    }
-
-    // Convert file to buffer
-    const bytes = await aadhaarFile.arrayBuffer();
-    const buffer = Buffer.from(bytes);
-
-    // Generate unique filename
-    const fileName = `kyc/${user.userId}/${Date.now()}-aadhaar.${aadhaarFile.name.split('.').pop()}`;
-
-    // Upload file to Supabase storage
-    const { data: uploadData, error: uploadError } = await supabase.storage
-      .from('kyc-documents')
-      .upload(fileName, buffer, {
-        contentType: aadhaarFile.type,
-        upsert: false,
-      });
-
-    if (uploadError) {
       console.error('Error uploading file:', uploadError);
       return NextResponse.json(
         { success: false, error: 'Failed to upload document' },
@@ -80,39 +49,15 @@ export async function POST(request: NextRequest) {
       );
     }
 
-    // Save KYC data to database
-    const { data: kycData, error: dbError } = await supabase
-      .from('kyc_verifications')
-      .insert([
-        {
-          user_id: user.userId,
-          document_type: 'aadhaar',
-          document_number: aadhaarNumber,
-          document_url: uploadData.path,
-          status: 'pending',
-          submitted_at: new Date().toISOString(),
-        },
-      ])
-      .select()
-      .single();
-
-    if (dbError) {
-      console.error('Error saving KYC data:', dbError);
+    if (!kycData) {
       return NextResponse.json(
         { success: false, error: 'Failed to save KYC information' },
         { status: 500 }
       );
     }
 
-    // Update user KYC status
-    const { error: userUpdateError } = await supabase
-      .from('users')
-      .update({ kyc_status: 'pending' })
-      .eq('id', user.userId);
-
-    if (userUpdateError) {
-      console.error('Error updating user KYC status:', userUpdateError);
-    }
+    // Generate previews and check for duplicates in the background
+    kycProcessingWorker.kick();
 
     return NextResponse.json({
       success: true,
@@ -130,23 +75,14 @@ export async function POST(request: NextRequest) {
       { status: 500 }
     );
   }
-}
+});
 
-export async function GET(request: NextRequest) {
+export const GET = withServerTiming(async function GET(request: NextRequest) {
   try {
-    const token = request.cookies.get('auth-token')?.value;
-    
-    if (!token) {
-      return NextResponse.json(
-        { success: false, error: 'Authentication required' },
-        { status: 401 }
-      );
-    }
-
-    const user = await verifyToken(token);
+    const user = await getCurrentUser(request);
     if (!user) {
       return NextResponse.json(
-        { success: false, error: 'Invalid token' },
+        { success: false, error: 'Authentication required' },
         { status: 401 }
       );
     }
@@ -179,4 +115,4 @@ export async function GET(request: NextRequest) {
       { status: 500 }
     );
   }
-}
\ No newline at end of file
+});
\ No newline at end of file
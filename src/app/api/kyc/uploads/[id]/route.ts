@@ -0,0 +1,116 @@
+import { NextRequest, NextResponse } from 'next/server';
+import { getCurrentUser } from '@/lib/auth';
+import { appendKycChunk, asKycUploadError, getKycUpload } from '@/lib/kyc-upload';
+import { kycProcessingWorker } from '@/lib/kyc-processing';
+import { withServerTiming } from '@/lib/request-timing';
+
+// GET /api/kyc/uploads/[id] - Upload progress, used to resume after a dropped connection
+export const GET = withServerTiming(async function GET(request: NextRequest, { params }: { params: Promise<{ id: string }> }) {
+  try {
+    const { id } = await params;
+    const user = await getCurrentUser(request);
+    if (!user) {
+      return NextResponse.json(
+        { success: false, error: 'Authentication required' },
+        { status: 401 }
+      );
+    }
+
+    const upload = await getKycUpload(id, user.userId);
+    if (!upload) {
+      return NextResponse.json(
+        { success: false, error: 'Upload not found' },
+        { status: 404 }
+      );
+    }
+
+    return NextResponse.json({
+      success: true,
+      data: {
+        uploadId: upload.id,
+        offset: upload.received_bytes,
+        size: upload.total_size,
+        status: upload.status,
+        expiresAt: upload.expires_at,
+      },
+    });
+  } catch (error) {
+    console.error('Error in KYC upload status API:', error);
+    return NextResponse.json(
+      { success: false, error: 'Internal server error' },
+      { status: 500 }
+    );
+  }
+});
+
+// PATCH /api/kyc/uploads/[id] - Append one chunk of the document
+// Headers: Upload-Offset (byte offset of this chunk), Content-Length.
+// The raw request body is streamed to storage without being buffered.
+export const PATCH = withServerTiming(async function PATCH(request: NextRequest, { params }: { params: Promise<{ id: string }> }) {
+  try {
+    const { id } = await params;
+    const user = await getCurrentUser(request);
+    if (!user) {
+      return NextResponse.json(
+        { success: false, error: 'Authentication required' },
+        { status: 401 }
+      );
+    }
+
+    const offset = Number(request.headers.get('upload-offset'));
+    const length = Number(request.headers.get('content-length'));
+
+    if (!request.body || !Number.isInteger(offset) || offset < 0 || !length) {
+      return NextResponse.json(
+        { success: false, error: 'Upload-Offset and Content-Length headers and a body are required' },
+        { status: 400 }
+      );
+    }
+
+    const upload = await getKycUpload(id, user.userId);
+    if (!upload) {
+      return NextResponse.json(
+        { success: false, error: 'Upload not found' },
+        { status: 404 }
+      );
+    }
+
+    const { offset: newOffset, verification } = await appendKycChunk(upload, offset, request.body, length);
+
+    if (!verification) {
+      return NextResponse.json({
+        success: true,
+        data: { offset: newOffset, complete: false },
+      });
+    }
+
+    // Generate previews and check for duplicates in the background
+    kycProcessingWorker.kick();
+
+    return NextResponse.json({
+      success: true,
+      message: 'KYC documents submitted successfully',
+      data: {
+        offset: newOffset,
+        complete: true,
+        id: verification.id,
+        status: verification.status,
+        submitted_at: verification.submitted_at,
+      },
+    });
+  } catch (error) {
+    const uploadError = asKycUploadError(error);
+    if (uploadError) {
+      return NextResponse.json(
+        { success: false, error: uploadError.message, offset: uploadError.offset },
+        { status: uploadError.status }
+      );
+    }
+
+    console.error('Error in KYC chunk upload API:', error);
+    return NextResponse.json(
+      { success: false, error: 'Internal server error' },
+      { status: 500 }
+    );
+  }
+});
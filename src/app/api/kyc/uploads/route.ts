@@ -0,0 +1,54 @@
+import { NextRequest, NextResponse } from 'next/server';
+import { getCurrentUser } from '@/lib/auth';
+import { asKycUploadError, createKycUpload, KYC_CHUNK_SIZE } from '@/lib/kyc-upload';
+import { withServerTiming } from '@/lib/request-timing';
+
+// POST /api/kyc/uploads - Start a resumable KYC document upload
+// Body: { aadhaarNumber, size }. The document itself is sent in chunks to
+// PATCH /api/kyc/uploads/[id].
+export const POST = withServerTiming(async function POST(request: NextRequest) {
+  try {
+    const user = await getCurrentUser(request);
+    if (!user) {
+      return NextResponse.json(
+        { success: false, error: 'Authentication required' },
+        { status: 401 }
+      );
+    }
+
+    const { aadhaarNumber, size } = await request.json();
+
+    if (!aadhaarNumber || !size) {
+      return NextResponse.json(
+        { success: false, error: 'Aadhaar number and file size are required' },
+        { status: 400 }
+      );
+    }
+
+    const upload = await createKycUpload(user.userId, String(aadhaarNumber), Number(size));
+
+    return NextResponse.json({
+      success: true,
+      data: {
+        uploadId: upload.id,
+        chunkSize: KYC_CHUNK_SIZE,
+        offset: upload.received_bytes,
+        expiresAt: upload.expires_at,
+      },
+    });
+  } catch (error) {
+    const uploadError = asKycUploadError(error);
+    if (uploadError) {
+      return NextResponse.json(
+        { success: false, error: uploadError.message },
+        { status: uploadError.status }
+      );
+    }
+
+    console.error('Error in KYC upload session API:', error);
+    return NextResponse.json(
+      { success: false, error: 'Internal server error' },
+      { status: 500 }
+    );
+  }
+});
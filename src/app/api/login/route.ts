@@ -1,10 +1,11 @@
 import { NextResponse } from "next/server";
 import { supabase } from "@/app/lib/supabase";
-import bcrypt from "bcrypt";
-import { signJwt } from "@/lib/jwt";
+import { hashPassword, needsRehash, PasswordHasherOverloadedError, verifyPassword } from "@/lib/password-hashing";
+import { createSessionToken, setSessionCookie } from "@/lib/session";
 import type { DBUser } from "@/types/db";
+import { withServerTiming } from "@/lib/request-timing";
 
-export async function POST(req: Request) {
+export const POST = withServerTiming(async function POST(req: Request) {
   try {
     const { email, password } = await req.json();
 
@@ -26,14 +27,21 @@ export async function POST(req: Request) {
   const user = users[0] as DBUser;
   
 
-    // Verify password
-    const isValid = await bcrypt.compare(password, user.password_hash);
+    // Verify password (off the event loop, on the hashing worker pool)
+    const isValid = await verifyPassword(password, user.password_hash);
     if (!isValid) {
       return NextResponse.json({ error: "Invalid credentials" }, { status: 401 });
     }
 
+    // Upgrade hashes made with an older, lower cost factor in the background
+    if (needsRehash(user.password_hash)) {
+      void hashPassword(password)
+        .then(password_hash => supabase.from("users").update({ password_hash }).eq("id", user.id))
+        .catch(error => console.error("Password rehash error:", error));
+    }
+
     // Generate JWT
-    const token = await signJwt({ userId: user.id, email: user.email, role: user.role });
+    const token = await createSessionToken({ userId: user.id, email: user.email, role: user.role });
     
     // Set HttpOnly cookie
     const res = NextResponse.json({ 
@@ -44,17 +52,14 @@ export async function POST(req: Request) {
         role: user.role 
       } 
     });
-    res.cookies.set("token", token, {
-      httpOnly: true,
-      secure: process.env.NODE_ENV === "production",
-      sameSite: "strict",
-      maxAge: 60 * 60 * 24 * 7, // 7 days
-      path: "/",
-    });
+    setSessionCookie(res, token);
 
     return res;
   } catch (error) {
+    if (error instanceof PasswordHasherOverloadedError) {
+      return NextResponse.json({ error: "Server busy, please retry" }, { status: 503, headers: { "Retry-After": "1" } });
+    }
     console.error("Login API error:", error);
     return NextResponse.json({ error: "Failed to login" }, { status: 500 });
   }
-}
+});
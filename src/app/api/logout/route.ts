@@ -1,15 +1,12 @@
 // src/app/api/logout/route.ts
-import { NextResponse } from "next/server";
+import { NextRequest, NextResponse } from "next/server";
+import { clearSessionCookie, getSessionToken } from "@/lib/session";
+import { withServerTiming } from "@/lib/request-timing";
 
-export async function POST() {
-  // Clear the JWT cookie
+export const POST = withServerTiming(async function POST(req: NextRequest) {
+  // Clear the session cookie (both current and legacy names)
   const res = NextResponse.json({ ok: true });
-  res.cookies.set("token", "", {
-    httpOnly: true,
-    secure: process.env.NODE_ENV === "production",
-    path: "/",
-    expires: new Date(0), // expire immediately
-  });
+  clearSessionCookie(res, getSessionToken(req.cookies));
 
   return res;
-}
+});
@@ -2,9 +2,11 @@ import { NextRequest, NextResponse } from "next/server";
 import { getCurrentUser } from "@/lib/auth";
 import { supabase } from "@/app/lib/supabase";
 import { escrowService } from "@/lib/mock-escrow";
+import { checkTransition, conflictResponseBody, runTransition } from "@/lib/escrow-state-machine";
+import { withServerTiming } from "@/lib/request-timing";
 
 // POST /api/milestones/[id]/fund - Fund milestone escrow (clients only)
-export async function POST(req: NextRequest, { params }: { params: Promise<{ id: string }> }) {
+export const POST = withServerTiming(async function POST(req: NextRequest, { params }: { params: Promise<{ id: string }> }) {
   try {
     const resolvedParams = await params;
     const user = await getCurrentUser();
@@ -32,56 +34,42 @@ export async function POST(req: NextRequest, { params }: { params: Promise<{ id:
       return NextResponse.json({ error: "Only project client can fund milestones" }, { status: 403 });
     }
 
-    // Check if milestone can be funded
-    if (milestone.status !== 'pending') {
-      return NextResponse.json({ 
-        error: `Cannot fund milestone in status: ${milestone.status}` 
-      }, { status: 400 });
-    }
-
-    // Check if escrow exists and is in correct state
+    // Check if escrow exists and the milestone can be funded
     const escrow = milestone.escrows[0];
     if (!escrow) {
       return NextResponse.json({ error: "No escrow found for this milestone" }, { status: 400 });
     }
 
-    if (escrow.status !== 'created') {
-      return NextResponse.json({ 
-        error: `Escrow is in status: ${escrow.status}, cannot fund` 
-      }, { status: 400 });
+    const transitionError = checkTransition('fund', milestone.status, escrow.status);
+    if (transitionError) {
+      return NextResponse.json({ error: transitionError }, { status: 400 });
     }
 
-    // Initiate payment through mock escrow service
-    const result = await escrowService.fundEscrow(escrow.external_escrow_id);
+    // Claim the transition (pending -> in_progress), then initiate payment
+    const { transition, result } = await runTransition(
+      {
+        action: 'fund',
+        userId: user.userId,
+        milestone,
+        escrow,
+        audit: {
+          event_type: 'escrow_funding_initiated',
+          data: {
+            amount: milestone.amount,
+            escrow_id: escrow.external_escrow_id
+          }
+        }
+      },
+      () => escrowService.fundEscrow(escrow.external_escrow_id)
+    );
 
-    if (!result.success) {
-      return NextResponse.json({ error: "Failed to initiate escrow funding" }, { status: 500 });
+    if (!transition.ok) {
+      return NextResponse.json(conflictResponseBody(transition), { status: 409 });
     }
 
-    // Update milestone status to in_progress (funding initiated)
-    await supabase
-      .from('milestones')
-      .update({
-        status: 'in_progress',
-        updated_at: new Date().toISOString()
-      })
-      .eq('id', resolvedParams.id);
-
-    // Log audit event
-    await supabase
-      .from('audit_events')
-      .insert({
-        event_type: 'escrow_funding_initiated',
-        user_id: user.userId,
-        project_id: milestone.project_id,
-        milestone_id: resolvedParams.id,
-        escrow_id: escrow.id,
-        data: { 
-          amount: milestone.amount,
-          escrow_id: escrow.external_escrow_id,
-          payment_url: result.paymentUrl
-        }
-      });
+    if (!result) {
+      return NextResponse.json({ error: "Failed to initiate escrow funding" }, { status: 500 });
+    }
 
     return NextResponse.json({
       success: true,
@@ -94,4 +82,4 @@ export async function POST(req: NextRequest, { params }: { params: Promise<{ id:
     console.error('Milestone funding API error:', error);
     return NextResponse.json({ error: "Internal server error" }, { status: 500 });
   }
-}
\ No newline at end of file
+});
\ No newline at end of file
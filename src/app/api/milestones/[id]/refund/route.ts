@@ -2,9 +2,11 @@ import { NextRequest, NextResponse } from "next/server";
 import { getCurrentUser } from "@/lib/auth";
 import { supabase } from "@/app/lib/supabase";
 import { escrowService } from "@/lib/mock-escrow";
+import { checkTransition, conflictResponseBody, runTransition } from "@/lib/escrow-state-machine";
+import { withServerTiming } from "@/lib/request-timing";
 
 // POST /api/milestones/[id]/refund - Refund milestone payment (admins only or specific conditions)
-export async function POST(req: NextRequest, { params }: { params: Promise<{ id: string }> }) {
+export const POST = withServerTiming(async function POST(req: NextRequest, { params }: { params: Promise<{ id: string }> }) {
   try {
     const resolvedParams = await params;
     const user = await getCurrentUser();
@@ -58,7 +60,7 @@ export async function POST(req: NextRequest, { params }: { params: Promise<{ id:
 
     // Check escrow status
     const escrow = milestone.escrows[0];
-    if (!escrow || escrow.status !== 'funded') {
+    if (!escrow || checkTransition('refund', milestone.status, escrow.status)) {
       return NextResponse.json({ 
         error: "No funded escrow found for refund" 
       }, { status: 400 });
@@ -72,53 +74,42 @@ export async function POST(req: NextRequest, { params }: { params: Promise<{ id:
       }, { status: 400 });
     }
 
-    // Process refund through mock escrow service
-    const result = await escrowService.refundToClient(escrow.external_escrow_id, refundAmount, refundReason);
-
-    if (!result.success) {
-      return NextResponse.json({ error: "Failed to process refund" }, { status: 500 });
-    }
-
-    // Update milestone status
-    await supabase
-      .from('milestones')
-      .update({
-        status: 'cancelled',
-        updated_at: new Date().toISOString()
-      })
-      .eq('id', resolvedParams.id);
-
-    // If there was an active dispute, resolve it
-    if (milestone.disputes.length > 0) {
-      await supabase
-        .from('disputes')
-        .update({
-          status: 'resolved_refund',
+    // An active dispute is resolved together with the refund
+    const openDispute = milestone.disputes.find(
+      (dispute: { status: string }) => ['open', 'under_review'].includes(dispute.status)
+    );
+
+    // Claim the transition (-> cancelled), then process the refund through the escrow service
+    const { transition, result } = await runTransition(
+      {
+        action: 'refund',
+        userId: user.userId,
+        milestone,
+        escrow,
+        dispute: openDispute && {
+          ...openDispute,
           resolution: 'refund_client',
-          resolved_by: user.userId,
-          resolved_at: new Date().toISOString(),
           admin_notes: `Refund processed: ${refundReason}`
-        })
-        .eq('milestone_id', resolvedParams.id)
-        .eq('status', 'open');
+        },
+        audit: {
+          event_type: 'escrow_refunded',
+          data: {
+            amount: refundAmount,
+            reason: refundReason,
+            client_id: milestone.project.client_id
+          }
+        }
+      },
+      () => escrowService.refundToClient(escrow.external_escrow_id, refundAmount, refundReason)
+    );
+
+    if (!transition.ok) {
+      return NextResponse.json(conflictResponseBody(transition), { status: 409 });
     }
 
-    // Log audit event
-    await supabase
-      .from('audit_events')
-      .insert({
-        event_type: 'escrow_refunded',
-        user_id: user.userId,
-        project_id: milestone.project_id,
-        milestone_id: resolvedParams.id,
-        escrow_id: escrow.id,
-        data: { 
-          amount: refundAmount,
-          reason: refundReason,
-          refund_id: result.refundId,
-          client_id: milestone.project.client_id
-        }
-      });
+    if (!result) {
+      return NextResponse.json({ error: "Failed to process refund" }, { status: 500 });
+    }
 
     return NextResponse.json({
       success: true,
@@ -132,4 +123,4 @@ export async function POST(req: NextRequest, { params }: { params: Promise<{ id:
     console.error('Milestone refund API error:', error);
     return NextResponse.json({ error: "Internal server error" }, { status: 500 });
   }
-}
\ No newline at end of file
+});
\ No newline at end of file
@@ -2,9 +2,11 @@ import { NextRequest, NextResponse } from "next/server";
 import { getCurrentUser } from "@/lib/auth";
 import { supabase } from "@/app/lib/supabase";
 import { escrowService } from "@/lib/mock-escrow";
+import { checkTransition, conflictResponseBody, runTransition } from "@/lib/escrow-state-machine";
+import { withServerTiming } from "@/lib/request-timing";
 
 // POST /api/milestones/[id]/release - Release milestone payment (clients and admins)
-export async function POST(req: NextRequest, { params }: { params: Promise<{ id: string }> }) {
+export const POST = withServerTiming(async function POST(req: NextRequest, { params }: { params: Promise<{ id: string }> }) {
   try {
     const resolvedParams = await params;
     const user = await getCurrentUser();
@@ -43,19 +45,11 @@ export async function POST(req: NextRequest, { params }: { params: Promise<{ id:
       return NextResponse.json({ error: "Access denied" }, { status: 403 });
     }
 
-    // Check if milestone can be released
-    if (!['submitted', 'approved'].includes(milestone.status)) {
-      return NextResponse.json({ 
-        error: `Cannot release payment for milestone in status: ${milestone.status}` 
-      }, { status: 400 });
-    }
-
-    // Check escrow status
+    // Check if milestone can be released and the escrow is funded
     const escrow = milestone.escrows[0];
-    if (!escrow || escrow.status !== 'funded') {
-      return NextResponse.json({ 
-        error: "Escrow must be funded before release" 
-      }, { status: 400 });
+    const transitionError = checkTransition('release', milestone.status, escrow?.status);
+    if (transitionError) {
+      return NextResponse.json({ error: transitionError }, { status: 400 });
     }
 
     // Validate release amount
@@ -66,38 +60,31 @@ export async function POST(req: NextRequest, { params }: { params: Promise<{ id:
       }, { status: 400 });
     }
 
-    // Release funds through mock escrow service
-    const result = await escrowService.releaseToFreelancer(escrow.external_escrow_id, releaseAmount);
+    // Claim the transition (-> paid), then release funds through the escrow service
+    const { transition, result } = await runTransition(
+      {
+        action: 'release',
+        userId: user.userId,
+        milestone,
+        escrow,
+        audit: {
+          event_type: 'escrow_released',
+          data: {
+            amount: releaseAmount,
+            freelancer_id: milestone.project.freelancer_id
+          }
+        }
+      },
+      () => escrowService.releaseToFreelancer(escrow.external_escrow_id, releaseAmount)
+    );
 
-    if (!result.success) {
-      return NextResponse.json({ error: "Failed to release funds" }, { status: 500 });
+    if (!transition.ok) {
+      return NextResponse.json(conflictResponseBody(transition), { status: 409 });
     }
 
-    // Update milestone status
-    await supabase
-      .from('milestones')
-      .update({
-        status: 'paid',
-        approved_at: new Date().toISOString(),
-        updated_at: new Date().toISOString()
-      })
-      .eq('id', resolvedParams.id);
-
-    // Log audit event
-    await supabase
-      .from('audit_events')
-      .insert({
-        event_type: 'escrow_released',
-        user_id: user.userId,
-        project_id: milestone.project_id,
-        milestone_id: resolvedParams.id,
-        escrow_id: escrow.id,
-        data: { 
-          amount: releaseAmount,
-          transaction_id: result.transactionId,
-          freelancer_id: milestone.project.freelancer_id
-        }
-      });
+    if (!result) {
+      return NextResponse.json({ error: "Failed to release funds" }, { status: 500 });
+    }
 
     return NextResponse.json({
       success: true,
@@ -110,4 +97,4 @@ export async function POST(req: NextRequest, { params }: { params: Promise<{ id:
     console.error('Milestone release API error:', error);
     return NextResponse.json({ error: "Internal server error" }, { status: 500 });
   }
-}
\ No newline at end of file
+});
\ No newline at end of file
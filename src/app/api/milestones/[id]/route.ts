@@ -1,9 +1,11 @@
 import { NextRequest, NextResponse } from "next/server";
 import { getCurrentUser } from "@/lib/auth";
 import { supabase } from "@/app/lib/supabase";
+import { auditWriter } from "@/lib/audit-log";
+import { withServerTiming } from "@/lib/request-timing";
 
 // GET /api/milestones/[id] - Get milestone details
-export async function GET(req: NextRequest, { params }: { params: Promise<{ id: string }> }) {
+export const GET = withServerTiming(async function GET(req: NextRequest, { params }: { params: Promise<{ id: string }> }) {
   try {
     const resolvedParams = await params;
     const user = await getCurrentUser();
@@ -46,10 +48,10 @@ export async function GET(req: NextRequest, { params }: { params: Promise<{ id:
     console.error('Milestone details API error:', error);
     return NextResponse.json({ error: "Internal server error" }, { status: 500 });
   }
-}
+});
 
 // PUT /api/milestones/[id] - Update milestone
-export async function PUT(req: NextRequest, { params }: { params: Promise<{ id: string }> }) {
+export const PUT = withServerTiming(async function PUT(req: NextRequest, { params }: { params: Promise<{ id: string }> }) {
   try {
     const resolvedParams = await params;
     const user = await getCurrentUser();
@@ -147,15 +149,13 @@ export async function PUT(req: NextRequest, { params }: { params: Promise<{ id:
 
     // Log audit event for status changes
     if (filteredUpdates.status) {
-      await supabase
-        .from('audit_events')
-        .insert({
-          event_type: `milestone_${filteredUpdates.status}`,
-          user_id: user.userId,
-          project_id: milestone.project_id,
-          milestone_id: resolvedParams.id,
-          data: { status: filteredUpdates.status, previous_status: milestone.status }
-        });
+      auditWriter.enqueue({
+        event_type: `milestone_${filteredUpdates.status}`,
+        user_id: user.userId,
+        project_id: milestone.project_id,
+        milestone_id: resolvedParams.id,
+        data: { status: filteredUpdates.status, previous_status: milestone.status }
+      });
     }
 
     return NextResponse.json({ milestone: updatedMilestone });
@@ -164,4 +164,4 @@ export async function PUT(req: NextRequest, { params }: { params: Promise<{ id:
     console.error('Milestone update API error:', error);
     return NextResponse.json({ error: "Internal server error" }, { status: 500 });
   }
-}
\ No newline at end of file
+});
\ No newline at end of file
@@ -0,0 +1,74 @@
+import { NextRequest, NextResponse } from "next/server";
+import { getCurrentUser } from "@/lib/auth";
+import { supabase } from "@/app/lib/supabase";
+import {
+  createMilestonesWithEscrows,
+  validateMilestoneInput,
+  MAX_MILESTONES_PER_REQUEST,
+  type MilestoneInput,
+} from "@/lib/milestones";
+import { withServerTiming } from "@/lib/request-timing";
+
+// POST /api/projects/[id]/milestones/bulk - Create many milestones at once (clients only)
+// Body: { milestones: [{ title, description, amount, due_date }, ...] }
+// All milestones, escrows and audit rows are created in one transaction.
+export const POST = withServerTiming(async function POST(req: NextRequest, { params }: { params: Promise<{ id: string }> }) {
+  try {
+    const resolvedParams = await params;
+    const user = await getCurrentUser();
+    if (!user) {
+      return NextResponse.json({ error: "Not authenticated" }, { status: 401 });
+    }
+
+    const { milestones: inputs } = await req.json();
+
+    if (!Array.isArray(inputs) || inputs.length === 0) {
+      return NextResponse.json({ error: "A non-empty milestones array is required" }, { status: 400 });
+    }
+
+    if (inputs.length > MAX_MILESTONES_PER_REQUEST) {
+      return NextResponse.json({ 
+        error: `At most ${MAX_MILESTONES_PER_REQUEST} milestones can be created per request` 
+      }, { status: 400 });
+    }
+
+    const invalid = inputs
+      .map((input: Partial<MilestoneInput>, index: number) => ({ index, error: validateMilestoneInput(input) }))
+      .filter((result: { error: string | null }) => result.error);
+
+    if (invalid.length > 0) {
+      return NextResponse.json({ error: "Invalid milestones", details: invalid }, { status: 400 });
+    }
+
+    // Verify project access and that user is client
+    const { data: project } = await supabase
+      .from('projects')
+      .select('client_id')
+      .eq('id', resolvedParams.id)
+      .single();
+
+    if (!project) {
+      return NextResponse.json({ error: "Project not found" }, { status: 404 });
+    }
+
+    if (user.role !== 'admin' && project.client_id !== user.userId) {
+      return NextResponse.json({ error: "Only project client can create milestones" }, { status: 403 });
+    }
+
+    const { milestones, error: createError } = await createMilestonesWithEscrows(
+      resolvedParams.id,
+      user.userId,
+      inputs.map(({ title, description, amount, due_date }: MilestoneInput) => ({ title, description, amount, due_date }))
+    );
+
+    if (createError || !milestones) {
+      return NextResponse.json({ error: createError }, { status: 500 });
+    }
+
+    return NextResponse.json({ milestones });
+
+  } catch (error) {
+    console.error('Bulk milestone creation API error:', error);
+    return NextResponse.json({ error: "Internal server error" }, { status: 500 });
+  }
+});
@@ -1,10 +1,11 @@
 import { NextRequest, NextResponse } from "next/server";
 import { getCurrentUser } from "@/lib/auth";
 import { supabase } from "@/app/lib/supabase";
-import { escrowService } from "@/lib/mock-escrow";
+import { createMilestonesWithEscrows, validateMilestoneInput } from "@/lib/milestones";
+import { withServerTiming } from "@/lib/request-timing";
 
 // GET /api/projects/[id]/milestones - List project milestones
-export async function GET(req: NextRequest, { params }: { params: Promise<{ id: string }> }) {
+export const GET = withServerTiming(async function GET(req: NextRequest, { params }: { params: Promise<{ id: string }> }) {
   try {
     const resolvedParams = await params;
     const user = await getCurrentUser();
@@ -52,10 +53,10 @@ export async function GET(req: NextRequest, { params }: { params: Promise<{ id:
     console.error('Milestones API error:', error);
     return NextResponse.json({ error: "Internal server error" }, { status: 500 });
   }
-}
+});
 
 // POST /api/projects/[id]/milestones - Create milestone (clients only)
-export async function POST(req: NextRequest, { params }: { params: Promise<{ id: string }> }) {
+export const POST = withServerTiming(async function POST(req: NextRequest, { params }: { params: Promise<{ id: string }> }) {
   try {
     const resolvedParams = await params;
     const user = await getCurrentUser();
@@ -65,8 +66,9 @@ export async function POST(req: NextRequest, { params }: { params: Promise<{ id:
 
     const { title, description, amount, due_date } = await req.json();
 
-    if (!title || !amount || amount <= 0) {
-      return NextResponse.json({ error: "Title and valid amount are required" }, { status: 400 });
+    const validationError = validateMilestoneInput({ title, amount });
+    if (validationError) {
+      return NextResponse.json({ error: validationError }, { status: 400 });
     }
 
     // Verify project access and that user is client
@@ -84,60 +86,21 @@ export async function POST(req: NextRequest, { params }: { params: Promise<{ id:
       return NextResponse.json({ error: "Only project client can create milestones" }, { status: 403 });
     }
 
-    // Create milestone
-    const { data: milestone, error: milestoneError } = await supabase
-      .from('milestones')
-      .insert({
-        project_id: resolvedParams.id,
-        title,
-        description,
-        amount,
-        due_date,
-        status: 'pending'
-      })
-      .select()
-      .single();
+    // Create milestone, escrow and audit row in one transaction
+    const { milestones, error: createError } = await createMilestonesWithEscrows(
+      resolvedParams.id,
+      user.userId,
+      [{ title, description, amount, due_date }]
+    );
 
-    if (milestoneError) {
-      console.error('Milestone creation error:', milestoneError);
-      return NextResponse.json({ error: "Failed to create milestone" }, { status: 500 });
+    if (createError || !milestones) {
+      return NextResponse.json({ error: createError }, { status: 500 });
     }
 
-    // Create corresponding escrow
-    try {
-      const { escrowId } = await escrowService.createEscrow(amount, milestone.id, resolvedParams.id);
-      
-      const { error: escrowError } = await supabase
-        .from('escrows')
-        .insert({
-          milestone_id: milestone.id,
-          amount,
-          status: 'created',
-          external_escrow_id: escrowId
-        });
-
-      if (escrowError) {
-        console.error('Escrow creation error:', escrowError);
-      }
-    } catch (escrowError) {
-      console.error('Escrow service error:', escrowError);
-    }
-
-    // Log audit event
-    await supabase
-      .from('audit_events')
-      .insert({
-        event_type: 'milestone_created',
-        user_id: user.userId,
-        project_id: resolvedParams.id,
-        milestone_id: milestone.id,
-        data: { title, amount }
-      });
-
-    return NextResponse.json({ milestone });
+    return NextResponse.json({ milestone: milestones[0] });
 
   } catch (error) {
     console.error('Milestone creation API error:', error);
     return NextResponse.json({ error: "Internal server error" }, { status: 500 });
   }
-}
\ No newline at end of file
+});
\ No newline at end of file
@@ -1,9 +1,12 @@
 import { NextRequest, NextResponse } from "next/server";
 import { getCurrentUser } from "@/lib/auth";
 import { supabase } from "@/app/lib/supabase";
+import { auditWriter } from "@/lib/audit-log";
+import { PROJECT_FINANCIALS_EMBED } from "@/lib/project-financials";
+import { withServerTiming } from "@/lib/request-timing";
 
 // GET /api/projects/[id] - Get project details
-export async function GET(req: NextRequest, { params }: { params: Promise<{ id: string }> }) {
+export const GET = withServerTiming(async function GET(req: NextRequest, { params }: { params: Promise<{ id: string }> }) {
   try {
     const resolvedParams = await params;
     const user = await getCurrentUser();
@@ -20,7 +23,8 @@ export async function GET(req: NextRequest, { params }: { params: Promise<{ id:
         milestones(
           *,
           escrows(*)
-        )
+        ),
+        ${PROJECT_FINANCIALS_EMBED}
       `)
       .eq('id', resolvedParams.id)
       .single();
@@ -46,10 +50,10 @@ export async function GET(req: NextRequest, { params }: { params: Promise<{ id:
     console.error('Project details API error:', error);
     return NextResponse.json({ error: "Internal server error" }, { status: 500 });
   }
-}
+});
 
 // PUT /api/projects/[id] - Update project
-export async function PUT(req: NextRequest, { params }: { params: Promise<{ id: string }> }) {
+export const PUT = withServerTiming(async function PUT(req: NextRequest, { params }: { params: Promise<{ id: string }> }) {
   try {
     const resolvedParams = await params;
     const user = await getCurrentUser();
@@ -119,14 +123,12 @@ export async function PUT(req: NextRequest, { params }: { params: Promise<{ id:
 
     // Log audit event for important updates
     if (filteredUpdates.status || filteredUpdates.freelancer_id) {
-      await supabase
-        .from('audit_events')
-        .insert({
-          event_type: filteredUpdates.freelancer_id ? 'project_assigned' : 'project_status_updated',
-          user_id: user.userId,
-          project_id: resolvedParams.id,
-          data: filteredUpdates
-        });
+      auditWriter.enqueue({
+        event_type: filteredUpdates.freelancer_id ? 'project_assigned' : 'project_status_updated',
+        user_id: user.userId,
+        project_id: resolvedParams.id,
+        data: filteredUpdates
+      });
     }
 
     return NextResponse.json({ project: updatedProject });
@@ -135,4 +137,4 @@ export async function PUT(req: NextRequest, { params }: { params: Promise<{ id:
     console.error('Project update API error:', error);
     return NextResponse.json({ error: "Internal server error" }, { status: 500 });
   }
-}
\ No newline at end of file
+});
\ No newline at end of file
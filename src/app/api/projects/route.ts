@@ -1,9 +1,12 @@
 import { NextRequest, NextResponse } from "next/server";
 import { getCurrentUser, getCurrentUserWithFreshData } from "@/lib/auth";
 import { supabase } from "@/app/lib/supabase";
+import { auditWriter } from "@/lib/audit-log";
+import { PROJECT_FINANCIALS_EMBED } from "@/lib/project-financials";
+import { withServerTiming } from "@/lib/request-timing";
 
 // GET /api/projects - List projects (role-based filtering)
-export async function GET(req: NextRequest) {
+export const GET = withServerTiming(async function GET(req: NextRequest) {
   try {
     const user = await getCurrentUser();
     if (!user) {
@@ -21,7 +24,8 @@ export async function GET(req: NextRequest) {
         *,
         client:users!projects_client_id_fkey(id, email, skills),
         freelancer:users!projects_freelancer_id_fkey(id, email, skills),
-        milestones(id, title, amount, status, due_date)
+        milestones(id, title, amount, status, due_date),
+        ${PROJECT_FINANCIALS_EMBED}
       `)
       .range(offset, offset + limit - 1)
       .order('created_at', { ascending: false });
@@ -51,12 +55,12 @@ export async function GET(req: NextRequest) {
     console.error('Projects API error:', error);
     return NextResponse.json({ error: "Internal server error" }, { status: 500 });
   }
-}
+});
 
 // POST /api/projects - Create new project (clients only)
-export async function POST(req: NextRequest) {
+export const POST = withServerTiming(async function POST(req: NextRequest) {
   try {
-    const user = await getCurrentUserWithFreshData();
+    const user = await getCurrentUserWithFreshData(req);
     if (!user || user.role !== 'client') {
       return NextResponse.json({ error: "Only clients can create projects" }, { status: 403 });
     }
@@ -88,14 +92,12 @@ export async function POST(req: NextRequest) {
     }
 
     // Log audit event
-    await supabase
-      .from('audit_events')
-      .insert({
-        event_type: 'project_created',
-        user_id: user.userId,
-        project_id: project.id,
-        data: { title, budget }
-      });
+    auditWriter.enqueue({
+      event_type: 'project_created',
+      user_id: user.userId,
+      project_id: project.id,
+      data: { title, budget }
+    });
 
     return NextResponse.json({ project });
 
@@ -103,4 +105,4 @@ export async function POST(req: NextRequest) {
     console.error('Project creation API error:', error);
     return NextResponse.json({ error: "Internal server error" }, { status: 500 });
   }
-}
\ No newline at end of file
+});
\ No newline at end of file
@@ -1,10 +1,11 @@
 // src/app/api/signup/route.ts
 import { NextResponse } from "next/server";
-import bcrypt from "bcryptjs";
-import { signJwt } from "@/lib/jwt";
+import { createSessionToken, setSessionCookie } from "@/lib/session";
 import { supabase } from "@/app/lib/supabase";
+import { hashPassword, PasswordHasherOverloadedError } from "@/lib/password-hashing";
+import { withServerTiming } from "@/lib/request-timing";
 
-export async function POST(req: Request) {
+export const POST = withServerTiming(async function POST(req: Request) {
   try {
     const body = await req.json();
     const { email, password, cover_letter, experiences, age, skills } = body;
@@ -24,8 +25,8 @@ export async function POST(req: Request) {
       return NextResponse.json({ error: "Email already registered" }, { status: 409 });
     }
 
-    // Hash password
-    const hashedPassword = await bcrypt.hash(password, 10);
+    // Hash password (off the event loop, on the hashing worker pool)
+    const hashedPassword = await hashPassword(password);
 
     // Create user
     const { data: user, error } = await supabase
@@ -48,7 +49,7 @@ export async function POST(req: Request) {
     }
 
     // Generate JWT
-    const token = await signJwt({ userId: user.id, email: user.email, role: user.role });
+    const token = await createSessionToken({ userId: user.id, email: user.email, role: user.role });
 
     // Set cookie
     const res = NextResponse.json({ 
@@ -59,16 +60,14 @@ export async function POST(req: Request) {
         role: user.role
       }
     });
-    res.cookies.set("token", token, {
-      httpOnly: true,
-      secure: process.env.NODE_ENV === "production",
-      sameSite: "strict",
-      path: "/",
-    });
+    setSessionCookie(res, token);
 
     return res;
   } catch (error) {
+    if (error instanceof PasswordHasherOverloadedError) {
+      return NextResponse.json({ error: "Server busy, please retry" }, { status: 503, headers: { "Retry-After": "1" } });
+    }
     console.error("Signup error:", error);
     return NextResponse.json({ error: "Internal server error" }, { status: 500 });
   }
-}
\ No newline at end of file
+});
\ No newline at end of file
@@ -0,0 +1,108 @@
+import { NextRequest, NextResponse } from "next/server";
+import { getCurrentUser } from "@/lib/auth";
+import { supabase } from "@/app/lib/supabase";
+import { keysetAfterFilter, walkKeyset } from "@/lib/cursor";
+import { exportResponse, parseExportFormat, type ExportColumn } from "@/lib/export-stream";
+import { withServerTiming } from "@/lib/request-timing";
+
+interface TransactionExportRow {
+  id: string;
+  created_at: string;
+  type: string;
+  status: string;
+  amount: number;
+  description: string | null;
+  external_transaction_id: string | null;
+  user_id: string | null;
+  project_id: string | null;
+  milestone_id: string | null;
+  escrow_id: string | null;
+  user: { email: string } | null;
+  project: { title: string } | null;
+  milestone: { title: string } | null;
+  escrow: { external_escrow_id: string } | null;
+}
+
+const COLUMNS: ExportColumn<TransactionExportRow>[] = [
+  { header: 'id', value: row => row.id },
+  { header: 'created_at', value: row => row.created_at },
+  { header: 'type', value: row => row.type },
+  { header: 'status', value: row => row.status },
+  { header: 'amount', value: row => row.amount },
+  { header: 'user_id', value: row => row.user_id },
+  { header: 'user_email', value: row => row.user?.email },
+  { header: 'project_id', value: row => row.project_id },
+  { header: 'project_title', value: row => row.project?.title },
+  { header: 'milestone_id', value: row => row.milestone_id },
+  { header: 'milestone_title', value: row => row.milestone?.title },
+  { header: 'escrow_id', value: row => row.escrow_id },
+  { header: 'external_escrow_id', value: row => row.escrow?.external_escrow_id },
+  { header: 'external_transaction_id', value: row => row.external_transaction_id },
+  { header: 'description', value: row => row.description },
+];
+
+// GET /api/transactions/export - Stream transactions as CSV or NDJSON, oldest first
+// Query: format (csv|ndjson), from, to (created_at range), type, status, user_id (admins)
+export const GET = withServerTiming(async function GET(req: NextRequest) {
+  try {
+    const user = await getCurrentUser(req);
+    if (!user) {
+      return NextResponse.json({ error: "Not authenticated" }, { status: 401 });
+    }
+
+    const { searchParams } = new URL(req.url);
+    const format = parseExportFormat(searchParams.get('format'));
+    const from = searchParams.get('from');
+    const to = searchParams.get('to');
+    const type = searchParams.get('type');
+    const status = searchParams.get('status');
+    const user_id = searchParams.get('user_id');
+
+    if (!format) {
+      return NextResponse.json({ error: "format must be csv or ndjson" }, { status: 400 });
+    }
+
+    if ((from && isNaN(Date.parse(from))) || (to && isNaN(Date.parse(to)))) {
+      return NextResponse.json({ error: "from and to must be ISO dates" }, { status: 400 });
+    }
+
+    // Users can only export their own transactions; admins can export all
+    const ownerId = user.role === 'admin' ? user_id : user.userId;
+
+    const pages = walkKeyset<TransactionExportRow>((after, limit) => {
+      let query = supabase
+        .from('transactions')
+        .select(`
+          id, created_at, type, status, amount, description, external_transaction_id,
+          user_id, project_id, milestone_id, escrow_id,
+          user:users(email),
+          project:projects(title),
+          milestone:milestones(title),
+          escrow:escrows(external_escrow_id)
+        `)
+        .order('created_at', { ascending: true })
+        .order('id', { ascending: true })
+        .limit(limit);
+
+      if (ownerId) query = query.eq('user_id', ownerId);
+      if (type) query = query.eq('type', type);
+      if (status) query = query.eq('status', status);
+      if (from) query = query.gte('created_at', from);
+      if (to) query = query.lt('created_at', to);
+      if (after) query = query.gte('created_at', after.created_at).or(keysetAfterFilter(after));
+
+      return query;
+    });
+
+    return exportResponse({
+      format,
+      filename: `transactions-${new Date().toISOString().slice(0, 10)}`,
+      columns: COLUMNS,
+      pages,
+    });
+
+  } catch (error) {
+    console.error('Transactions export API error:', error);
+    return NextResponse.json({ error: "Internal server error" }, { status: 500 });
+  }
+});
@@ -1,9 +1,11 @@
 import { NextRequest, NextResponse } from "next/server";
 import { getCurrentUser } from "@/lib/auth";
 import { supabase } from "@/app/lib/supabase";
+import { getUserBalance } from "@/lib/ledger-balances";
+import { withServerTiming } from "@/lib/request-timing";
 
 // GET /api/transactions - List transactions (role-based filtering)
-export async function GET(req: NextRequest) {
+export const GET = withServerTiming(async function GET(req: NextRequest) {
   try {
     const user = await getCurrentUser();
     if (!user) {
@@ -50,28 +52,18 @@ export async function GET(req: NextRequest) {
       return NextResponse.json({ error: "Failed to fetch transactions" }, { status: 500 });
     }
 
-    // Calculate summary stats for the user
+    // Summary stats for the user, from the balance projection
     let summary = null;
     if (user.role !== 'admin') {
-      const { data: userTransactions } = await supabase
-        .from('transactions')
-        .select('type, amount, status')
-        .eq('user_id', user.userId)
-        .eq('status', 'completed');
-
-      if (userTransactions) {
-        summary = {
-          total_earned: userTransactions
-            .filter(t => t.type === 'escrow_release')
-            .reduce((sum, t) => sum + t.amount, 0),
-          total_paid: userTransactions
-            .filter(t => t.type === 'escrow_fund')
-            .reduce((sum, t) => sum + t.amount, 0),
-          total_refunded: userTransactions
-            .filter(t => t.type === 'escrow_refund')
-            .reduce((sum, t) => sum + t.amount, 0)
-        };
-      }
+      const balance = await getUserBalance(user.userId);
+      summary = {
+        total_earned: balance.lifetime_earned,
+        total_paid: balance.lifetime_funded,
+        total_refunded: balance.lifetime_refunded,
+        available: balance.available,
+        in_escrow: balance.in_escrow,
+        total_spent: balance.lifetime_spent
+      };
     }
 
     return NextResponse.json({ transactions, summary });
@@ -80,4 +72,4 @@ export async function GET(req: NextRequest) {
     console.error('Transactions API error:', error);
     return NextResponse.json({ error: "Internal server error" }, { status: 500 });
   }
-}
\ No newline at end of file
+});
\ No newline at end of file
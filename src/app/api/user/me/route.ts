@@ -1,7 +1,8 @@
 import { NextResponse } from "next/server";
 import { getCurrentUserWithFreshData } from "@/lib/auth";
+import { withServerTiming } from "@/lib/request-timing";
 
-export async function GET() {
+export const GET = withServerTiming(async function GET() {
   try {
     const userData = await getCurrentUserWithFreshData();
     
@@ -14,4 +15,4 @@ export async function GET() {
     console.error("Get user info error:", error);
     return NextResponse.json({ error: "Failed to get user info" }, { status: 500 });
   }
-}
\ No newline at end of file
+});
\ No newline at end of file
@@ -1,8 +1,11 @@
 import { NextResponse } from "next/server";
 import { getCurrentUser } from "@/lib/auth";
 import { supabase } from "@/app/lib/supabase";
+import { createSessionToken, setSessionCookie } from "@/lib/session";
+import { invalidateUserProfile } from "@/lib/user-profile-cache";
+import { withServerTiming } from "@/lib/request-timing";
 
-export async function POST(req: Request) {
+export const POST = withServerTiming(async function POST(req: Request) {
   try {
     const user = await getCurrentUser();
     
@@ -35,7 +38,9 @@ export async function POST(req: Request) {
       return NextResponse.json({ error: "Failed to update role" }, { status: 500 });
     }
 
-    return NextResponse.json({ 
+    invalidateUserProfile(user.userId);
+
+    const res = NextResponse.json({ 
       ok: true, 
       user: { 
         id: data.id, 
@@ -45,8 +50,14 @@ export async function POST(req: Request) {
       } 
     });
 
+    // Reissue the session so routes reading the token's claims see the new role
+    const token = await createSessionToken({ userId: data.id, email: data.email, role: data.role });
+    setSessionCookie(res, token);
+
+    return res;
+
   } catch (error) {
     console.error("Update role error:", error);
     return NextResponse.json({ error: "Failed to update role" }, { status: 500 });
   }
-}
\ No newline at end of file
+});
\ No newline at end of file
@@ -96,9 +96,9 @@ export default function AdminDashboard() {
 
   const fetchUserInfo = useCallback(async () => {
     try {
-      const res = await fetch('/api/user/me');
+      const res = await fetch('/api/dashboard/bootstrap');
       if (res.ok) {
-        const userData = await res.json();
+        const { user: userData } = await res.json();
         setUser(userData);
         // Ensure user is an admin
         if (userData.role !== 'admin') {
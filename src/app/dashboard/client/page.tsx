@@ -72,9 +72,9 @@ export default function ClientDashboard() {
 
   const fetchUserInfo = useCallback(async () => {
     try {
-      const res = await fetch('/api/user/me');
+      const res = await fetch('/api/dashboard/bootstrap');
       if (res.ok) {
-        const userData = await res.json();
+        const { user: userData } = await res.json();
         setUser(userData);
         // Ensure user is a client
         if (userData.role !== 'client') {
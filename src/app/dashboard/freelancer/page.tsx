@@ -80,9 +80,9 @@ export default function FreelancerDashboard() {
 
   const fetchUserInfo = useCallback(async () => {
     try {
-      const res = await fetch('/api/user/me');
+      const res = await fetch('/api/dashboard/bootstrap');
       if (res.ok) {
-        const userData = await res.json();
+        const { user: userData } = await res.json();
         setUser(userData);
         // Ensure user is a freelancer
         if (userData.role !== 'freelancer') {
@@ -104,8 +104,9 @@ export default function GeneralDashboard() {
               <Button
                 variant="outline"
                 size="sm"
-                onClick={() => {
-                  document.cookie = 'auth-token=; Max-Age=0; path=/';
+                onClick={async () => {
+                  // The session cookie is httpOnly, so only the server can clear it
+                  await fetch('/api/logout', { method: 'POST' });
                   router.push('/login');
                 }}
               >
@@ -1,4 +1,5 @@
 import { createClient } from "@supabase/supabase-js";
+import { timedFetch } from "@/lib/request-timing";
 
 // Use service role key for server-side operations
 const supabaseUrl = process.env.NEXT_PUBLIC_SUPABASE_URL!;
@@ -8,5 +9,9 @@ export const supabase = createClient(supabaseUrl, supabaseServiceKey, {
   auth: {
     autoRefreshToken: false,
     persistSession: false
+  },
+  // Records per-call timings for Server-Timing and the latency histograms
+  global: {
+    fetch: timedFetch
   }
 });
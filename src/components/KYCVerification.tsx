@@ -15,6 +15,57 @@ interface KYCVerificationProps {
   onClose?: () => void;
 }
 
+const MAX_CHUNK_RETRIES = 3;
+
+// Send the document through the resumable upload API. A failed chunk is retried
+// from the offset the server last acknowledged instead of restarting the file.
+async function uploadInChunks(file: File, aadhaarNumber: string) {
+  const sessionResponse = await fetch('/api/kyc/uploads', {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json' },
+    body: JSON.stringify({ aadhaarNumber, size: file.size }),
+  });
+  const session = await sessionResponse.json();
+  if (!session.success) return session;
+
+  const { uploadId, chunkSize } = session.data;
+  let offset = session.data.offset;
+  let retries = 0;
+
+  while (true) {
+    try {
+      const response = await fetch(`/api/kyc/uploads/${uploadId}`, {
+        method: 'PATCH',
+        headers: { 'Upload-Offset': String(offset) },
+        body: file.slice(offset, Math.min(offset + chunkSize, file.size)),
+      });
+      const data = await response.json();
+
+      if (data.success) {
+        if (data.data.complete) return data;
+        offset = data.data.offset;
+        retries = 0;
+        continue;
+      }
+
+      // Out of sync with the server: continue from its offset
+      if (response.status === 409 && typeof data.offset === 'number' && retries++ < MAX_CHUNK_RETRIES) {
+        offset = data.offset;
+        continue;
+      }
+
+      return data;
+    } catch (error) {
+      if (retries++ >= MAX_CHUNK_RETRIES) throw error;
+
+      const statusResponse = await fetch(`/api/kyc/uploads/${uploadId}`);
+      const status = await statusResponse.json();
+      if (!status.success) return status;
+      offset = status.data.offset;
+    }
+  }
+}
+
 export default function KYCVerification({ onClose }: KYCVerificationProps) {
   const [kycStatus, setKycStatus] = useState<KYCStatus>({ status: 'not_submitted' });
   const [aadhaarNumber, setAadhaarNumber] = useState('');
@@ -80,16 +131,7 @@ export default function KYCVerification({ onClose }: KYCVerificationProps) {
     }
 
     try {
-      const formData = new FormData();
-      formData.append('aadhaar', aadhaarFile);
-      formData.append('aadhaarNumber', aadhaarNumber);
-
-      const response = await fetch('/api/kyc/upload', {
-        method: 'POST',
-        body: formData,
-      });
-
-      const data = await response.json();
+      const data = await uploadInChunks(aadhaarFile, aadhaarNumber);
 
       if (data.success) {
         setSuccess('KYC documents submitted successfully! We will review your documents within 24-48 hours.');
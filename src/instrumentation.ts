@@ -0,0 +1,24 @@
+// Next.js server startup hook
+export async function register() {
+  if (process.env.NEXT_RUNTIME === 'nodejs') {
+    // Resume processing any webhook events persisted before the last restart
+    const { escrowWebhookWorker } = await import('@/lib/escrow-webhook-inbox');
+    escrowWebhookWorker.start();
+
+    // Pick up KYC documents submitted while the server was down
+    const { kycProcessingWorker } = await import('@/lib/kyc-processing');
+    kycProcessingWorker.start();
+
+    // Keep upcoming audit_events partitions created ahead of writes
+    const { auditPartitionMaintainer } = await import('@/lib/audit-partitions');
+    auditPartitionMaintainer.start();
+
+    // Replay audit events spooled to disk when the database was unavailable
+    const { auditWriter } = await import('@/lib/audit-log');
+    auditWriter.start();
+
+    // Periodically compare balance projections against the ledger
+    const { ledgerDriftChecker } = await import('@/lib/ledger-balances');
+    ledgerDriftChecker.start();
+  }
+}
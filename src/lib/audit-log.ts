@@ -0,0 +1,300 @@
+// Shared audit event writer
+// Routes hand audit events to enqueue(), which returns immediately; events are
+// buffered in process and written with one multi-row insert every
+// FLUSH_INTERVAL or as soon as BATCH_SIZE are waiting. A batch that fails to
+// insert is spooled to local disk (AUDIT_SPOOL_DIR, default .audit-spool) and
+// replayed later (rows the database rejects are set aside in a dead-letter
+// directory), and whatever is still buffered when the process exits is
+// spooled synchronously. Every event gets its id and timestamp up front, so a
+// replayed batch that was in fact written is skipped rather than duplicated.
+//
+// Use write() instead when the caller must not proceed unless the event is
+// stored (e.g. webhook processing, which retries on failure). Writes that must
+// commit together with business rows belong in the same plpgsql function, as
+// transition_milestone and create_milestones_with_escrows do.
+import { randomUUID } from 'crypto';
+import fs from 'fs';
+import path from 'path';
+import { supabase } from '@/app/lib/supabase';
+import { outsideRequest } from '@/lib/request-timing';
+
+export interface AuditEvent {
+  event_type: string;
+  user_id?: string | null;
+  project_id?: string | null;
+  milestone_id?: string | null;
+  escrow_id?: string | null;
+  dispute_id?: string | null;
+  data?: object;
+  ip_address?: string | null;
+  user_agent?: string | null;
+}
+
+interface AuditRow extends AuditEvent {
+  id: string;
+  created_at: string;
+}
+
+export interface AuditWriterStats {
+  buffered: number;
+  written: number;
+  spooled: number;
+  replayed: number;
+  deadLettered: number;
+  failedFlushes: number;
+}
+
+// Rows the database rejected are kept here, under the spool directory, for
+// someone to inspect; they are never replayed automatically
+const DEAD_LETTER_DIR = 'dead-letter';
+
+// Errors caused by the row itself (invalid data, constraint violations,
+// unknown columns) rather than by the database being unavailable: retrying
+// the same row cannot succeed
+function isRejectedRow(error: { code?: string }): boolean {
+  return /^(22|23|42)/.test(error.code ?? '');
+}
+
+class AuditWriter {
+  private readonly FLUSH_INTERVAL = Number(process.env.AUDIT_FLUSH_INTERVAL_MS || 200);
+  private readonly BATCH_SIZE = 500;
+  private readonly REPLAY_INTERVAL = 60 * 1000; // retry spooled batches every minute
+  private readonly spoolDir = process.env.AUDIT_SPOOL_DIR || '.audit-spool';
+
+  private buffer: AuditRow[] = [];
+  private flushTimer: ReturnType<typeof setTimeout> | null = null;
+  private replayTimer: ReturnType<typeof setInterval> | null = null;
+  private flushing: Promise<void> | null = null;
+  private replaying = false;
+  private exitHookInstalled = false;
+
+  private written = 0;
+  private spooled = 0;
+  private replayed = 0;
+  private deadLettered = 0;
+  private failedFlushes = 0;
+
+  // Buffer an event for the next batch insert. Never throws.
+  enqueue(event: AuditEvent): void {
+    this.installExitHook();
+    this.buffer.push(this.toRow(event));
+
+    // The batch is shared by every request that enqueued into it, so neither
+    // the flush nor its timer belongs to the one that happened to trigger it
+    if (this.buffer.length >= this.BATCH_SIZE) {
+      outsideRequest(() => void this.flush());
+    } else if (!this.flushTimer) {
+      this.flushTimer = outsideRequest(() => setTimeout(() => {
+        this.flushTimer = null;
+        void this.flush();
+      }, this.FLUSH_INTERVAL));
+      this.flushTimer.unref?.();
+    }
+  }
+
+  // Insert an event now, throwing if it cannot be stored. Callers that may
+  // write the same event again (retries) pass a fixed (id, created_at): the
+  // repeat is then skipped instead of stored twice.
+  async write(event: AuditEvent, key?: Pick<AuditRow, 'id' | 'created_at'>): Promise<void> {
+    const { error } = key
+      ? await supabase
+          .from('audit_events')
+          .upsert({ ...this.toRow(event), ...key }, { onConflict: 'id,created_at', ignoreDuplicates: true })
+      : await supabase.from('audit_events').insert(this.toRow(event));
+
+    if (error) {
+      throw new Error(`Failed to record audit event: ${error.message}`);
+    }
+
+    this.written++;
+  }
+
+  // Write everything buffered so far. Resolves once the events are stored or
+  // spooled; never rejects.
+  async flush(): Promise<void> {
+    if (this.flushTimer) {
+      clearTimeout(this.flushTimer);
+      this.flushTimer = null;
+    }
+
+    // One insert in flight at a time keeps batches large under load
+    while (this.flushing) {
+      await this.flushing;
+    }
+
+    if (this.buffer.length === 0) return;
+
+    this.flushing = (async () => {
+      while (this.buffer.length > 0) {
+        const batch = this.buffer.splice(0, this.BATCH_SIZE);
+        await this.insertOrSpool(batch);
+      }
+    })();
+
+    try {
+      await this.flushing;
+    } finally {
+      this.flushing = null;
+    }
+  }
+
+  // Replay spooled batches now and periodically. Safe to call more than once.
+  start(): void {
+    this.installExitHook();
+    if (this.replayTimer) return;
+
+    this.replayTimer = outsideRequest(() => {
+      void this.replaySpool();
+      return setInterval(() => {
+        void this.replaySpool();
+      }, this.REPLAY_INTERVAL);
+    });
+    this.replayTimer.unref?.();
+  }
+
+  stop(): void {
+    if (this.replayTimer) {
+      clearInterval(this.replayTimer);
+      this.replayTimer = null;
+    }
+  }
+
+  getStats(): AuditWriterStats {
+    return {
+      buffered: this.buffer.length,
+      written: this.written,
+      spooled: this.spooled,
+      replayed: this.replayed,
+      deadLettered: this.deadLettered,
+      failedFlushes: this.failedFlushes,
+    };
+  }
+
+  private toRow(event: AuditEvent): AuditRow {
+    return {
+      ...event,
+      data: event.data ?? {},
+      id: randomUUID(),
+      created_at: new Date().toISOString(),
+    };
+  }
+
+  private async insertOrSpool(batch: AuditRow[]): Promise<void> {
+    const { error } = await supabase.from('audit_events').insert(batch);
+
+    if (!error) {
+      this.written += batch.length;
+      return;
+    }
+
+    this.failedFlushes++;
+    console.error(`Audit batch of ${batch.length} failed, spooling to disk:`, error.message);
+    this.spool(batch);
+  }
+
+  private spool(batch: AuditRow[]): void {
+    try {
+      fs.mkdirSync(this.spoolDir, { recursive: true });
+      const file = path.join(this.spoolDir, `${Date.now()}-${process.pid}-${randomUUID()}.ndjson`);
+      fs.writeFileSync(file, batch.map(row => JSON.stringify(row)).join('\n') + '\n');
+      this.spooled += batch.length;
+    } catch (error) {
+      console.error(`Failed to spool ${batch.length} audit events, dropping them:`, error, batch);
+    }
+  }
+
+  private async replaySpool(): Promise<void> {
+    if (this.replaying) return;
+    this.replaying = true;
+
+    try {
+      const files = await fs.promises.readdir(this.spoolDir).catch(() => [] as string[]);
+
+      for (const name of files.filter(file => file.endsWith('.ndjson')).sort()) {
+        try {
+          await this.replaySpoolFile(name);
+        } catch (error) {
+          console.error(`Audit spool replay error for ${name}:`, error);
+        }
+      }
+    } finally {
+      this.replaying = false;
+    }
+  }
+
+  // Replay one spool file. If the batch insert fails, the rows are retried one
+  // at a time: rows the database rejects outright are moved to the dead-letter
+  // directory, and the first failure of any other kind leaves the remaining
+  // rows in the file for the next replay. One bad row no longer holds back the
+  // rest of its file or the files after it.
+  private async replaySpoolFile(name: string): Promise<void> {
+    const file = path.join(this.spoolDir, name);
+    const rows = (await fs.promises.readFile(file, 'utf8'))
+      .split('\n')
+      .filter(Boolean)
+      .map(line => JSON.parse(line) as AuditRow);
+
+    // Rows from a batch that was stored before the failure was reported
+    // already exist under the same (id, created_at)
+    const { error } = await this.upsertRows(rows);
+
+    if (!error) {
+      await fs.promises.rm(file);
+      this.replayed += rows.length;
+      return;
+    }
+
+    console.error(`Audit spool replay failed for ${name}, retrying row by row:`, error.message);
+
+    const retry: AuditRow[] = [];
+    const dead: AuditRow[] = [];
+
+    for (const [index, row] of rows.entries()) {
+      const { error: rowError } = await this.upsertRows([row]);
+      if (!rowError) {
+        this.replayed++;
+      } else if (isRejectedRow(rowError)) {
+        console.error(`Audit event ${row.id} rejected, moving it to the dead-letter directory:`, rowError.message);
+        dead.push(row);
+      } else {
+        // Most likely the database is unreachable; keep the rest for later
+        retry.push(...rows.slice(index));
+        break;
+      }
+    }
+
+    if (dead.length > 0) {
+      const deadDir = path.join(this.spoolDir, DEAD_LETTER_DIR);
+      await fs.promises.mkdir(deadDir, { recursive: true });
+      await fs.promises.appendFile(path.join(deadDir, name), dead.map(row => JSON.stringify(row)).join('\n') + '\n');
+      this.deadLettered += dead.length;
+    }
+
+    if (retry.length > 0) {
+      await fs.promises.writeFile(file, retry.map(row => JSON.stringify(row)).join('\n') + '\n');
+    } else {
+      await fs.promises.rm(file);
+    }
+  }
+
+  private upsertRows(rows: AuditRow[]) {
+    return supabase
+      .from('audit_events')
+      .upsert(rows, { onConflict: 'id,created_at', ignoreDuplicates: true });
+  }
+
+  // Spool whatever is still buffered when the process exits. Only synchronous
+  // work runs in an 'exit' listener, which is all spool() does.
+  private installExitHook(): void {
+    if (this.exitHookInstalled) return;
+    this.exitHookInstalled = true;
+
+    process.once('exit', () => {
+      if (this.buffer.length > 0) {
+        this.spool(this.buffer.splice(0));
+      }
+    });
+  }
+}
+
+export const auditWriter = new AuditWriter();
@@ -0,0 +1,168 @@
+// audit_events partition maintenance and archival
+// audit_events is partitioned by UTC month (migration 016). The maintainer
+// keeps the next few monthly partitions created ahead of writes; cold months
+// are exported to gzipped NDJSON and dropped by scripts/archive-audit-events.ts.
+import fs from 'fs';
+import path from 'path';
+import { Readable } from 'stream';
+import { pipeline } from 'stream/promises';
+import { createGzip } from 'zlib';
+import { supabase } from '@/app/lib/supabase';
+import { keysetAfterFilter, walkKeyset, type KeysetCursor } from '@/lib/cursor';
+
+const ARCHIVE_PAGE_SIZE = 1000;
+
+export interface AuditPartition {
+  partition_name: string;
+  range_start: string;
+  range_end: string;
+}
+
+type AuditEventRow = KeysetCursor & Record<string, unknown>;
+
+export interface AuditPartitionArchive {
+  partition: string;
+  file: string;
+  rows: number;
+  bytes: number;
+}
+
+export async function ensureAuditPartitions(monthsAhead = 3): Promise<string[]> {
+  const { data, error } = await supabase.rpc('ensure_audit_event_partitions', { p_months_ahead: monthsAhead });
+
+  if (error) {
+    throw new Error(`Failed to create audit partitions: ${error.message}`);
+  }
+
+  return (data as string[] | null) ?? [];
+}
+
+export async function listAuditPartitions(): Promise<AuditPartition[]> {
+  const { data, error } = await supabase.rpc('list_audit_event_partitions');
+
+  if (error) {
+    throw new Error(`Failed to list audit partitions: ${error.message}`);
+  }
+
+  return (data as AuditPartition[] | null) ?? [];
+}
+
+// Monthly partitions that ended more than `retentionMonths` months ago
+export async function listColdAuditPartitions(retentionMonths: number, now = new Date()): Promise<AuditPartition[]> {
+  const cutoff = new Date(Date.UTC(now.getUTCFullYear(), now.getUTCMonth() - retentionMonths, 1));
+  const partitions = await listAuditPartitions();
+  return partitions.filter(partition => new Date(partition.range_end) <= cutoff);
+}
+
+async function countAuditEvents(from: string, to: string): Promise<number> {
+  const { count, error } = await supabase
+    .from('audit_events')
+    .select('id', { count: 'exact', head: true })
+    .gte('created_at', from)
+    .lt('created_at', to);
+
+  if (error) {
+    throw new Error(`Failed to count audit events: ${error.message}`);
+  }
+
+  return count ?? 0;
+}
+
+// Every event in [from, to), oldest first, one partition-local index range
+// scan per page
+function auditEventPages(from: string, to: string) {
+  return walkKeyset<AuditEventRow>((after, limit) => {
+    let query = supabase
+      .from('audit_events')
+      .select('*')
+      .gte('created_at', from)
+      .lt('created_at', to)
+      .order('created_at', { ascending: true })
+      .order('id', { ascending: true })
+      .limit(limit);
+
+    if (after) {
+      query = query.gte('created_at', after.created_at).or(keysetAfterFilter(after));
+    }
+
+    return query;
+  }, ARCHIVE_PAGE_SIZE);
+}
+
+// Export one partition to <dir>/<partition>.ndjson.gz. The file is written
+// under a temporary name and only renamed into place once the exported row
+// count matches the partition's, so a present archive file is complete.
+export async function archiveAuditPartition(partition: AuditPartition, dir: string): Promise<AuditPartitionArchive> {
+  const file = path.join(dir, `${partition.partition_name}.ndjson.gz`);
+  const partial = `${file}.partial`;
+  let rows = 0;
+
+  await fs.promises.mkdir(dir, { recursive: true });
+
+  async function* lines() {
+    for await (const page of auditEventPages(partition.range_start, partition.range_end)) {
+      rows += page.length;
+      yield page.map(row => JSON.stringify(row)).join('\n') + '\n';
+    }
+  }
+
+  await pipeline(Readable.from(lines()), createGzip({ level: 9 }), fs.createWriteStream(partial));
+
+  const expected = await countAuditEvents(partition.range_start, partition.range_end);
+  if (rows !== expected) {
+    await fs.promises.rm(partial, { force: true });
+    throw new Error(`Exported ${rows} of ${expected} events from ${partition.partition_name}`);
+  }
+
+  await fs.promises.rename(partial, file);
+  const { size } = await fs.promises.stat(file);
+
+  return { partition: partition.partition_name, file, rows, bytes: size };
+}
+
+export async function dropAuditPartition(partition: string): Promise<void> {
+  const { error } = await supabase.rpc('drop_audit_event_partition', { p_partition: partition });
+
+  if (error) {
+    throw new Error(`Failed to drop ${partition}: ${error.message}`);
+  }
+}
+
+class AuditPartitionMaintainer {
+  private readonly INTERVAL = 6 * 60 * 60 * 1000; // 6 hours
+  private readonly MONTHS_AHEAD = 3;
+
+  private timer: ReturnType<typeof setInterval> | null = null;
+
+  // Create upcoming partitions now and periodically. Safe to call more than once.
+  start(): void {
+    if (this.timer) return;
+
+    void this.run();
+    this.timer = setInterval(() => {
+      void this.run();
+    }, this.INTERVAL);
+    this.timer.unref?.();
+  }
+
+  stop(): void {
+    if (this.timer) {
+      clearInterval(this.timer);
+      this.timer = null;
+    }
+  }
+
+  private async run(): Promise<void> {
+    try {
+      const created = await ensureAuditPartitions(this.MONTHS_AHEAD);
+      if (created.length > 0) {
+        console.log(`Created audit_events partitions: ${created.join(', ')}`);
+      }
+    } catch (error) {
+      // Writes still succeed into the default partition meanwhile
+      console.error('Audit partition maintenance error:', error);
+    }
+  }
+}
+
+export const auditPartitionMaintainer = new AuditPartitionMaintainer();
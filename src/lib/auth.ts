@@ -1,25 +1,38 @@
-import { verifyJwt } from './jwt';
-import { cookies } from 'next/headers';
+import type { NextRequest } from 'next/server';
+import { getSession, verifySessionToken } from './session';
+import { getUserProfile } from './user-profile-cache';
 
 export async function verifyToken(token: string) {
-  return await verifyJwt(token);
+  return await verifySessionToken(token);
 }
 
-export async function getCurrentUser() {
+// Claims of the signed-in user, resolved once per request (see ./session)
+export async function getCurrentUser(request?: NextRequest) {
+  return await getSession(request);
+}
+
+// Session claims overlaid with the user's current role and KYC state, served
+// from the profile cache (see ./user-profile-cache). Returns null when the
+// session is invalid or the user no longer exists.
+export async function getCurrentUserWithFreshData(request?: NextRequest) {
+  const user = await getCurrentUser(request);
+  if (!user) return null;
+
   try {
-    const cookieStore = await cookies();
-    const token = cookieStore.get('auth-token')?.value;
-    
-    if (!token) return null;
-    
-    return await verifyJwt(token);
-  } catch {
-    return null;
+    const profile = await getUserProfile(user.userId);
+    if (!profile) return null;
+
+    return {
+      ...user,
+      email: profile.email,
+      role: profile.role,
+      kyc_status: profile.kyc_status ?? undefined,
+      email_verified: profile.email_verified ?? undefined,
+      skills: profile.skills ?? [],
+    };
+  } catch (error) {
+    // Fall back to the token's claims rather than failing the request
+    console.error('Failed to load fresh user data:', error);
+    return user;
   }
 }
-
-export async function getCurrentUserWithFreshData() {
-  // For now, return the same as getCurrentUser
-  // This can be extended later to fetch fresh data from database
-  return await getCurrentUser();
-}
\ No newline at end of file
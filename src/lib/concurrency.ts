@@ -0,0 +1,39 @@
+// Small helpers for running async work with a bounded number of in-flight tasks
+
+// Map over items with at most `limit` calls to `fn` running at once.
+// Results keep the order of the input; a rejected task rejects the whole call.
+export async function mapWithConcurrency<T, R>(
+  items: T[],
+  limit: number,
+  fn: (item: T, index: number) => Promise<R>
+): Promise<R[]> {
+  const results = new Array<R>(items.length);
+  let next = 0;
+
+  const worker = async () => {
+    while (next < items.length) {
+      const index = next++;
+      results[index] = await fn(items[index], index);
+    }
+  };
+
+  const workers = Array.from({ length: Math.max(1, Math.min(limit, items.length)) }, worker);
+  await Promise.all(workers);
+
+  return results;
+}
+
+// Like mapWithConcurrency, but never rejects: each item settles independently.
+export async function settleWithConcurrency<T, R>(
+  items: T[],
+  limit: number,
+  fn: (item: T, index: number) => Promise<R>
+): Promise<PromiseSettledResult<R>[]> {
+  return mapWithConcurrency(items, limit, async (item, index) => {
+    try {
+      return { status: 'fulfilled', value: await fn(item, index) } as PromiseFulfilledResult<R>;
+    } catch (reason) {
+      return { status: 'rejected', reason } as PromiseRejectedResult;
+    }
+  });
+}
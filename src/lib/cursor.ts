@@ -0,0 +1,73 @@
+// Opaque keyset pagination cursors
+// A cursor is the (created_at, id) of the last row on a page, encoded so
+// clients pass it back verbatim as ?cursor=...
+
+export interface KeysetCursor {
+  created_at: string;
+  id: string;
+}
+
+export function encodeCursor(row: KeysetCursor): string {
+  return Buffer.from(JSON.stringify([row.created_at, row.id])).toString('base64url');
+}
+
+// Both values end up inside PostgREST filter strings, so a cursor is only
+// accepted when they are exactly a UUID and an ISO 8601 timestamp
+const UUID_PATTERN = /^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$/i;
+const TIMESTAMP_PATTERN = /^\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}:\d{2}(\.\d{1,6})?(Z|[+-]\d{2}(:?\d{2})?)?$/;
+
+// Returns null for a missing or malformed cursor
+export function decodeCursor(cursor: string | null): KeysetCursor | null {
+  if (!cursor) return null;
+
+  try {
+    const [created_at, id] = JSON.parse(Buffer.from(cursor, 'base64url').toString('utf8'));
+    if (
+      typeof created_at !== 'string' || !TIMESTAMP_PATTERN.test(created_at) || isNaN(Date.parse(created_at)) ||
+      typeof id !== 'string' || !UUID_PATTERN.test(id)
+    ) {
+      return null;
+    }
+    return { created_at, id };
+  } catch {
+    return null;
+  }
+}
+
+// Cursor for the page after `rows`, or null when this was the last page
+export function nextCursor<T extends KeysetCursor>(rows: T[], limit: number): string | null {
+  return rows.length === limit ? encodeCursor(rows[rows.length - 1]) : null;
+}
+
+// PostgREST filter for rows after `cursor` in ascending (created_at, id) order.
+// An OR is not an index bound, so pair it with .gte('created_at', cursor.created_at)
+// to have the scan start at the cursor instead of filtering from the beginning.
+export function keysetAfterFilter(cursor: KeysetCursor): string {
+  return `created_at.gt."${cursor.created_at}",and(created_at.eq."${cursor.created_at}",id.gt.${cursor.id})`;
+}
+
+type KeysetPage<T> = PromiseLike<{ data: T[] | null; error: { message: string } | null }>;
+
+// Walk a result set page by page. `fetchPage` runs the query for the rows
+// after `after` (null for the first page) ordered by (created_at, id); each
+// page is a fresh index range scan, so cost does not grow with depth.
+export async function* walkKeyset<T extends KeysetCursor>(
+  fetchPage: (after: KeysetCursor | null, limit: number) => KeysetPage<T>,
+  pageSize = 1000
+): AsyncGenerator<T[]> {
+  let after: KeysetCursor | null = null;
+
+  while (true) {
+    const { data, error } = await fetchPage(after, pageSize);
+    if (error) {
+      throw new Error(`Keyset page query failed: ${error.message}`);
+    }
+
+    if (!data || data.length === 0) return;
+    yield data;
+
+    if (data.length < pageSize) return;
+    const last = data[data.length - 1];
+    after = { created_at: last.created_at, id: last.id };
+  }
+}
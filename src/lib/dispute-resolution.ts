@@ -0,0 +1,192 @@
+// Dispute resolution shared by the single and batch resolve endpoints
+import { supabase } from '@/app/lib/supabase';
+import { escrowService } from '@/lib/mock-escrow';
+import { settleWithConcurrency } from '@/lib/concurrency';
+import { checkTransition, MILESTONE_TRANSITIONS, revertTransition, type MilestoneAction } from '@/lib/escrow-state-machine';
+import type { Dispute, Escrow, Milestone } from '@/types/db';
+
+export type DisputeResolution = NonNullable<Dispute['resolution']>;
+
+export const DISPUTE_RESOLUTIONS: DisputeResolution[] = ['release_funds', 'refund_client', 'partial_release'];
+export const MAX_DISPUTES_PER_BATCH = 200;
+// Same as the state machine's dispute precondition and claim_dispute_resolutions
+export const RESOLVABLE_DISPUTE_STATUSES: Dispute['status'][] = ['open', 'under_review'];
+const ESCROW_CONCURRENCY = Number(process.env.DISPUTE_RESOLUTION_CONCURRENCY || 8);
+
+export function resolutionAction(resolution: DisputeResolution): MilestoneAction {
+  return resolution === 'refund_client' ? 'resolve_refund' : 'resolve_release';
+}
+
+// Move the escrowed funds for a resolution through the escrow service
+export function executeDisputeResolution(
+  resolution: DisputeResolution,
+  externalEscrowId: string,
+  milestoneAmount: number,
+  adminNotes?: string
+): Promise<{ success: boolean }> {
+  switch (resolution) {
+    case 'refund_client':
+      return escrowService.refundToClient(
+        externalEscrowId,
+        undefined,
+        `Admin dispute resolution: ${adminNotes || 'Dispute resolved in favor of client'}`
+      );
+    case 'partial_release':
+      // Split funds between client and freelancer based on admin decision
+      // The remaining would be refunded (handled by the escrow service)
+      return escrowService.releaseToFreelancer(externalEscrowId, milestoneAmount / 2);
+    default:
+      return escrowService.releaseToFreelancer(externalEscrowId);
+  }
+}
+
+export interface DisputeResolutionItem {
+  dispute_id: string;
+  resolution: DisputeResolution;
+  admin_notes?: string;
+}
+
+export interface DisputeResolutionOutcome {
+  dispute_id: string;
+  status: 'resolved' | 'not_found' | 'invalid_state' | 'conflict' | 'failed';
+  error?: string;
+}
+
+interface ClaimRow {
+  dispute_id: string;
+  applied: boolean;
+  dispute_version: number;
+  milestone_version: number;
+  escrow_version: number;
+}
+
+// Resolve many disputes at once: one read for all disputes, one set-based
+// claim, then the escrow operations with bounded concurrency. Claims whose
+// escrow operation fails are reverted individually.
+export async function resolveDisputes(
+  userId: string,
+  items: DisputeResolutionItem[]
+): Promise<DisputeResolutionOutcome[]> {
+  const { data: disputes, error: fetchError } = await supabase
+    .from('disputes')
+    .select(`
+      id, status, version, milestone_id,
+      milestone:milestones(id, status, version, amount, project_id, escrows(id, status, version, external_escrow_id))
+    `)
+    .in('id', items.map(item => item.dispute_id));
+
+  if (fetchError) {
+    throw new Error(`Failed to load disputes: ${fetchError.message}`);
+  }
+
+  const disputesById = new Map((disputes || []).map(dispute => [dispute.id, dispute]));
+  const outcomes = new Map<string, DisputeResolutionOutcome>();
+  const claims = [];
+  const claimedMilestones = new Set<string>();
+
+  for (const item of items) {
+    const dispute = disputesById.get(item.dispute_id);
+    // PostgREST returns to-one embeds as objects
+    const milestone = dispute?.milestone as unknown as {
+      id: string; status: Milestone['status']; version: number; amount: number; project_id: string;
+      escrows: { id: string; status: Escrow['status']; version: number; external_escrow_id: string }[];
+    } | null;
+
+    if (!dispute || !milestone) {
+      outcomes.set(item.dispute_id, { dispute_id: item.dispute_id, status: 'not_found', error: 'Dispute not found' });
+      continue;
+    }
+
+    const escrow = milestone.escrows[0];
+    const action = resolutionAction(item.resolution);
+    const transitionError = !RESOLVABLE_DISPUTE_STATUSES.includes(dispute.status)
+      ? `Cannot resolve dispute in status: ${dispute.status}`
+      : claimedMilestones.has(milestone.id)
+        ? 'Another dispute in this batch resolves the same milestone'
+        : checkTransition(action, milestone.status, escrow?.status);
+
+    if (transitionError) {
+      outcomes.set(item.dispute_id, { dispute_id: item.dispute_id, status: 'invalid_state', error: transitionError });
+      continue;
+    }
+
+    claimedMilestones.add(milestone.id);
+    claims.push({ item, dispute, milestone, escrow, action });
+  }
+
+  if (claims.length > 0) {
+    const { data: claimRows, error: claimError } = await supabase.rpc('claim_dispute_resolutions', {
+      p_user_id: userId,
+      p_items: claims.map(({ item, dispute, milestone, escrow, action }) => ({
+        dispute_id: dispute.id,
+        dispute_version: dispute.version,
+        dispute_status: MILESTONE_TRANSITIONS[action].disputeTo,
+        resolution: item.resolution,
+        admin_notes: item.admin_notes || `Dispute resolved: ${item.resolution}`,
+        milestone_id: milestone.id,
+        milestone_version: milestone.version,
+        milestone_to: MILESTONE_TRANSITIONS[action].milestoneTo,
+        escrow_id: escrow.id,
+        escrow_version: escrow.version,
+      })),
+    });
+
+    if (claimError) {
+      throw new Error(`Failed to claim dispute resolutions: ${claimError.message}`);
+    }
+
+    const claimsById = new Map((claimRows as ClaimRow[]).map(row => [row.dispute_id, row]));
+    const claimed = claims.filter(({ dispute }) => {
+      if (claimsById.get(dispute.id)?.applied) return true;
+      outcomes.set(dispute.id, {
+        dispute_id: dispute.id,
+        status: 'conflict',
+        error: 'The dispute was modified by another request, please retry',
+      });
+      return false;
+    });
+
+    const results = await settleWithConcurrency(claimed, ESCROW_CONCURRENCY, ({ item, milestone, escrow }) =>
+      executeDisputeResolution(item.resolution, escrow.external_escrow_id, milestone.amount, item.admin_notes)
+    );
+
+    await Promise.all(claimed.map(async ({ item, dispute, milestone, escrow, action }, index) => {
+      const result = results[index];
+      if (result.status === 'fulfilled' && result.value.success) {
+        outcomes.set(dispute.id, { dispute_id: dispute.id, status: 'resolved' });
+        return;
+      }
+
+      if (result.status === 'rejected') {
+        console.error(`Escrow resolution error for dispute ${dispute.id}:`, result.reason);
+      }
+
+      const claim = claimsById.get(dispute.id)!;
+      await revertTransition(
+        {
+          action,
+          userId,
+          milestone,
+          escrow,
+          dispute: { id: dispute.id, status: dispute.status, version: dispute.version, resolution: item.resolution },
+          audit: { event_type: 'dispute_resolved', data: {} },
+        },
+        {
+          ok: true,
+          milestoneVersion: claim.milestone_version,
+          escrowVersion: claim.escrow_version,
+          disputeVersion: claim.dispute_version,
+        },
+        result.status === 'rejected' ? 'provider_error' : 'provider_rejected'
+      );
+
+      outcomes.set(dispute.id, {
+        dispute_id: dispute.id,
+        status: 'failed',
+        error: 'Failed to execute resolution in escrow system',
+      });
+    }));
+  }
+
+  return items.map(item => outcomes.get(item.dispute_id)!);
+}
@@ -0,0 +1,240 @@
+// Milestone / escrow state machine
+// Routes that move money claim their transition here before calling the escrow
+// provider. transition_milestone compare-and-sets the milestone, escrow and
+// dispute rows against their version columns and writes the audit event in the
+// same transaction, so two concurrent actions can never both pass the checks.
+import { supabase } from '@/app/lib/supabase';
+import type { Dispute, Escrow, Milestone } from '@/types/db';
+
+export type MilestoneAction = 'fund' | 'release' | 'refund' | 'resolve_release' | 'resolve_refund';
+
+type MilestoneStatus = Milestone['status'];
+type EscrowStatus = Escrow['status'];
+type DisputeStatus = Dispute['status'];
+
+interface TransitionRule {
+  milestoneFrom: MilestoneStatus[];
+  milestoneTo: MilestoneStatus;
+  escrowFrom: EscrowStatus[];
+  disputeTo?: DisputeStatus;
+}
+
+// Milestones that have not been paid out or cancelled yet
+const OPEN_MILESTONE_STATUSES: MilestoneStatus[] = ['pending', 'in_progress', 'submitted', 'approved', 'disputed'];
+
+export const MILESTONE_TRANSITIONS: Record<MilestoneAction, TransitionRule> = {
+  fund: {
+    milestoneFrom: ['pending'],
+    milestoneTo: 'in_progress',
+    escrowFrom: ['created'],
+  },
+  release: {
+    milestoneFrom: ['submitted', 'approved'],
+    milestoneTo: 'paid',
+    escrowFrom: ['funded'],
+  },
+  refund: {
+    milestoneFrom: OPEN_MILESTONE_STATUSES,
+    milestoneTo: 'cancelled',
+    escrowFrom: ['funded'],
+    disputeTo: 'resolved_refund',
+  },
+  resolve_release: {
+    milestoneFrom: OPEN_MILESTONE_STATUSES,
+    milestoneTo: 'paid',
+    escrowFrom: ['funded'],
+    disputeTo: 'resolved_release',
+  },
+  resolve_refund: {
+    milestoneFrom: OPEN_MILESTONE_STATUSES,
+    milestoneTo: 'cancelled',
+    escrowFrom: ['funded'],
+    disputeTo: 'resolved_refund',
+  },
+};
+
+type Versioned<T extends { status: string }> = { id: string; status: T['status']; version: number };
+
+export interface TransitionRequest {
+  action: MilestoneAction;
+  userId: string;
+  milestone: Versioned<Milestone>;
+  escrow: Versioned<Escrow>;
+  // Open dispute closed by this transition, if any
+  dispute?: Versioned<Dispute> & {
+    resolution?: Dispute['resolution'];
+    admin_notes?: string;
+  };
+  audit: { event_type: string; data: Record<string, unknown> };
+}
+
+export interface EntityState {
+  status: string;
+  version: number;
+}
+
+export type TransitionResult =
+  | {
+      ok: true;
+      milestoneVersion: number;
+      escrowVersion: number;
+      disputeVersion: number | null;
+    }
+  | {
+      ok: false;
+      conflict: 'milestone' | 'escrow' | 'dispute';
+      current: { milestone: EntityState | null; escrow: EntityState | null; dispute: EntityState | null };
+    };
+
+// Returns an error message if the rows loaded by the route cannot make the
+// transition, or null when it is allowed. Used for early, friendly 400s; the
+// authoritative check happens in transitionMilestone().
+export function checkTransition(
+  action: MilestoneAction,
+  milestoneStatus: string,
+  escrowStatus: string | undefined
+): string | null {
+  const rule = MILESTONE_TRANSITIONS[action];
+
+  if (!rule.milestoneFrom.includes(milestoneStatus as MilestoneStatus)) {
+    return `Cannot ${action.replace('_', ' ')} milestone in status: ${milestoneStatus}`;
+  }
+
+  if (!escrowStatus || !rule.escrowFrom.includes(escrowStatus as EscrowStatus)) {
+    return `Escrow is in status: ${escrowStatus ?? 'missing'}, cannot ${action.replace('_', ' ')}`;
+  }
+
+  return null;
+}
+
+export async function transitionMilestone(request: TransitionRequest): Promise<TransitionResult> {
+  const rule = MILESTONE_TRANSITIONS[request.action];
+  const { dispute } = request;
+
+  return callTransition({
+    p_milestone_id: request.milestone.id,
+    p_milestone_version: request.milestone.version,
+    p_milestone_from: rule.milestoneFrom,
+    p_milestone_to: rule.milestoneTo,
+    p_escrow_id: request.escrow.id,
+    p_escrow_version: request.escrow.version,
+    p_escrow_from: rule.escrowFrom,
+    p_dispute: dispute && rule.disputeTo
+      ? {
+          id: dispute.id,
+          version: dispute.version,
+          from: ['open', 'under_review'],
+          status: rule.disputeTo,
+          resolution: dispute.resolution ?? null,
+          admin_notes: dispute.admin_notes ?? null,
+          resolved_by: request.userId,
+        }
+      : null,
+    p_audit: { ...request.audit, user_id: request.userId },
+  });
+}
+
+// Undo a claimed transition after the escrow provider rejected the operation.
+// Only succeeds if nothing else has touched the rows since the claim.
+export async function revertTransition(
+  request: TransitionRequest,
+  applied: Extract<TransitionResult, { ok: true }>,
+  reason: string
+): Promise<TransitionResult> {
+  const rule = MILESTONE_TRANSITIONS[request.action];
+  const { dispute } = request;
+
+  const result = await callTransition({
+    p_milestone_id: request.milestone.id,
+    p_milestone_version: applied.milestoneVersion,
+    p_milestone_from: [rule.milestoneTo],
+    p_milestone_to: request.milestone.status,
+    p_escrow_id: request.escrow.id,
+    p_escrow_version: applied.escrowVersion,
+    p_escrow_from: rule.escrowFrom,
+    p_dispute: dispute && rule.disputeTo && applied.disputeVersion !== null
+      ? {
+          id: dispute.id,
+          version: applied.disputeVersion,
+          from: [rule.disputeTo],
+          status: dispute.status,
+          resolution: null,
+          admin_notes: null,
+          resolved_by: null,
+        }
+      : null,
+    p_audit: {
+      event_type: 'escrow_transition_reverted',
+      user_id: request.userId,
+      data: { action: request.action, reason },
+    },
+  });
+
+  if (!result.ok) {
+    console.error(`Failed to revert ${request.action} on milestone ${request.milestone.id}:`, result);
+  }
+
+  return result;
+}
+
+// Claim the transition, run the provider call, and revert the claim if the
+// provider call fails or throws.
+export async function runTransition<T extends { success: boolean }>(
+  request: TransitionRequest,
+  operation: () => Promise<T>
+): Promise<{ transition: TransitionResult; result: T | null }> {
+  const transition = await transitionMilestone(request);
+  if (!transition.ok) {
+    return { transition, result: null };
+  }
+
+  let result: T | null = null;
+  try {
+    result = await operation();
+  } catch (error) {
+    console.error(`Escrow provider error during ${request.action}:`, error);
+  }
+
+  if (!result || !result.success) {
+    await revertTransition(request, transition, result ? 'provider_rejected' : 'provider_error');
+    return { transition, result: null };
+  }
+
+  return { transition, result };
+}
+
+// Shape of a rejected transition for API responses (HTTP 409)
+export function conflictResponseBody(transition: Extract<TransitionResult, { ok: false }>) {
+  return {
+    error: `The ${transition.conflict} was modified by another request, please retry`,
+    conflict: transition.conflict,
+    current: transition.current,
+  };
+}
+
+async function callTransition(params: Record<string, unknown>): Promise<TransitionResult> {
+  const { data, error } = await supabase.rpc('transition_milestone', params);
+
+  if (error) {
+    throw new Error(`Milestone transition failed: ${error.message}`);
+  }
+
+  if (!data.applied) {
+    return {
+      ok: false,
+      conflict: data.conflict,
+      current: {
+        milestone: data.milestone ?? null,
+        escrow: data.escrow ?? null,
+        dispute: data.dispute ?? null,
+      },
+    };
+  }
+
+  return {
+    ok: true,
+    milestoneVersion: data.milestone_version,
+    escrowVersion: data.escrow_version,
+    disputeVersion: data.dispute_version ?? null,
+  };
+}
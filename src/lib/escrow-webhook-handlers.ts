@@ -0,0 +1,367 @@
+// Escrow provider webhook event processing
+// Invoked by the webhook inbox worker, never directly from the request path.
+import { createHash } from 'crypto';
+import { supabase } from '@/app/lib/supabase';
+import { auditWriter } from '@/lib/audit-log';
+import { refreshProjectFinancials } from '@/lib/project-financials';
+
+export interface WebhookData {
+  escrowId: string;
+  amount?: number;
+  metadata?: Record<string, unknown>;
+  fundedAt?: string;
+  reason?: string;
+  transactionId?: string;
+  freelancerAmount?: number;
+  platformFee?: number;
+  releasedAt?: string;
+  refundId?: string;
+  refundedAt?: string;
+}
+
+interface EscrowContext {
+  id: string;
+  milestone_id: string;
+  milestones: {
+    project_id: string;
+    projects: { client_id: string; freelancer_id: string | null };
+  };
+}
+
+export type EscrowWebhookOutcome = 'processed' | 'already_processed';
+
+export const ESCROW_PROVIDER = 'mock_escrow';
+
+// Apply a single provider event. Throws on database errors so the inbox
+// worker can retry the event; handlers are safe to run more than once.
+export async function processEscrowWebhookEvent(
+  eventId: string,
+  receivedAt: string,
+  event: string,
+  data: WebhookData
+): Promise<EscrowWebhookOutcome> {
+  // The inbox event id is the idempotency key: redeliveries of an event share
+  // it, distinct events (even of one type for one escrow) do not. The key is
+  // recorded once the event has been applied, and the inbox never runs two
+  // events for one escrow at once, so a crash in between only means the retry
+  // applies the event again. Every effect tolerates that: the ledger insert
+  // hits idx_transactions_escrow_effect, status updates are repeatable and the
+  // audit row has a fixed key.
+  const { data: processed, error: lookupError } = await supabase
+    .from('processed_events')
+    .select('event_id')
+    .eq('provider', ESCROW_PROVIDER)
+    .eq('event_id', eventId)
+    .maybeSingle();
+
+  if (lookupError) {
+    throw new Error(`Failed to check processed event: ${lookupError.message}`);
+  }
+
+  if (processed) {
+    console.log('Event already processed:', eventId);
+    return 'already_processed';
+  }
+
+  await applyEscrowWebhookEvent(event, data);
+
+  // Log audit event. Written synchronously: a failure must fail the event so
+  // the inbox retries it.
+  await auditWriter.write(
+    { event_type: event, data },
+    { id: eventAuditId(eventId), created_at: receivedAt }
+  );
+
+  const { error: recordError } = await supabase
+    .from('processed_events')
+    .upsert(
+      { provider: ESCROW_PROVIDER, event_id: eventId, event_type: event },
+      { onConflict: 'provider,event_id', ignoreDuplicates: true }
+    );
+
+  if (recordError) {
+    throw new Error(`Failed to record processed event: ${recordError.message}`);
+  }
+
+  return 'processed';
+}
+
+// Stable audit row id for an event (a name-based, version 5 style UUID), so
+// re-applying the event upserts the same row
+function eventAuditId(eventId: string): string {
+  const hash = createHash('sha1').update(`${ESCROW_PROVIDER}:${eventId}`).digest();
+  hash[6] = (hash[6] & 0x0f) | 0x50;
+  hash[8] = (hash[8] & 0x3f) | 0x80;
+  const hex = hash.subarray(0, 16).toString('hex');
+  return `${hex.slice(0, 8)}-${hex.slice(8, 12)}-${hex.slice(12, 16)}-${hex.slice(16, 20)}-${hex.slice(20)}`;
+}
+
+// Insert an escrow's ledger row. A completed row of the same type already
+// exists when the event is being re-applied, and the unique index turns the
+// second insert into a conflict rather than a second balance update.
+async function insertEscrowTransaction(row: Record<string, unknown>) {
+  const { error } = await supabase.from('transactions').insert(row);
+
+  if (error && error.code !== '23505') {
+    throw new Error(`Failed to record transaction: ${error.message}`);
+  }
+}
+
+async function applyEscrowWebhookEvent(event: string, data: WebhookData) {
+  // Process different event types
+  switch (event) {
+    case 'escrow.created':
+      await handleEscrowCreated(data);
+      break;
+    
+    case 'payin.success':
+      await handlePayinSuccess(data);
+      break;
+    
+    case 'payin.failed':
+      await handlePayinFailed(data);
+      break;
+    
+    case 'payout.success':
+      await handlePayoutSuccess(data);
+      break;
+    
+    case 'refund.success':
+      await handleRefundSuccess(data);
+      break;
+    
+    default:
+      console.warn('Unknown webhook event:', event);
+  }
+}
+
+// The escrow with its milestone's project, for the ledger row. Throws when the
+// lookup fails so the inbox retries the event rather than skipping its ledger
+// row; returns null for an escrow we don't know about.
+async function loadEscrowContext(escrowId: string): Promise<EscrowContext | null> {
+  const { data: escrow, error } = await supabase
+    .from('escrows')
+    .select(`
+      id,
+      milestone_id,
+      milestones!inner (
+        project_id,
+        projects!inner (
+          client_id,
+          freelancer_id
+        )
+      )
+    `)
+    .eq('external_escrow_id', escrowId)
+    .maybeSingle();
+
+  if (error) {
+    throw new Error(`Failed to load escrow: ${error.message}`);
+  }
+
+  if (!escrow) {
+    console.warn('Webhook for unknown escrow:', escrowId);
+    return null;
+  }
+
+  // PostgREST returns to-one embeds as objects
+  return escrow as unknown as EscrowContext;
+}
+
+async function handleEscrowCreated(data: WebhookData) {
+  const { escrowId } = data;
+  
+  // Update escrow record
+  const { error } = await supabase
+    .from('escrows')
+    .update({
+      external_escrow_id: escrowId,
+      status: 'created',
+      updated_at: new Date().toISOString()
+    })
+    .eq('external_escrow_id', escrowId);
+
+  if (error) {
+    throw new Error(`Failed to update escrow: ${error.message}`);
+  }
+}
+
+async function handlePayinSuccess(data: WebhookData) {
+  const { escrowId, amount, fundedAt } = data;
+  
+  // Update escrow status to funded
+  const { error: escrowError } = await supabase
+    .from('escrows')
+    .update({
+      status: 'funded',
+      funded_at: fundedAt,
+      updated_at: new Date().toISOString()
+    })
+    .eq('external_escrow_id', escrowId);
+
+  if (escrowError) {
+    throw new Error(`Failed to update escrow: ${escrowError.message}`);
+  }
+
+  // Create transaction record
+  const escrow = await loadEscrowContext(escrowId);
+
+  if (escrow && amount) {
+    const milestone = escrow.milestones;
+    const project = milestone.projects;
+
+    await insertEscrowTransaction({
+      user_id: project.client_id,
+      project_id: milestone.project_id,
+      milestone_id: escrow.milestone_id,
+      escrow_id: escrow.id,
+      type: 'escrow_fund',
+      amount,
+      description: `Escrow funded for milestone`,
+      status: 'completed',
+      external_transaction_id: escrowId
+    });
+  }
+
+  // The rollup follows the escrow's status, so refresh it even without a ledger row
+  if (escrow) {
+    await refreshProjectFinancials(escrow.milestones.project_id);
+  }
+}
+
+async function handlePayinFailed(data: WebhookData) {
+  const { escrowId } = data;
+  
+  const { error: escrowError } = await supabase
+    .from('escrows')
+    .update({
+      status: 'failed',
+      updated_at: new Date().toISOString()
+    })
+    .eq('external_escrow_id', escrowId);
+
+  if (escrowError) {
+    throw new Error(`Failed to update escrow: ${escrowError.message}`);
+  }
+
+  // Update milestone status
+  const { data: escrow } = await supabase
+    .from('escrows')
+    .select('milestone_id')
+    .eq('external_escrow_id', escrowId)
+    .single();
+
+  if (escrow) {
+    await supabase
+      .from('milestones')
+      .update({
+        status: 'pending',
+        updated_at: new Date().toISOString()
+      })
+      .eq('id', escrow.milestone_id);
+  }
+}
+
+async function handlePayoutSuccess(data: WebhookData) {
+  const { escrowId, transactionId, freelancerAmount, platformFee, releasedAt } = data;
+  
+  // Update escrow status
+  const { error: escrowError } = await supabase
+    .from('escrows')
+    .update({
+      status: 'released',
+      released_at: releasedAt,
+      updated_at: new Date().toISOString()
+    })
+    .eq('external_escrow_id', escrowId);
+
+  if (escrowError) {
+    throw new Error(`Failed to update escrow: ${escrowError.message}`);
+  }
+
+  // Get escrow details
+  const escrow = await loadEscrowContext(escrowId);
+
+  if (escrow && freelancerAmount && transactionId) {
+    const milestone = escrow.milestones;
+    const project = milestone.projects;
+
+    // Create transaction for freelancer payment
+    await insertEscrowTransaction({
+      user_id: project.freelancer_id,
+      project_id: milestone.project_id,
+      milestone_id: escrow.milestone_id,
+      escrow_id: escrow.id,
+      type: 'escrow_release',
+      amount: freelancerAmount,
+      description: `Payment released to freelancer (Platform fee: $${platformFee})`,
+      status: 'completed',
+      external_transaction_id: transactionId
+    });
+
+    // Update milestone status
+    await supabase
+      .from('milestones')
+      .update({
+        status: 'paid',
+        updated_at: new Date().toISOString()
+      })
+      .eq('id', escrow.milestone_id);
+  }
+
+  if (escrow) {
+    await refreshProjectFinancials(escrow.milestones.project_id);
+  }
+}
+
+async function handleRefundSuccess(data: WebhookData) {
+  const { escrowId, refundId, amount, refundedAt } = data;
+  
+  // Update escrow status
+  const { error: escrowError } = await supabase
+    .from('escrows')
+    .update({
+      status: 'refunded',
+      refunded_at: refundedAt,
+      updated_at: new Date().toISOString()
+    })
+    .eq('external_escrow_id', escrowId);
+
+  if (escrowError) {
+    throw new Error(`Failed to update escrow: ${escrowError.message}`);
+  }
+
+  // Get escrow details
+  const escrow = await loadEscrowContext(escrowId);
+
+  if (escrow && amount && refundId) {
+    const milestone = escrow.milestones;
+    const project = milestone.projects;
+
+    // Create refund transaction
+    await insertEscrowTransaction({
+      user_id: project.client_id,
+      project_id: milestone.project_id,
+      milestone_id: escrow.milestone_id,
+      escrow_id: escrow.id,
+      type: 'escrow_refund',
+      amount,
+      description: `Escrow refunded: Refund requested`,
+      status: 'completed',
+      external_transaction_id: refundId
+    });
+
+    // Update milestone status
+    await supabase
+      .from('milestones')
+      .update({
+        status: 'cancelled',
+        updated_at: new Date().toISOString()
+      })
+      .eq('id', escrow.milestone_id);
+  }
+
+  if (escrow) {
+    await refreshProjectFinancials(escrow.milestones.project_id);
+  }
+}
@@ -0,0 +1,178 @@
+// Durable escrow webhook inbox and worker pool
+// The webhook route persists raw events with enqueue(); the worker claims them
+// from escrow_webhook_inbox (oldest first per escrow) and applies them.
+import { supabase } from '@/app/lib/supabase';
+import { settleWithConcurrency } from '@/lib/concurrency';
+import { outsideRequest } from '@/lib/request-timing';
+import { processEscrowWebhookEvent, type WebhookData } from '@/lib/escrow-webhook-handlers';
+
+export interface EscrowWebhookPayload {
+  event: string;
+  data: WebhookData;
+  timestamp?: string;
+  signature?: string;
+}
+
+interface InboxRow {
+  id: string;
+  event_id: string;
+  event_type: string;
+  payload: EscrowWebhookPayload;
+  attempts: number;
+  max_attempts: number;
+  received_at: string;
+}
+
+class EscrowWebhookWorker {
+  private readonly POLL_INTERVAL = 1000; // 1 second
+  private readonly BATCH_SIZE = 20;
+  private readonly CONCURRENCY = Number(process.env.ESCROW_WEBHOOK_CONCURRENCY || 4);
+  private readonly LEASE_SECONDS = 300; // reclaim events held by a crashed worker after 5 minutes
+  private readonly BASE_BACKOFF = 2000; // 2 seconds, doubled per attempt
+
+  private readonly workerId = `${process.pid}-${Math.random().toString(36).substr(2, 9)}`;
+  private timer: ReturnType<typeof setInterval> | null = null;
+  private draining = false;
+  private drainRequested = false;
+
+  // Persist a verified event. Returns the inbox row id.
+  async enqueue(eventId: string, payload: EscrowWebhookPayload): Promise<string> {
+    const [id] = await this.enqueueMany([{ eventId, payload }]);
+    return id;
+  }
+
+  // Persist a batch of verified events with a single multi-row insert.
+  async enqueueMany(events: { eventId: string; payload: EscrowWebhookPayload }[]): Promise<string[]> {
+    const { data: rows, error } = await supabase
+      .from('escrow_webhook_inbox')
+      .insert(events.map(({ eventId, payload }) => ({
+        event_id: eventId,
+        event_type: payload.event,
+        external_escrow_id: payload.data.escrowId,
+        payload,
+      })))
+      .select('id');
+
+    if (error) {
+      throw new Error(`Failed to persist webhook events: ${error.message}`);
+    }
+
+    return (rows || []).map(row => row.id);
+  }
+
+  // Start polling the inbox. Safe to call more than once.
+  start(): void {
+    if (this.timer) return;
+
+    this.timer = setInterval(() => {
+      void this.drain();
+    }, this.POLL_INTERVAL);
+    this.timer.unref?.();
+  }
+
+  stop(): void {
+    if (this.timer) {
+      clearInterval(this.timer);
+      this.timer = null;
+    }
+  }
+
+  // Ask the worker to drain now instead of waiting for the next poll.
+  kick(): void {
+    // Usually called from a route; the drain and poll timer must not run in
+    // (and keep alive) that request's context
+    outsideRequest(() => {
+      this.start();
+      void this.drain();
+    });
+  }
+
+  // Claim and process batches until the inbox has nothing eligible.
+  async drain(): Promise<void> {
+    if (this.draining) {
+      this.drainRequested = true;
+      return;
+    }
+
+    this.draining = true;
+    try {
+      do {
+        this.drainRequested = false;
+
+        while (true) {
+          const { data: rows, error } = await supabase.rpc('claim_escrow_webhook_events', {
+            p_worker: this.workerId,
+            p_limit: this.BATCH_SIZE,
+            p_lease_seconds: this.LEASE_SECONDS,
+          });
+
+          if (error) {
+            console.error('Failed to claim webhook events:', error);
+            break;
+          }
+
+          if (!rows || rows.length === 0) break;
+
+          // A claim holds at most one event per escrow, so the batch can run in parallel
+          await settleWithConcurrency(rows as InboxRow[], this.CONCURRENCY, row => this.process(row));
+        }
+      } while (this.drainRequested);
+    } catch (error) {
+      console.error('Webhook inbox drain error:', error);
+    } finally {
+      this.draining = false;
+    }
+  }
+
+  private async process(row: InboxRow): Promise<void> {
+    try {
+      const { event, data } = row.payload;
+      await processEscrowWebhookEvent(row.event_id, row.received_at, event, data);
+
+      const { error: updateError } = await supabase
+        .from('escrow_webhook_inbox')
+        .update({
+          status: 'processed',
+          processed_at: new Date().toISOString(),
+          locked_by: null,
+          locked_at: null,
+          last_error: null,
+        })
+        .eq('id', row.id);
+
+      // The event itself is applied; left as processing, it is re-applied
+      // (harmlessly) once the lease expires
+      if (updateError) {
+        console.error(`Failed to mark webhook event ${row.event_id} processed:`, updateError);
+      }
+    } catch (error) {
+      const message = error instanceof Error ? error.message : String(error);
+      const deadLetter = row.attempts >= row.max_attempts;
+
+      if (deadLetter) {
+        console.error(`Webhook event ${row.event_id} dead-lettered after ${row.attempts} attempts:`, message);
+      } else {
+        console.error(`Webhook event ${row.event_id} failed (attempt ${row.attempts}):`, message);
+      }
+
+      const { error: updateError } = await supabase
+        .from('escrow_webhook_inbox')
+        .update({
+          status: deadLetter ? 'dead' : 'pending',
+          next_attempt_at: new Date(Date.now() + this.BASE_BACKOFF * 2 ** (row.attempts - 1)).toISOString(),
+          locked_by: null,
+          locked_at: null,
+          last_error: message,
+        })
+        .eq('id', row.id);
+
+      // Left as processing, the event is retried when its lease expires, or
+      // dead-lettered then if it is out of attempts
+      if (updateError) {
+        console.error(`Failed to record webhook event ${row.event_id} failure:`, updateError);
+      }
+    }
+  }
+}
+
+export const escrowWebhookWorker = new EscrowWebhookWorker();
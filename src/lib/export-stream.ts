@@ -0,0 +1,88 @@
+// Streaming CSV / NDJSON exports
+// Rows are pulled one keyset page at a time as the client reads, so memory
+// stays at about one page no matter how many rows the export covers.
+
+export type ExportFormat = 'csv' | 'ndjson';
+
+export interface ExportColumn<T> {
+  header: string;
+  value: (row: T) => unknown;
+}
+
+const CONTENT_TYPES: Record<ExportFormat, string> = {
+  csv: 'text/csv; charset=utf-8',
+  ndjson: 'application/x-ndjson; charset=utf-8',
+};
+
+export function parseExportFormat(value: string | null): ExportFormat | null {
+  if (!value) return 'csv';
+  return value === 'csv' || value === 'ndjson' ? value : null;
+}
+
+function csvField(value: unknown): string {
+  if (value === null || value === undefined) return '';
+
+  let text = typeof value === 'object' ? JSON.stringify(value) : String(value);
+
+  // Keep spreadsheet apps from evaluating text fields as formulas
+  if (typeof value === 'string' && /^[=+\-@\t\r]/.test(text)) {
+    text = `'${text}`;
+  }
+
+  return /[",\r\n]/.test(text) ? `"${text.replace(/"/g, '""')}"` : text;
+}
+
+function csvLine(fields: unknown[]): string {
+  return fields.map(csvField).join(',') + '\r\n';
+}
+
+// Stream `pages` as a downloadable file. CSV uses `columns`; NDJSON writes each
+// row as-is. An error after the first byte aborts the response, which clients
+// see as a truncated transfer.
+export function exportResponse<T>(options: {
+  format: ExportFormat;
+  filename: string;
+  columns: ExportColumn<T>[];
+  pages: AsyncGenerator<T[]>;
+}): Response {
+  const { format, filename, columns, pages } = options;
+  const encoder = new TextEncoder();
+  let headerSent = false;
+
+  const body = new ReadableStream<Uint8Array>({
+    async pull(controller) {
+      try {
+        if (format === 'csv' && !headerSent) {
+          headerSent = true;
+          controller.enqueue(encoder.encode(csvLine(columns.map(column => column.header))));
+        }
+
+        const { value: page, done } = await pages.next();
+        if (done) {
+          controller.close();
+          return;
+        }
+
+        const chunk = format === 'csv'
+          ? page.map(row => csvLine(columns.map(column => column.value(row)))).join('')
+          : page.map(row => JSON.stringify(row) + '\n').join('');
+
+        controller.enqueue(encoder.encode(chunk));
+      } catch (error) {
+        console.error(`Export ${filename} failed:`, error);
+        controller.error(error);
+      }
+    },
+    async cancel() {
+      await pages.return(undefined);
+    },
+  });
+
+  return new Response(body, {
+    headers: {
+      'Content-Type': CONTENT_TYPES[format],
+      'Content-Disposition': `attachment; filename="${filename}.${format}"`,
+      'Cache-Control': 'no-store',
+    },
+  });
+}
@@ -0,0 +1,248 @@
+// Background KYC document processing
+// New kyc_verifications rows are claimed by this worker, which produces a
+// compressed review preview and a thumbnail, hashes the document for duplicate
+// detection and records the results on the row. Reviewers then load previews
+// of a few hundred KB instead of the original upload.
+import { createHash } from 'crypto';
+import { supabase } from '@/app/lib/supabase';
+import { settleWithConcurrency } from '@/lib/concurrency';
+import { getKycStorage, type KycStorage } from '@/lib/kyc-storage';
+import { KYC_MAX_SIZE, sniffDocumentType } from '@/lib/kyc-upload';
+import { outsideRequest } from '@/lib/request-timing';
+
+const PREVIEW_SIZE = 1600; // px, longest edge
+const THUMBNAIL_SIZE = 320;
+
+interface KycDocumentRow {
+  id: string;
+  user_id: string;
+  document_url: string;
+  processing_attempts: number;
+}
+
+export interface KycProcessingResult {
+  contentHash: string;
+  contentType: string | null;
+  fileSize: number;
+  previewPath: string | null;
+  thumbnailPath: string | null;
+}
+
+type SharpFactory = (input: Buffer, options?: { page?: number }) => {
+  rotate(): ReturnType<SharpFactory>;
+  resize(options: { width: number; height: number; fit: 'inside'; withoutEnlargement: boolean }): ReturnType<SharpFactory>;
+  jpeg(options: { quality: number; mozjpeg?: boolean }): ReturnType<SharpFactory>;
+  toBuffer(): Promise<Buffer>;
+};
+
+let sharpLoader: Promise<SharpFactory | null> | null = null;
+
+// sharp is a dependency, but its prebuilt libvips binary may be missing on
+// unsupported platforms; documents are then still hashed but get no previews
+function loadSharp(): Promise<SharpFactory | null> {
+  if (!sharpLoader) {
+    sharpLoader = import('sharp')
+      .then(module => (module.default ?? module) as unknown as SharpFactory)
+      .catch(() => {
+        console.warn('sharp is not available, KYC previews will not be generated');
+        return null;
+      });
+  }
+  return sharpLoader;
+}
+
+async function readDocument(stream: ReadableStream<Uint8Array>): Promise<Buffer> {
+  const chunks: Buffer[] = [];
+  let size = 0;
+
+  for await (const chunk of stream as unknown as AsyncIterable<Uint8Array>) {
+    size += chunk.byteLength;
+    if (size > KYC_MAX_SIZE) {
+      throw new Error('Document exceeds the maximum KYC upload size');
+    }
+    chunks.push(Buffer.from(chunk));
+  }
+
+  return Buffer.concat(chunks);
+}
+
+// Hash a stored document and write its derived images. Independent of the
+// database so it can be benchmarked against the filesystem storage stand-in.
+export async function processKycDocument(
+  storage: KycStorage,
+  documentPath: string,
+  derivedKey: string
+): Promise<KycProcessingResult> {
+  const document = await readDocument(await storage.download(documentPath));
+  const detected = sniffDocumentType(document);
+  const contentHash = createHash('sha256').update(document).digest('hex');
+
+  const result: KycProcessingResult = {
+    contentHash,
+    contentType: detected?.contentType ?? null,
+    fileSize: document.byteLength,
+    previewPath: null,
+    thumbnailPath: null,
+  };
+
+  const sharp = await loadSharp();
+  if (!sharp || !detected) return result;
+
+  try {
+    // First page only for PDFs (needs a libvips build with PDF support);
+    // rotate() applies EXIF orientation before the metadata is stripped
+    const render = (size: number, quality: number) =>
+      sharp(document, { page: 0 })
+        .rotate()
+        .resize({ width: size, height: size, fit: 'inside', withoutEnlargement: true })
+        .jpeg({ quality, mozjpeg: true })
+        .toBuffer();
+
+    const [preview, thumbnail] = await Promise.all([render(PREVIEW_SIZE, 70), render(THUMBNAIL_SIZE, 60)]);
+
+    result.previewPath = `previews/${derivedKey}.jpg`;
+    result.thumbnailPath = `thumbnails/${derivedKey}.jpg`;
+
+    await Promise.all([
+      storage.put(result.previewPath, preview, 'image/jpeg'),
+      storage.put(result.thumbnailPath, thumbnail, 'image/jpeg'),
+    ]);
+  } catch (error) {
+    // Unsupported input (e.g. PDFs without PDF support in libvips)
+    console.warn(`No preview generated for ${documentPath}:`, error instanceof Error ? error.message : error);
+    result.previewPath = null;
+    result.thumbnailPath = null;
+  }
+
+  return result;
+}
+
+class KycProcessingWorker {
+  private readonly POLL_INTERVAL = 5000; // 5 seconds
+  private readonly BATCH_SIZE = 10;
+  private readonly CONCURRENCY = Number(process.env.KYC_PROCESSING_CONCURRENCY || 2);
+  private readonly LEASE_SECONDS = 300;
+  private readonly MAX_ATTEMPTS = 3;
+
+  private readonly workerId = `${process.pid}-${Math.random().toString(36).substr(2, 9)}`;
+  private timer: ReturnType<typeof setInterval> | null = null;
+  private draining = false;
+  private drainRequested = false;
+
+  // Start polling for new documents. Safe to call more than once.
+  start(): void {
+    if (this.timer) return;
+
+    this.timer = setInterval(() => {
+      void this.drain();
+    }, this.POLL_INTERVAL);
+    this.timer.unref?.();
+  }
+
+  stop(): void {
+    if (this.timer) {
+      clearInterval(this.timer);
+      this.timer = null;
+    }
+  }
+
+  // Process newly submitted documents now instead of waiting for the next poll.
+  kick(): void {
+    // Usually called from a route; the drain and poll timer must not run in
+    // (and keep alive) that request's context
+    outsideRequest(() => {
+      this.start();
+      void this.drain();
+    });
+  }
+
+  async drain(): Promise<void> {
+    if (this.draining) {
+      this.drainRequested = true;
+      return;
+    }
+
+    this.draining = true;
+    try {
+      do {
+        this.drainRequested = false;
+
+        while (true) {
+          const { data: rows, error } = await supabase.rpc('claim_kyc_documents', {
+            p_worker: this.workerId,
+            p_limit: this.BATCH_SIZE,
+            p_lease_seconds: this.LEASE_SECONDS,
+            p_max_attempts: this.MAX_ATTEMPTS,
+          });
+
+          if (error) {
+            console.error('Failed to claim KYC documents:', error);
+            break;
+          }
+
+          if (!rows || rows.length === 0) break;
+
+          await settleWithConcurrency(rows as KycDocumentRow[], this.CONCURRENCY, row => this.process(row));
+        }
+      } while (this.drainRequested);
+    } catch (error) {
+      console.error('KYC processing drain error:', error);
+    } finally {
+      this.draining = false;
+    }
+  }
+
+  private async process(row: KycDocumentRow): Promise<void> {
+    try {
+      const result = await processKycDocument(getKycStorage(), row.document_url, `${row.user_id}/${row.id}`);
+
+      // Same document already submitted (by anyone) before this one
+      const { data: duplicate } = await supabase
+        .from('kyc_verifications')
+        .select('id')
+        .eq('content_hash', result.contentHash)
+        .neq('id', row.id)
+        .order('created_at', { ascending: true })
+        .limit(1)
+        .maybeSingle();
+
+      const { error } = await supabase
+        .from('kyc_verifications')
+        .update({
+          processing_status: 'processed',
+          processed_at: new Date().toISOString(),
+          processing_error: null,
+          locked_by: null,
+          locked_at: null,
+          content_hash: result.contentHash,
+          content_type: result.contentType,
+          file_size: result.fileSize,
+          preview_url: result.previewPath,
+          thumbnail_url: result.thumbnailPath,
+          duplicate_of: duplicate?.id ?? null,
+        })
+        .eq('id', row.id);
+
+      if (error) {
+        throw new Error(`Failed to record processing result: ${error.message}`);
+      }
+    } catch (error) {
+      const message = error instanceof Error ? error.message : String(error);
+      const failed = row.processing_attempts >= this.MAX_ATTEMPTS;
+
+      console.error(`KYC document ${row.id} processing failed (attempt ${row.processing_attempts}):`, message);
+
+      await supabase
+        .from('kyc_verifications')
+        .update({
+          processing_status: failed ? 'failed' : 'pending',
+          processing_error: message,
+          locked_by: null,
+          locked_at: null,
+        })
+        .eq('id', row.id);
+    }
+  }
+}
+
+export const kycProcessingWorker = new KycProcessingWorker();
@@ -0,0 +1,220 @@
+// Resumable storage backend for KYC documents
+// Uses the storage TUS endpoint so each chunk is streamed straight from the
+// incoming request to storage and an interrupted upload can resume at the
+// last offset the backend acknowledged.
+//
+// Set KYC_STORAGE=filesystem to keep documents under KYC_STORAGE_DIR
+// (default .kyc-storage) instead, for local development and load tests.
+import fs from 'fs';
+import path from 'path';
+import { Readable } from 'stream';
+import { pipeline } from 'stream/promises';
+import { supabase } from '@/app/lib/supabase';
+
+export const KYC_BUCKET = 'kyc-documents';
+
+// Supabase's resumable endpoint requires every chunk except the last to be
+// exactly 6MB
+export const KYC_CHUNK_SIZE = 6 * 1024 * 1024;
+
+export interface KycStorage {
+  // Start a resumable upload; returns an opaque handle for append/offset
+  createUpload(path: string, size: number, contentType: string): Promise<string>;
+  // Stream `length` bytes at `offset`; returns the new offset
+  appendChunk(handle: string, offset: number, body: ReadableStream<Uint8Array>, length: number): Promise<number>;
+  // Bytes the backend has durably received so far
+  getOffset(handle: string): Promise<number>;
+  // Read a stored object as a stream
+  download(path: string): Promise<ReadableStream<Uint8Array>>;
+  // Store a small derived object (previews, thumbnails) in one request
+  put(path: string, data: Buffer, contentType: string): Promise<void>;
+}
+
+export class KycStorageError extends Error {
+  constructor(message: string, readonly status: number = 500) {
+    super(message);
+    this.name = 'KycStorageError';
+  }
+}
+
+const TUS_VERSION = '1.0.0';
+
+function encodeMetadata(metadata: Record<string, string>): string {
+  return Object.entries(metadata)
+    .map(([key, value]) => `${key} ${Buffer.from(value).toString('base64')}`)
+    .join(',');
+}
+
+class SupabaseResumableStorage implements KycStorage {
+  private readonly endpoint = `${process.env.NEXT_PUBLIC_SUPABASE_URL}/storage/v1/upload/resumable`;
+
+  private headers(extra: Record<string, string> = {}): Record<string, string> {
+    return {
+      authorization: `Bearer ${process.env.SUPABASE_SERVICE_ROLE_KEY}`,
+      'tus-resumable': TUS_VERSION,
+      ...extra,
+    };
+  }
+
+  async createUpload(path: string, size: number, contentType: string): Promise<string> {
+    const response = await fetch(this.endpoint, {
+      method: 'POST',
+      headers: this.headers({
+        'upload-length': String(size),
+        'upload-metadata': encodeMetadata({
+          bucketName: KYC_BUCKET,
+          objectName: path,
+          contentType,
+          cacheControl: '3600',
+        }),
+        'x-upsert': 'false',
+      }),
+    });
+
+    const location = response.headers.get('location');
+    if (response.status !== 201 || !location) {
+      throw new KycStorageError(`Failed to create resumable upload: ${response.status} ${await response.text()}`);
+    }
+
+    return location;
+  }
+
+  async appendChunk(handle: string, offset: number, body: ReadableStream<Uint8Array>, length: number): Promise<number> {
+    const response = await fetch(handle, {
+      method: 'PATCH',
+      headers: this.headers({
+        'upload-offset': String(offset),
+        'content-type': 'application/offset+octet-stream',
+        'content-length': String(length),
+      }),
+      body,
+      // Required by undici to send a streaming request body
+      duplex: 'half',
+    } as RequestInit & { duplex: 'half' });
+
+    if (response.status === 409) {
+      throw new KycStorageError('Upload offset does not match the stored offset', 409);
+    }
+
+    if (response.status !== 204) {
+      throw new KycStorageError(`Failed to upload chunk: ${response.status} ${await response.text()}`);
+    }
+
+    return Number(response.headers.get('upload-offset'));
+  }
+
+  async getOffset(handle: string): Promise<number> {
+    const response = await fetch(handle, { method: 'HEAD', headers: this.headers() });
+
+    if (!response.ok) {
+      throw new KycStorageError(`Failed to fetch upload offset: ${response.status}`);
+    }
+
+    return Number(response.headers.get('upload-offset'));
+  }
+
+  async download(path: string): Promise<ReadableStream<Uint8Array>> {
+    const { data, error } = await supabase.storage.from(KYC_BUCKET).download(path);
+
+    if (error || !data) {
+      throw new KycStorageError(`Failed to download ${path}: ${error?.message}`, 404);
+    }
+
+    return data.stream();
+  }
+
+  async put(path: string, data: Buffer, contentType: string): Promise<void> {
+    const { error } = await supabase.storage
+      .from(KYC_BUCKET)
+      .upload(path, data, { contentType, upsert: true });
+
+    if (error) {
+      throw new KycStorageError(`Failed to store ${path}: ${error.message}`);
+    }
+  }
+}
+
+// Local stand-in: uploads are appended to files under `root`, with a small
+// JSON sidecar per upload recording its target path and length.
+class FilesystemKycStorage implements KycStorage {
+  constructor(private readonly root: string) {}
+
+  private resolve(objectPath: string): string {
+    const resolved = path.resolve(this.root, objectPath);
+    if (!resolved.startsWith(path.resolve(this.root) + path.sep)) {
+      throw new KycStorageError(`Invalid object path: ${objectPath}`, 400);
+    }
+    return resolved;
+  }
+
+  private uploadFile(handle: string): string {
+    return this.resolve(`.uploads/${handle}.json`);
+  }
+
+  async createUpload(objectPath: string, size: number, contentType: string): Promise<string> {
+    const handle = `${Date.now()}-${Math.random().toString(36).substr(2, 9)}`;
+    const target = this.resolve(objectPath);
+
+    await fs.promises.mkdir(path.dirname(target), { recursive: true });
+    await fs.promises.mkdir(path.dirname(this.uploadFile(handle)), { recursive: true });
+    await fs.promises.writeFile(target, '');
+    await fs.promises.writeFile(this.uploadFile(handle), JSON.stringify({ path: objectPath, size, contentType }));
+
+    return handle;
+  }
+
+  async appendChunk(handle: string, offset: number, body: ReadableStream<Uint8Array>, length: number): Promise<number> {
+    const current = await this.getOffset(handle);
+    if (current !== offset) {
+      await body.cancel();
+      throw new KycStorageError('Upload offset does not match the stored offset', 409);
+    }
+
+    const { path: objectPath } = JSON.parse(await fs.promises.readFile(this.uploadFile(handle), 'utf8'));
+    const target = this.resolve(objectPath);
+
+    try {
+      await pipeline(
+        Readable.fromWeb(body as Parameters<typeof Readable.fromWeb>[0]),
+        fs.createWriteStream(target, { flags: 'a' })
+      );
+    } catch (error) {
+      // Drop a partially written chunk so the upload can resume at `offset`
+      await fs.promises.truncate(target, offset);
+      throw error;
+    }
+
+    return offset + length;
+  }
+
+  async getOffset(handle: string): Promise<number> {
+    const { path: objectPath } = JSON.parse(await fs.promises.readFile(this.uploadFile(handle), 'utf8'));
+    const stats = await fs.promises.stat(this.resolve(objectPath));
+    return stats.size;
+  }
+
+  async download(objectPath: string): Promise<ReadableStream<Uint8Array>> {
+    const target = this.resolve(objectPath);
+    if (!fs.existsSync(target)) {
+      throw new KycStorageError(`Object not found: ${objectPath}`, 404);
+    }
+    return Readable.toWeb(fs.createReadStream(target)) as ReadableStream<Uint8Array>;
+  }
+
+  async put(objectPath: string, data: Buffer): Promise<void> {
+    const target = this.resolve(objectPath);
+    await fs.promises.mkdir(path.dirname(target), { recursive: true });
+    await fs.promises.writeFile(target, data);
+  }
+}
+
+let storage: KycStorage | null = null;
+
+export function getKycStorage(): KycStorage {
+  if (!storage) {
+    storage = process.env.KYC_STORAGE === 'filesystem'
+      ? new FilesystemKycStorage(process.env.KYC_STORAGE_DIR || '.kyc-storage')
+      : new SupabaseResumableStorage();
+  }
+  return storage;
+}
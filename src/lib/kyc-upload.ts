@@ -0,0 +1,295 @@
+// Streaming, resumable KYC document uploads
+// Clients open an upload session, then send the document in chunks. Each chunk
+// is piped from the request body through size/type validation straight into
+// the storage backend, so memory per upload stays at a few stream buffers no
+// matter how large the document is.
+import { supabase } from '@/app/lib/supabase';
+import { getKycStorage, KYC_CHUNK_SIZE, KycStorageError } from '@/lib/kyc-storage';
+import { invalidateUserProfile } from '@/lib/user-profile-cache';
+
+export const KYC_MAX_SIZE = 10 * 1024 * 1024; // 10MB
+export { KYC_CHUNK_SIZE };
+
+export class KycUploadError extends Error {
+  constructor(message: string, readonly status: number = 400, readonly offset?: number) {
+    super(message);
+    this.name = 'KycUploadError';
+  }
+}
+
+export interface KycUpload {
+  id: string;
+  user_id: string;
+  document_number: string;
+  total_size: number;
+  received_bytes: number;
+  content_type: string | null;
+  storage_path: string | null;
+  storage_upload_url: string | null;
+  status: 'uploading' | 'completed' | 'failed';
+  kyc_verification_id: string | null;
+  expires_at: string;
+}
+
+// Accepted document formats, identified by their leading bytes
+const SIGNATURES: { contentType: string; extension: string; magic: number[] }[] = [
+  { contentType: 'image/jpeg', extension: 'jpg', magic: [0xff, 0xd8, 0xff] },
+  { contentType: 'image/png', extension: 'png', magic: [0x89, 0x50, 0x4e, 0x47, 0x0d, 0x0a, 0x1a, 0x0a] },
+  { contentType: 'application/pdf', extension: 'pdf', magic: [0x25, 0x50, 0x44, 0x46, 0x2d] }, // %PDF-
+];
+const SNIFF_BYTES = 8;
+
+export function sniffDocumentType(head: Uint8Array): { contentType: string; extension: string } | null {
+  const match = SIGNATURES.find(({ magic }) => magic.every((byte, index) => head[index] === byte));
+  return match ? { contentType: match.contentType, extension: match.extension } : null;
+}
+
+export async function createKycUpload(userId: string, documentNumber: string, size: number): Promise<KycUpload> {
+  // Validate Aadhaar number format (12 digits)
+  if (!/^\d{12}$/.test(documentNumber)) {
+    throw new KycUploadError('Invalid Aadhaar number format');
+  }
+
+  if (!Number.isInteger(size) || size <= 0) {
+    throw new KycUploadError('File size is required');
+  }
+
+  if (size > KYC_MAX_SIZE) {
+    throw new KycUploadError('File size must be less than 10MB');
+  }
+
+  const { data, error } = await supabase
+    .from('kyc_uploads')
+    .insert({
+      user_id: userId,
+      document_type: 'aadhaar',
+      document_number: documentNumber,
+      total_size: size,
+    })
+    .select()
+    .single();
+
+  if (error) {
+    throw new KycUploadError(`Failed to create upload: ${error.message}`, 500);
+  }
+
+  return data as KycUpload;
+}
+
+export async function getKycUpload(uploadId: string, userId: string): Promise<KycUpload | null> {
+  const { data, error } = await supabase
+    .from('kyc_uploads')
+    .select('*')
+    .eq('id', uploadId)
+    .eq('user_id', userId)
+    .maybeSingle();
+
+  if (error) {
+    throw new KycUploadError(`Failed to load upload: ${error.message}`, 500);
+  }
+
+  return data as KycUpload | null;
+}
+
+// Stream one chunk into storage. Returns the new offset and, once the last
+// chunk lands, the kyc_verifications row created for the document.
+export async function appendKycChunk(
+  upload: KycUpload,
+  offset: number,
+  body: ReadableStream<Uint8Array>,
+  length: number
+): Promise<{ offset: number; verification: Record<string, unknown> | null }> {
+  if (upload.status !== 'uploading') {
+    throw new KycUploadError(`Upload is ${upload.status}`, 409, upload.received_bytes);
+  }
+
+  if (new Date(upload.expires_at).getTime() < Date.now()) {
+    throw new KycUploadError('Upload session has expired, please start again', 410);
+  }
+
+  if (offset !== upload.received_bytes) {
+    throw new KycUploadError('Chunk offset does not match the uploaded bytes', 409, upload.received_bytes);
+  }
+
+  const isLast = offset + length === upload.total_size;
+  if (!Number.isInteger(length) || length <= 0 || offset + length > upload.total_size) {
+    throw new KycUploadError('Chunk does not fit the declared file size');
+  }
+  if (!isLast && length !== KYC_CHUNK_SIZE) {
+    throw new KycUploadError(`Chunks must be ${KYC_CHUNK_SIZE} bytes except the last one`);
+  }
+
+  const storage = getKycStorage();
+  let stream = body;
+
+  // The first chunk decides the document type from its magic bytes
+  if (offset === 0) {
+    const peeked = await peekStream(body, SNIFF_BYTES);
+    const detected = sniffDocumentType(peeked.head);
+    if (!detected) {
+      await peeked.stream.cancel();
+      throw new KycUploadError('Only JPEG, PNG, and PDF files are allowed');
+    }
+    stream = peeked.stream;
+
+    if (!upload.storage_upload_url) {
+      const path = `kyc/${upload.user_id}/${Date.now()}-aadhaar.${detected.extension}`;
+      const handle = await storage.createUpload(path, upload.total_size, detected.contentType);
+
+      const { error } = await supabase
+        .from('kyc_uploads')
+        .update({ content_type: detected.contentType, storage_path: path, storage_upload_url: handle })
+        .eq('id', upload.id);
+
+      if (error) {
+        throw new KycUploadError(`Failed to record upload: ${error.message}`, 500);
+      }
+
+      upload.content_type = detected.contentType;
+      upload.storage_path = path;
+      upload.storage_upload_url = handle;
+    }
+  }
+
+  if (!upload.storage_upload_url) {
+    throw new KycUploadError('Upload has not started, send the first chunk at offset 0', 409, 0);
+  }
+
+  let newOffset: number;
+  try {
+    newOffset = await storage.appendChunk(
+      upload.storage_upload_url,
+      offset,
+      stream.pipeThrough(exactLength(length)),
+      length
+    );
+  } catch (error) {
+    if (error instanceof KycStorageError && error.status === 409) {
+      // Our record drifted from storage (e.g. a response was lost); resync
+      const stored = await storage.getOffset(upload.storage_upload_url);
+      await recordOffset(upload.id, upload.received_bytes, stored);
+      throw new KycUploadError('Chunk offset does not match the uploaded bytes', 409, stored);
+    }
+    throw error;
+  }
+
+  // Compare-and-set so a duplicated request cannot move the offset twice
+  const recorded = await recordOffset(upload.id, offset, newOffset);
+  if (!recorded) {
+    const current = await getKycUpload(upload.id, upload.user_id);
+    throw new KycUploadError('Upload was modified concurrently', 409, current?.received_bytes);
+  }
+
+  if (newOffset < upload.total_size) {
+    return { offset: newOffset, verification: null };
+  }
+
+  const { data: verification, error } = await supabase.rpc('complete_kyc_upload', { p_upload_id: upload.id });
+  if (error) {
+    throw new KycUploadError(`Failed to save KYC information: ${error.message}`, 500);
+  }
+
+  // complete_kyc_upload resets the user's kyc_status to pending
+  invalidateUserProfile(upload.user_id);
+
+  return { offset: newOffset, verification };
+}
+
+// Upload a complete document held by the caller (legacy multipart endpoint).
+// Slices of a Blob are views, so this still streams chunk by chunk.
+export async function uploadKycDocument(userId: string, documentNumber: string, file: Blob) {
+  let upload = await createKycUpload(userId, documentNumber, file.size);
+  let result: Awaited<ReturnType<typeof appendKycChunk>> = { offset: 0, verification: null };
+
+  while (result.offset < file.size) {
+    const end = Math.min(result.offset + KYC_CHUNK_SIZE, file.size);
+    result = await appendKycChunk(upload, result.offset, file.slice(result.offset, end).stream(), end - result.offset);
+    upload = { ...upload, received_bytes: result.offset };
+  }
+
+  return result.verification;
+}
+
+async function recordOffset(uploadId: string, expected: number, offset: number): Promise<boolean> {
+  const { data, error } = await supabase
+    .from('kyc_uploads')
+    .update({ received_bytes: offset })
+    .eq('id', uploadId)
+    .eq('received_bytes', expected)
+    .select('id');
+
+  if (error) {
+    throw new KycUploadError(`Failed to record upload progress: ${error.message}`, 500);
+  }
+
+  return (data || []).length > 0;
+}
+
+// Read at least `bytes` bytes off the front of a stream without losing them.
+// Holds at most one extra read's worth of data.
+async function peekStream(
+  stream: ReadableStream<Uint8Array>,
+  bytes: number
+): Promise<{ head: Uint8Array; stream: ReadableStream<Uint8Array> }> {
+  const reader = stream.getReader();
+  const chunks: Uint8Array[] = [];
+  let total = 0;
+
+  while (total < bytes) {
+    const { done, value } = await reader.read();
+    if (done) break;
+    chunks.push(value);
+    total += value.byteLength;
+  }
+
+  const head = chunks.length === 1 ? chunks[0] : Buffer.concat(chunks);
+
+  return {
+    head,
+    stream: new ReadableStream<Uint8Array>({
+      start(controller) {
+        if (head.byteLength > 0) controller.enqueue(head);
+      },
+      async pull(controller) {
+        const { done, value } = await reader.read();
+        if (done) controller.close();
+        else controller.enqueue(value);
+      },
+      cancel(reason) {
+        return reader.cancel(reason);
+      },
+    }),
+  };
+}
+
+// Pass bytes through, failing the stream if it is longer or shorter than declared
+function exactLength(expected: number): TransformStream<Uint8Array, Uint8Array> {
+  let seen = 0;
+
+  return new TransformStream({
+    transform(chunk, controller) {
+      seen += chunk.byteLength;
+      if (seen > expected) {
+        controller.error(new KycUploadError('Chunk is larger than its declared length'));
+        return;
+      }
+      controller.enqueue(chunk);
+    },
+    flush(controller) {
+      if (seen !== expected) {
+        controller.error(new KycUploadError('Chunk ended before its declared length'));
+      }
+    },
+  });
+}
+
+// Unwrap validation errors raised inside a request body stream, which fetch
+// reports as the cause of its own error
+export function asKycUploadError(error: unknown): KycUploadError | null {
+  if (error instanceof KycUploadError) return error;
+  if (error instanceof Error && error.cause instanceof KycUploadError) return error.cause;
+  if (error instanceof KycStorageError && error.status === 409) {
+    return new KycUploadError(error.message, 409);
+  }
+  return null;
+}
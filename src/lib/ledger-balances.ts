@@ -0,0 +1,123 @@
+// Per-user balance projections backed by the user_balances table
+// The table is kept current by a trigger on transactions (migration 018); the
+// drift checker periodically recomputes it from the ledger and reports, or
+// with LEDGER_DRIFT_REPAIR=true fixes, any user whose projection disagrees.
+import { supabase } from '@/app/lib/supabase';
+
+export interface UserBalance {
+  available: number;
+  in_escrow: number;
+  lifetime_earned: number;
+  lifetime_funded: number;
+  lifetime_spent: number;
+  lifetime_refunded: number;
+  updated_at: string | null;
+}
+
+export interface LedgerDrift {
+  user_id: string;
+  field: keyof Omit<UserBalance, 'updated_at'>;
+  projected: number;
+  actual: number;
+}
+
+const EMPTY_BALANCE: UserBalance = {
+  available: 0,
+  in_escrow: 0,
+  lifetime_earned: 0,
+  lifetime_funded: 0,
+  lifetime_spent: 0,
+  lifetime_refunded: 0,
+  updated_at: null,
+};
+
+// Single-row lookup; users with no completed transactions have a zero balance
+export async function getUserBalance(userId: string): Promise<UserBalance> {
+  const { data, error } = await supabase
+    .from('user_balances')
+    .select('available, in_escrow, lifetime_earned, lifetime_funded, lifetime_spent, lifetime_refunded, updated_at')
+    .eq('user_id', userId)
+    .maybeSingle();
+
+  if (error) {
+    throw new Error(`Failed to load balance: ${error.message}`);
+  }
+
+  if (!data) return { ...EMPTY_BALANCE };
+
+  // DECIMAL columns arrive as strings or numbers depending on magnitude
+  return {
+    available: Number(data.available),
+    in_escrow: Number(data.in_escrow),
+    lifetime_earned: Number(data.lifetime_earned),
+    lifetime_funded: Number(data.lifetime_funded),
+    lifetime_spent: Number(data.lifetime_spent),
+    lifetime_refunded: Number(data.lifetime_refunded),
+    updated_at: data.updated_at,
+  };
+}
+
+export async function checkLedgerDrift(repair = false): Promise<LedgerDrift[]> {
+  const { data, error } = await supabase.rpc('ledger_balance_drift', { p_repair: repair });
+
+  if (error) {
+    throw new Error(`Ledger drift check failed: ${error.message}`);
+  }
+
+  return ((data as LedgerDrift[] | null) ?? []).map(row => ({
+    ...row,
+    projected: Number(row.projected),
+    actual: Number(row.actual),
+  }));
+}
+
+class LedgerDriftChecker {
+  private readonly INTERVAL = Number(process.env.LEDGER_DRIFT_INTERVAL_MS || 60 * 60 * 1000); // hourly
+  private readonly REPAIR = process.env.LEDGER_DRIFT_REPAIR === 'true';
+
+  private timer: ReturnType<typeof setInterval> | null = null;
+  private running = false;
+
+  // Start periodic checks. Safe to call more than once.
+  start(): void {
+    if (this.timer) return;
+
+    this.timer = setInterval(() => {
+      void this.run();
+    }, this.INTERVAL);
+    this.timer.unref?.();
+  }
+
+  stop(): void {
+    if (this.timer) {
+      clearInterval(this.timer);
+      this.timer = null;
+    }
+  }
+
+  async run(): Promise<LedgerDrift[]> {
+    if (this.running) return [];
+    this.running = true;
+
+    try {
+      const drift = await checkLedgerDrift(this.REPAIR);
+
+      if (drift.length > 0) {
+        const users = new Set(drift.map(row => row.user_id)).size;
+        console.error(
+          `Ledger balance drift for ${users} user(s)${this.REPAIR ? ' (repaired)' : ''}:`,
+          drift.slice(0, 10)
+        );
+      }
+
+      return drift;
+    } catch (error) {
+      console.error('Ledger drift check error:', error);
+      return [];
+    } finally {
+      this.running = false;
+    }
+  }
+}
+
+export const ledgerDriftChecker = new LedgerDriftChecker();
@@ -0,0 +1,65 @@
+// Milestone creation shared by the single and bulk milestone endpoints
+import { randomUUID } from 'crypto';
+import { supabase } from '@/app/lib/supabase';
+import { escrowService } from '@/lib/mock-escrow';
+import { mapWithConcurrency } from '@/lib/concurrency';
+import type { Milestone } from '@/types/db';
+
+export const MAX_MILESTONES_PER_REQUEST = 100;
+const ESCROW_CREATE_CONCURRENCY = 8;
+
+export interface MilestoneInput {
+  title: string;
+  description?: string;
+  amount: number;
+  due_date?: string;
+}
+
+// Returns an error message for invalid input, or null when it is valid
+export function validateMilestoneInput(input: Partial<MilestoneInput> | null | undefined): string | null {
+  if (!input || !input.title || !input.amount || input.amount <= 0) {
+    return "Title and valid amount are required";
+  }
+  return null;
+}
+
+// Open provider escrows concurrently, then insert milestones, escrows and audit
+// rows in a single database transaction (create_milestones_with_escrows).
+export async function createMilestonesWithEscrows(
+  projectId: string,
+  userId: string,
+  inputs: MilestoneInput[]
+): Promise<{ milestones: Milestone[] | null; error: string | null }> {
+  const prepared = inputs.map(input => ({ ...input, id: randomUUID() }));
+
+  let escrowIds: string[];
+  try {
+    escrowIds = await mapWithConcurrency(prepared, ESCROW_CREATE_CONCURRENCY, async milestone => {
+      const { escrowId } = await escrowService.createEscrow(milestone.amount, milestone.id, projectId);
+      return escrowId;
+    });
+  } catch (escrowError) {
+    console.error('Escrow service error:', escrowError);
+    return { milestones: null, error: "Failed to create escrow" };
+  }
+
+  const { data: milestones, error } = await supabase.rpc('create_milestones_with_escrows', {
+    p_project_id: projectId,
+    p_user_id: userId,
+    p_milestones: prepared.map((milestone, index) => ({
+      id: milestone.id,
+      title: milestone.title,
+      description: milestone.description ?? null,
+      amount: milestone.amount,
+      due_date: milestone.due_date ?? null,
+      external_escrow_id: escrowIds[index],
+    })),
+  });
+
+  if (error) {
+    console.error('Milestone creation error:', error);
+    return { milestones: null, error: "Failed to create milestone" };
+  }
+
+  return { milestones: milestones as Milestone[], error: null };
+}
@@ -1,5 +1,17 @@
 // Mock Escrow Provider for WorkBridge
 // This simulates a real escrow service like Escrow.com or RazorpayX
+//
+// State is journaled to disk so escrows survive restarts, scheduled events
+// (pay-in settlement, webhook delivery) run on a hierarchical timer wheel, and
+// webhooks are delivered in batches. Latency and failure behaviour come from
+// MOCK_ESCROW_* environment variables so load tests can shape the traffic.
+//
+// The provider runs in-process by default. Set MOCK_ESCROW_URL to point the app
+// at the standalone stand-in service (scripts/mock-escrow-server.ts) instead.
+import fs from 'fs';
+import path from 'path';
+import { TimerWheel } from './timer-wheel';
+import { timed } from './request-timing';
 
 export interface EscrowTransaction {
   id: string;
@@ -12,18 +24,246 @@ export interface EscrowTransaction {
   metadata: Record<string, unknown>;
 }
 
-class MockEscrowProvider {
+export type LatencyDistribution =
+  | { kind: 'fixed'; ms: number }
+  | { kind: 'uniform'; min: number; max: number }
+  | { kind: 'exponential'; mean: number }
+  | { kind: 'lognormal'; median: number; sigma: number };
+
+export interface MockEscrowConfig {
+  webhookUrl: string;
+  stateFile: string | null; // null keeps state in memory only
+  latency: {
+    created: LatencyDistribution;
+    payin: LatencyDistribution;
+    payout: LatencyDistribution;
+    refund: LatencyDistribution;
+  };
+  payinFailureRate: number; // share of pay-ins that settle as payin.failed
+  deliveryFailureRate: number; // share of webhook batches dropped before delivery (retried)
+  webhookBatchSize: number;
+  webhookBatchInterval: number; // ms
+  tickMs: number;
+}
+
+interface WebhookEvent {
+  event: string;
+  data: Record<string, unknown>;
+  timestamp: string;
+  signature: string;
+}
+
+type JobSpec =
+  | { kind: 'settle_payin'; escrowId: string }
+  | { kind: 'webhook'; eventType: string; data: Record<string, unknown>; attempts: number };
+
+type ScheduledJob = JobSpec & { id: string; dueAt: number };
+type WebhookJob = Extract<ScheduledJob, { kind: 'webhook' }>;
+
+type JournalEntry =
+  | { op: 'tx'; tx: EscrowTransaction }
+  | { op: 'job'; job: ScheduledJob }
+  | { op: 'done'; id: string };
+
+// Parses "fixed:2000", "uniform:500-3000", "exponential:2000" or "lognormal:1500,0.5"
+export function parseLatency(spec: string | undefined, fallback: LatencyDistribution): LatencyDistribution {
+  if (!spec) return fallback;
+
+  const [kind, args = ''] = spec.split(':');
+  const numbers = args.split(/[-,]/).map(Number);
+
+  switch (kind) {
+    case 'fixed':
+      return { kind, ms: numbers[0] };
+    case 'uniform':
+      return { kind, min: numbers[0], max: numbers[1] };
+    case 'exponential':
+      return { kind, mean: numbers[0] };
+    case 'lognormal':
+      return { kind, median: numbers[0], sigma: numbers[1] ?? 0.5 };
+    default:
+      console.warn(`Unknown latency distribution "${spec}", using default`);
+      return fallback;
+  }
+}
+
+export function sampleLatency(distribution: LatencyDistribution): number {
+  switch (distribution.kind) {
+    case 'fixed':
+      return distribution.ms;
+    case 'uniform':
+      return distribution.min + Math.random() * (distribution.max - distribution.min);
+    case 'exponential':
+      return -distribution.mean * Math.log(1 - Math.random());
+    case 'lognormal': {
+      // Box-Muller transform for a standard normal sample
+      const normal = Math.sqrt(-2 * Math.log(1 - Math.random())) * Math.cos(2 * Math.PI * Math.random());
+      return distribution.median * Math.exp(distribution.sigma * normal);
+    }
+  }
+}
+
+export function loadMockEscrowConfig(overrides: Partial<MockEscrowConfig> = {}): MockEscrowConfig {
+  const env = process.env;
+  const defaultStateFile = env.NODE_ENV === 'production' ? null : '.mock-escrow/state.ndjson';
+
+  return {
+    webhookUrl: env.MOCK_ESCROW_WEBHOOK_URL || 'http://localhost:3000/api/webhooks/escrow',
+    stateFile: env.MOCK_ESCROW_STATE_FILE === 'memory'
+      ? null
+      : env.MOCK_ESCROW_STATE_FILE || defaultStateFile,
+    latency: {
+      created: parseLatency(env.MOCK_ESCROW_CREATED_LATENCY, { kind: 'fixed', ms: 100 }),
+      payin: parseLatency(env.MOCK_ESCROW_PAYIN_LATENCY, { kind: 'fixed', ms: 2000 }),
+      payout: parseLatency(env.MOCK_ESCROW_PAYOUT_LATENCY, { kind: 'fixed', ms: 1500 }),
+      refund: parseLatency(env.MOCK_ESCROW_REFUND_LATENCY, { kind: 'fixed', ms: 1000 }),
+    },
+    payinFailureRate: Number(env.MOCK_ESCROW_PAYIN_FAILURE_RATE || 0),
+    deliveryFailureRate: Number(env.MOCK_ESCROW_DELIVERY_FAILURE_RATE || 0),
+    webhookBatchSize: Number(env.MOCK_ESCROW_WEBHOOK_BATCH_SIZE || 50),
+    webhookBatchInterval: Number(env.MOCK_ESCROW_WEBHOOK_BATCH_INTERVAL || 100),
+    tickMs: Number(env.MOCK_ESCROW_TICK_MS || 10),
+    ...overrides,
+  };
+}
+
+// Append-only NDJSON journal of transaction and job changes. Writes are
+// buffered and flushed on a short interval so the hot path never blocks on disk.
+class EscrowJournal {
+  private readonly FLUSH_INTERVAL = 50; // ms
+  private buffer: string[] = [];
+  private flushing: Promise<void> | null = null;
+  private timer: ReturnType<typeof setInterval>;
+  private appendedSinceCompaction = 0;
+
+  constructor(private readonly file: string) {
+    fs.mkdirSync(path.dirname(file), { recursive: true });
+    this.timer = setInterval(() => {
+      void this.flush();
+    }, this.FLUSH_INTERVAL);
+    this.timer.unref?.();
+  }
+
+  // Replay the journal into maps of live transactions and pending jobs
+  load(): { transactions: Map<string, EscrowTransaction>; jobs: Map<string, ScheduledJob> } {
+    const transactions = new Map<string, EscrowTransaction>();
+    const jobs = new Map<string, ScheduledJob>();
+
+    if (!fs.existsSync(this.file)) {
+      return { transactions, jobs };
+    }
+
+    for (const line of fs.readFileSync(this.file, 'utf8').split('\n')) {
+      if (!line) continue;
+
+      let entry: JournalEntry;
+      try {
+        entry = JSON.parse(line);
+      } catch {
+        continue; // torn write from a crash
+      }
+
+      if (entry.op === 'tx') {
+        transactions.set(entry.tx.id, reviveTransaction(entry.tx));
+      } else if (entry.op === 'job') {
+        jobs.set(entry.job.id, entry.job);
+      } else if (entry.op === 'done') {
+        jobs.delete(entry.id);
+      }
+    }
+
+    return { transactions, jobs };
+  }
+
+  append(entry: JournalEntry): void {
+    this.buffer.push(JSON.stringify(entry));
+    this.appendedSinceCompaction++;
+  }
+
+  get appendedEntries(): number {
+    return this.appendedSinceCompaction;
+  }
+
+  // Rewrite the journal with only live state. Skipped while an append is in
+  // flight, since that older chunk could otherwise land after the snapshot.
+  compact(transactions: Iterable<EscrowTransaction>, jobs: Iterable<ScheduledJob>): void {
+    if (this.flushing) return;
+
+    const lines: string[] = [];
+    for (const tx of transactions) lines.push(JSON.stringify({ op: 'tx', tx }));
+    for (const job of jobs) lines.push(JSON.stringify({ op: 'job', job }));
+
+    const tmp = `${this.file}.tmp`;
+    fs.writeFileSync(tmp, lines.length ? `${lines.join('\n')}\n` : '');
+    fs.renameSync(tmp, this.file);
+    this.buffer = [];
+    this.appendedSinceCompaction = lines.length;
+  }
+
+  async flush(): Promise<void> {
+    if (this.flushing || this.buffer.length === 0) return this.flushing ?? undefined;
+
+    const chunk = `${this.buffer.join('\n')}\n`;
+    this.buffer = [];
+    this.flushing = fs.promises
+      .appendFile(this.file, chunk)
+      .catch(error => console.error('Mock escrow journal write failed:', error))
+      .finally(() => {
+        this.flushing = null;
+      });
+
+    return this.flushing;
+  }
+}
+
+function reviveTransaction(tx: EscrowTransaction): EscrowTransaction {
+  return {
+    ...tx,
+    createdAt: new Date(tx.createdAt),
+    fundedAt: tx.fundedAt ? new Date(tx.fundedAt) : undefined,
+    releasedAt: tx.releasedAt ? new Date(tx.releasedAt) : undefined,
+    refundedAt: tx.refundedAt ? new Date(tx.refundedAt) : undefined,
+  };
+}
+
+export class MockEscrowProvider {
+  private readonly MAX_DELIVERY_BACKOFF = 60 * 1000; // 1 minute
   private transactions: Map<string, EscrowTransaction> = new Map();
-  private webhookUrl: string;
+  private jobs: Map<string, ScheduledJob> = new Map();
+  private outbox: WebhookJob[] = [];
+  private readonly wheel: TimerWheel<string>;
+  private readonly journal: EscrowJournal | null;
+  private batchTimer: ReturnType<typeof setInterval>;
+  private readonly config: MockEscrowConfig;
+
+  constructor(config: MockEscrowConfig = loadMockEscrowConfig()) {
+    this.config = config;
+    this.wheel = new TimerWheel<string>(config.tickMs);
+    this.journal = config.stateFile ? new EscrowJournal(config.stateFile) : null;
+
+    if (this.journal) {
+      const { transactions, jobs } = this.journal.load();
+      this.transactions = transactions;
+      this.journal.compact(transactions.values(), jobs.values());
+
+      // Re-arm jobs that were pending when the process stopped
+      for (const job of jobs.values()) {
+        this.jobs.set(job.id, job);
+        this.wheel.schedule(Math.max(0, job.dueAt - Date.now()), job.id);
+      }
+    }
 
-  constructor(webhookUrl: string = '/api/webhooks/escrow') {
-    this.webhookUrl = webhookUrl;
+    this.wheel.start(jobId => this.runJob(jobId));
+    this.batchTimer = setInterval(() => {
+      void this.flushWebhooks();
+    }, config.webhookBatchInterval);
+    this.batchTimer.unref?.();
   }
 
   // Create an escrow account
   async createEscrow(amount: number, metadata: Record<string, unknown> = {}): Promise<{ escrowId: string; status: string }> {
     const escrowId = `ESC_${Date.now()}_${Math.random().toString(36).substr(2, 9)}`;
-    
+
     const transaction: EscrowTransaction = {
       id: escrowId,
       amount,
@@ -32,12 +272,10 @@ class MockEscrowProvider {
       metadata
     };
 
-    this.transactions.set(escrowId, transaction);
+    this.saveTransaction(transaction);
 
     // Simulate async processing
-    setTimeout(() => {
-      this.sendWebhook('escrow.created', { escrowId, amount, metadata });
-    }, 100);
+    this.scheduleWebhook(this.config.latency.created, 'escrow.created', { escrowId, amount, metadata });
 
     return {
       escrowId,
@@ -48,7 +286,7 @@ class MockEscrowProvider {
   // Initiate payment into escrow (client pays)
   async initiatePayIn(escrowId: string): Promise<{ success: boolean; paymentUrl?: string }> {
     const transaction = this.transactions.get(escrowId);
-    
+
     if (!transaction) {
       throw new Error('Escrow not found');
     }
@@ -58,20 +296,7 @@ class MockEscrowProvider {
     }
 
     // Simulate payment processing delay
-    setTimeout(() => {
-      const updatedTransaction = this.transactions.get(escrowId);
-      if (updatedTransaction) {
-        updatedTransaction.status = 'funded';
-        updatedTransaction.fundedAt = new Date();
-        this.transactions.set(escrowId, updatedTransaction);
-        
-        this.sendWebhook('payin.success', {
-          escrowId,
-          amount: updatedTransaction.amount,
-          fundedAt: updatedTransaction.fundedAt
-        });
-      }
-    }, 2000); // 2 second delay to simulate real payment processing
+    this.scheduleJob(sampleLatency(this.config.latency.payin), { kind: 'settle_payin', escrowId });
 
     return {
       success: true,
@@ -82,7 +307,7 @@ class MockEscrowProvider {
   // Release funds to freelancer
   async releaseFunds(escrowId: string, amount?: number): Promise<{ success: boolean; transactionId: string }> {
     const transaction = this.transactions.get(escrowId);
-    
+
     if (!transaction) {
       throw new Error('Escrow not found');
     }
@@ -92,7 +317,7 @@ class MockEscrowProvider {
     }
 
     const releaseAmount = amount || transaction.amount;
-    
+
     if (releaseAmount > transaction.amount) {
       throw new Error('Release amount cannot exceed escrow amount');
     }
@@ -106,19 +331,17 @@ class MockEscrowProvider {
     // Update transaction
     transaction.status = 'released';
     transaction.releasedAt = new Date();
-    this.transactions.set(escrowId, transaction);
+    this.saveTransaction(transaction);
 
     // Simulate processing delay
-    setTimeout(() => {
-      this.sendWebhook('payout.success', {
-        escrowId,
-        transactionId,
-        totalAmount: releaseAmount,
-        freelancerAmount,
-        platformFee,
-        releasedAt: transaction.releasedAt
-      });
-    }, 1500);
+    this.scheduleWebhook(this.config.latency.payout, 'payout.success', {
+      escrowId,
+      transactionId,
+      totalAmount: releaseAmount,
+      freelancerAmount,
+      platformFee,
+      releasedAt: transaction.releasedAt
+    });
 
     return {
       success: true,
@@ -129,7 +352,7 @@ class MockEscrowProvider {
   // Initiate refund to client
   async initiateRefund(escrowId: string, amount?: number, reason?: string): Promise<{ success: boolean; refundId: string }> {
     const transaction = this.transactions.get(escrowId);
-    
+
     if (!transaction) {
       throw new Error('Escrow not found');
     }
@@ -139,7 +362,7 @@ class MockEscrowProvider {
     }
 
     const refundAmount = amount || transaction.amount;
-    
+
     if (refundAmount > transaction.amount) {
       throw new Error('Refund amount cannot exceed escrow amount');
     }
@@ -149,18 +372,16 @@ class MockEscrowProvider {
     // Update transaction
     transaction.status = 'refunded';
     transaction.refundedAt = new Date();
-    this.transactions.set(escrowId, transaction);
+    this.saveTransaction(transaction);
 
     // Simulate processing delay
-    setTimeout(() => {
-      this.sendWebhook('refund.success', {
-        escrowId,
-        refundId,
-        amount: refundAmount,
-        reason,
-        refundedAt: transaction.refundedAt
-      });
-    }, 1000);
+    this.scheduleWebhook(this.config.latency.refund, 'refund.success', {
+      escrowId,
+      refundId,
+      amount: refundAmount,
+      reason,
+      refundedAt: transaction.refundedAt
+    });
 
     return {
       success: true,
@@ -171,7 +392,7 @@ class MockEscrowProvider {
   // Get escrow status
   async getEscrowStatus(escrowId: string): Promise<EscrowTransaction> {
     const transaction = this.transactions.get(escrowId);
-    
+
     if (!transaction) {
       throw new Error('Escrow not found');
     }
@@ -179,38 +400,157 @@ class MockEscrowProvider {
     return transaction;
   }
 
-  // Private method to send webhooks
-  private async sendWebhook(eventType: string, data: Record<string, unknown>) {
+  // Simulate payment failures (for testing)
+  async simulatePaymentFailure(escrowId: string, reason: string = 'Insufficient funds') {
+    const transaction = this.transactions.get(escrowId);
+
+    if (transaction) {
+      transaction.status = 'failed';
+      this.saveTransaction(transaction);
+
+      this.scheduleWebhook({ kind: 'fixed', ms: 0 }, 'payin.failed', {
+        escrowId,
+        reason,
+        failedAt: new Date()
+      });
+    }
+  }
+
+  // Get all transactions (for admin/debugging)
+  getAllTransactions(): EscrowTransaction[] {
+    return Array.from(this.transactions.values());
+  }
+
+  // Queue depths for load-test dashboards
+  getStats() {
+    return {
+      escrows: this.transactions.size,
+      scheduledJobs: this.wheel.size,
+      pendingWebhooks: this.outbox.length,
+    };
+  }
+
+  private saveTransaction(transaction: EscrowTransaction) {
+    this.transactions.set(transaction.id, transaction);
+    this.journal?.append({ op: 'tx', tx: transaction });
+  }
+
+  private scheduleJob(delayMs: number, job: JobSpec) {
+    const scheduled: ScheduledJob = {
+      ...job,
+      id: `JOB_${Date.now()}_${Math.random().toString(36).substr(2, 9)}`,
+      dueAt: Date.now() + delayMs,
+    };
+
+    this.jobs.set(scheduled.id, scheduled);
+    this.journal?.append({ op: 'job', job: scheduled });
+    this.wheel.schedule(delayMs, scheduled.id);
+  }
+
+  private scheduleWebhook(latency: LatencyDistribution, eventType: string, data: Record<string, unknown>) {
+    this.scheduleJob(sampleLatency(latency), { kind: 'webhook', eventType, data, attempts: 0 });
+  }
+
+  private runJob(jobId: string) {
+    const job = this.jobs.get(jobId);
+    if (!job) return;
+
+    if (job.kind === 'webhook') {
+      // Stays in `jobs` (and the journal) until the batch is delivered
+      this.outbox.push(job);
+      if (this.outbox.length >= this.config.webhookBatchSize) {
+        void this.flushWebhooks();
+      }
+      return;
+    }
+
+    this.completeJob(job.id);
+
+    const transaction = this.transactions.get(job.escrowId);
+    if (!transaction || transaction.status !== 'created') return;
+
+    if (Math.random() < this.config.payinFailureRate) {
+      transaction.status = 'failed';
+      this.saveTransaction(transaction);
+      this.scheduleWebhook({ kind: 'fixed', ms: 0 }, 'payin.failed', {
+        escrowId: transaction.id,
+        reason: 'Simulated payment failure',
+        failedAt: new Date()
+      });
+      return;
+    }
+
+    transaction.status = 'funded';
+    transaction.fundedAt = new Date();
+    this.saveTransaction(transaction);
+
+    this.scheduleWebhook({ kind: 'fixed', ms: 0 }, 'payin.success', {
+      escrowId: transaction.id,
+      amount: transaction.amount,
+      fundedAt: transaction.fundedAt
+    });
+  }
+
+  private completeJob(jobId: string) {
+    this.jobs.delete(jobId);
+    this.journal?.append({ op: 'done', id: jobId });
+
+    // Keep replay time bounded as the journal grows
+    if (this.journal && this.journal.appendedEntries > 10 * (this.transactions.size + this.jobs.size) + 10000) {
+      this.journal.compact(this.transactions.values(), this.jobs.values());
+    }
+  }
+
+  // Deliver up to one batch of due webhooks in a single POST
+  private async flushWebhooks() {
+    if (this.outbox.length === 0) return;
+
+    const batch = this.outbox.splice(0, this.config.webhookBatchSize);
+    const events: WebhookEvent[] = batch.map(job => ({
+      event: job.eventType,
+      data: job.data,
+      timestamp: new Date(job.dueAt).toISOString(),
+      signature: this.generateSignature(job.eventType, job.data) // Mock signature
+    }));
+
+    let delivered = false;
     try {
-      const webhookPayload = {
-        event: eventType,
-        data,
-        timestamp: new Date().toISOString(),
-        signature: this.generateSignature(eventType, data) // Mock signature
-      };
-
-      // In a real implementation, this would be an HTTP POST to the webhook URL
-      // For now, we'll just log it and trigger our webhook handler directly
-      console.log('📢 Mock Escrow Webhook:', webhookPayload);
-
-      // Trigger our webhook handler
-      if (typeof window === 'undefined') { // Server-side only
-        const response = await fetch(`http://localhost:3000${this.webhookUrl}`, {
-          method: 'POST',
-          headers: {
-            'Content-Type': 'application/json',
-            'X-Webhook-Signature': webhookPayload.signature
-          },
-          body: JSON.stringify(webhookPayload)
-        });
-
-        if (!response.ok) {
-          console.error('Webhook delivery failed:', response.status);
-        }
+      if (Math.random() < this.config.deliveryFailureRate) {
+        throw new Error('Simulated webhook delivery failure');
+      }
+
+      console.log(`📢 Mock Escrow Webhooks: delivering ${events.length} event(s)`);
+
+      const response = await fetch(this.config.webhookUrl, {
+        method: 'POST',
+        headers: {
+          'Content-Type': 'application/json',
+          'X-Webhook-Batch': 'true'
+        },
+        body: JSON.stringify({ events })
+      });
+
+      delivered = response.ok;
+      if (!response.ok) {
+        console.error('Webhook delivery failed:', response.status);
       }
     } catch (error) {
       console.error('Webhook error:', error);
     }
+
+    for (const job of batch) {
+      if (delivered) {
+        this.completeJob(job.id);
+        continue;
+      }
+
+      // Retry with exponential backoff on the wheel
+      job.attempts++;
+      const delay = Math.min(this.MAX_DELIVERY_BACKOFF, 500 * 2 ** job.attempts);
+      job.dueAt = Date.now() + delay;
+      this.journal?.append({ op: 'job', job });
+      this.wheel.schedule(delay, job.id);
+    }
   }
 
   // Generate mock signature for webhook verification
@@ -219,46 +559,74 @@ class MockEscrowProvider {
     // In real implementation, this would be HMAC-SHA256 with secret key
     return `sha256=${Buffer.from(payload).toString('base64').slice(0, 32)}`;
   }
+}
 
-  // Simulate payment failures (for testing)
-  async simulatePaymentFailure(escrowId: string, reason: string = 'Insufficient funds') {
-    const transaction = this.transactions.get(escrowId);
-    
-    if (transaction) {
-      transaction.status = 'failed';
-      this.transactions.set(escrowId, transaction);
-      
-      this.sendWebhook('payin.failed', {
-        escrowId,
-        reason,
-        failedAt: new Date()
-      });
+// Client for the standalone stand-in service (scripts/mock-escrow-server.ts)
+class RemoteEscrowProvider {
+  constructor(private readonly baseUrl: string) {}
+
+  private async call<T>(method: string, pathname: string, body?: Record<string, unknown>): Promise<T> {
+    const response = await fetch(`${this.baseUrl}${pathname}`, {
+      method,
+      headers: { 'Content-Type': 'application/json' },
+      body: body ? JSON.stringify(body) : undefined,
+    });
+
+    const payload = await response.json();
+    if (!response.ok) {
+      throw new Error(payload.error || `Escrow service error: ${response.status}`);
     }
+
+    return payload as T;
   }
 
-  // Get all transactions (for admin/debugging)
-  getAllTransactions(): EscrowTransaction[] {
-    return Array.from(this.transactions.values());
+  createEscrow(amount: number, metadata: Record<string, unknown> = {}) {
+    return this.call<{ escrowId: string; status: string }>('POST', '/escrows', { amount, metadata });
+  }
+
+  initiatePayIn(escrowId: string) {
+    return this.call<{ success: boolean; paymentUrl?: string }>('POST', `/escrows/${escrowId}/payin`);
+  }
+
+  releaseFunds(escrowId: string, amount?: number) {
+    return this.call<{ success: boolean; transactionId: string }>('POST', `/escrows/${escrowId}/release`, { amount });
+  }
+
+  initiateRefund(escrowId: string, amount?: number, reason?: string) {
+    return this.call<{ success: boolean; refundId: string }>('POST', `/escrows/${escrowId}/refund`, { amount, reason });
+  }
+
+  getEscrowStatus(escrowId: string) {
+    return this.call<EscrowTransaction>('GET', `/escrows/${escrowId}`);
   }
 }
 
-// Singleton instance
-export const mockEscrowProvider = new MockEscrowProvider();
+// Singleton instance, created on first use so importing this module has no side effects
+let provider: MockEscrowProvider | RemoteEscrowProvider | null = null;
+
+function getProvider() {
+  if (!provider) {
+    provider = process.env.MOCK_ESCROW_URL
+      ? new RemoteEscrowProvider(process.env.MOCK_ESCROW_URL)
+      : new MockEscrowProvider();
+  }
+  return provider;
+}
 
-// Helper functions for easier usage
+// Helper functions for easier usage. Each call is timed as an escrow span.
 export const escrowService = {
-  createEscrow: (amount: number, milestoneId: string, projectId: string) => 
-    mockEscrowProvider.createEscrow(amount, { milestoneId, projectId }),
-  
-  fundEscrow: (escrowId: string) => 
-    mockEscrowProvider.initiatePayIn(escrowId),
-  
-  releaseToFreelancer: (escrowId: string, amount?: number) => 
-    mockEscrowProvider.releaseFunds(escrowId, amount),
-  
-  refundToClient: (escrowId: string, amount?: number, reason?: string) => 
-    mockEscrowProvider.initiateRefund(escrowId, amount, reason),
-  
-  getStatus: (escrowId: string) => 
-    mockEscrowProvider.getEscrowStatus(escrowId)
-};
\ No newline at end of file
+  createEscrow: (amount: number, milestoneId: string, projectId: string) =>
+    timed('escrow', 'createEscrow', () => getProvider().createEscrow(amount, { milestoneId, projectId })),
+
+  fundEscrow: (escrowId: string) =>
+    timed('escrow', 'fundEscrow', () => getProvider().initiatePayIn(escrowId)),
+
+  releaseToFreelancer: (escrowId: string, amount?: number) =>
+    timed('escrow', 'releaseToFreelancer', () => getProvider().releaseFunds(escrowId, amount)),
+
+  refundToClient: (escrowId: string, amount?: number, reason?: string) =>
+    timed('escrow', 'refundToClient', () => getProvider().initiateRefund(escrowId, amount, reason)),
+
+  getStatus: (escrowId: string) =>
+    timed('escrow', 'getStatus', () => getProvider().getEscrowStatus(escrowId))
+};
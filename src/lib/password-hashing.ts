@@ -0,0 +1,213 @@
+// Password hashing on a worker-thread pool
+// bcrypt is deliberately slow (tens of ms per call at cost 10). Running it on
+// the main thread stalls every other request on the process, so signup and
+// login hand hashing and verification to a small pool of worker threads.
+//
+// Tuning:
+//   BCRYPT_COST                 cost factor for new hashes (default 10)
+//   PASSWORD_HASH_WORKERS       pool size (default: cores - 1, max 4)
+//   PASSWORD_HASH_MAX_QUEUE     queued jobs before new ones are rejected (default 500)
+import os from 'os';
+import { Worker } from 'worker_threads';
+
+export const BCRYPT_COST = Number(process.env.BCRYPT_COST || 10);
+
+export class PasswordHasherOverloadedError extends Error {
+  constructor() {
+    super('Password hashing queue is full');
+    this.name = 'PasswordHasherOverloadedError';
+  }
+}
+
+// Runs inside each worker. Eval'd rather than loaded from a file so it survives
+// bundling; bcryptjs is resolved from the app's node_modules.
+const WORKER_SOURCE = `
+const { parentPort } = require('worker_threads');
+const bcrypt = require('bcryptjs');
+
+parentPort.on('message', ({ id, op, password, hash, cost }) => {
+  try {
+    const result = op === 'hash'
+      ? bcrypt.hashSync(password, cost)
+      : bcrypt.compareSync(password, hash);
+    parentPort.postMessage({ id, result });
+  } catch (error) {
+    parentPort.postMessage({ id, error: error && error.message ? error.message : String(error) });
+  }
+});
+`;
+
+type Job =
+  | { op: 'hash'; password: string; cost: number }
+  | { op: 'compare'; password: string; hash: string };
+
+interface PendingJob {
+  id: number;
+  job: Job;
+  enqueuedAt: number;
+  resolve: (value: string | boolean) => void;
+  reject: (error: Error) => void;
+}
+
+interface PoolWorker {
+  worker: Worker;
+  current: PendingJob | null;
+}
+
+export interface PasswordHasherStats {
+  workers: number;
+  busy: number;
+  queueDepth: number;
+  maxQueueDepth: number; // high-water mark since start
+  completed: number;
+  failed: number;
+  rejected: number;
+  avgWaitMs: number;
+  avgRunMs: number;
+}
+
+class PasswordHasherPool {
+  private readonly size = Number(
+    process.env.PASSWORD_HASH_WORKERS || Math.max(1, Math.min(4, os.availableParallelism() - 1))
+  );
+  private readonly maxQueue = Number(process.env.PASSWORD_HASH_MAX_QUEUE || 500);
+
+  private readonly workers: PoolWorker[] = [];
+  private readonly queue: PendingJob[] = [];
+  private nextId = 1;
+
+  private completed = 0;
+  private failed = 0;
+  private rejected = 0;
+  private maxQueueDepth = 0;
+  private totalWaitMs = 0;
+  private totalRunMs = 0;
+  private runStartedAt = new Map<number, number>();
+
+  hash(password: string, cost: number = BCRYPT_COST): Promise<string> {
+    return this.submit({ op: 'hash', password, cost }) as Promise<string>;
+  }
+
+  compare(password: string, hash: string): Promise<boolean> {
+    return this.submit({ op: 'compare', password, hash }) as Promise<boolean>;
+  }
+
+  getStats(): PasswordHasherStats {
+    const finished = this.completed + this.failed;
+    return {
+      workers: this.workers.length,
+      busy: this.workers.filter(entry => entry.current).length,
+      queueDepth: this.queue.length,
+      maxQueueDepth: this.maxQueueDepth,
+      completed: this.completed,
+      failed: this.failed,
+      rejected: this.rejected,
+      avgWaitMs: finished ? this.totalWaitMs / finished : 0,
+      avgRunMs: finished ? this.totalRunMs / finished : 0,
+    };
+  }
+
+  private submit(job: Job): Promise<string | boolean> {
+    if (this.queue.length >= this.maxQueue) {
+      this.rejected++;
+      return Promise.reject(new PasswordHasherOverloadedError());
+    }
+
+    return new Promise((resolve, reject) => {
+      this.queue.push({ id: this.nextId++, job, enqueuedAt: Date.now(), resolve, reject });
+      this.maxQueueDepth = Math.max(this.maxQueueDepth, this.queue.length);
+      this.dispatch();
+    });
+  }
+
+  private dispatch(): void {
+    while (this.queue.length > 0) {
+      let idle = this.workers.find(entry => !entry.current);
+      if (!idle && this.workers.length < this.size) {
+        idle = this.spawn();
+      }
+      if (!idle) return;
+
+      const pending = this.queue.shift()!;
+      const now = Date.now();
+      this.totalWaitMs += now - pending.enqueuedAt;
+      this.runStartedAt.set(pending.id, now);
+
+      idle.current = pending;
+      idle.worker.postMessage({ id: pending.id, ...pending.job });
+    }
+  }
+
+  private spawn(): PoolWorker {
+    const entry: PoolWorker = {
+      worker: new Worker(WORKER_SOURCE, { eval: true }),
+      current: null,
+    };
+
+    // Idle workers must not keep the process alive
+    entry.worker.unref();
+
+    entry.worker.on('message', ({ id, result, error }: { id: number; result?: string | boolean; error?: string }) => {
+      const pending = entry.current;
+      if (!pending || pending.id !== id) return;
+
+      entry.current = null;
+      this.finish(pending, error);
+
+      if (error) pending.reject(new Error(error));
+      else pending.resolve(result!);
+
+      this.dispatch();
+    });
+
+    const replace = (error: Error) => {
+      const index = this.workers.indexOf(entry);
+      if (index !== -1) this.workers.splice(index, 1);
+
+      if (entry.current) {
+        this.finish(entry.current, error.message);
+        entry.current.reject(error);
+        entry.current = null;
+      }
+
+      this.dispatch();
+    };
+
+    entry.worker.on('error', error => {
+      console.error('Password hashing worker crashed:', error);
+      replace(error);
+    });
+    entry.worker.on('exit', code => {
+      if (code !== 0) replace(new Error(`Password hashing worker exited with code ${code}`));
+    });
+
+    this.workers.push(entry);
+    return entry;
+  }
+
+  private finish(pending: PendingJob, error?: string): void {
+    const started = this.runStartedAt.get(pending.id);
+    this.runStartedAt.delete(pending.id);
+    if (started) this.totalRunMs += Date.now() - started;
+
+    if (error) this.failed++;
+    else this.completed++;
+  }
+}
+
+export const passwordHasher = new PasswordHasherPool();
+
+export function hashPassword(password: string): Promise<string> {
+  return passwordHasher.hash(password);
+}
+
+export function verifyPassword(password: string, hash: string): Promise<boolean> {
+  return passwordHasher.compare(password, hash);
+}
+
+// True when a stored hash was made with a lower cost than BCRYPT_COST, so it
+// can be upgraded transparently after a successful login
+export function needsRehash(hash: string): boolean {
+  const match = /^\$2[abxy]?\$(\d{2})\$/.exec(hash);
+  return !match || Number(match[1]) < BCRYPT_COST;
+}
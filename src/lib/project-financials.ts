@@ -0,0 +1,18 @@
+// Per-project financial rollups backed by the project_financials table
+import { supabase } from '@/app/lib/supabase';
+
+// Embed fragment for project selects, e.g. `*, ${PROJECT_FINANCIALS_EMBED}`
+export const PROJECT_FINANCIALS_EMBED =
+  'financials:project_financials(milestone_count, total_amount, funded_amount, released_amount, refunded_amount, open_disputes, updated_at)';
+
+// Recompute the rollup for one project after a milestone, escrow or dispute write.
+// Failures are logged rather than thrown so they never fail the money movement itself.
+export async function refreshProjectFinancials(projectId: string | null | undefined): Promise<void> {
+  if (!projectId) return;
+
+  const { error } = await supabase.rpc('refresh_project_financials', { p_project_id: projectId });
+
+  if (error) {
+    console.error('Failed to refresh project financials:', error);
+  }
+}
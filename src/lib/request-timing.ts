@@ -0,0 +1,243 @@
+// Per-request timing of database and escrow provider calls
+// Every Supabase HTTP call (through the client's fetch hook) and every
+// escrowService call is recorded as a span: kind, name (e.g. "select
+// milestones", "releaseToFreelancer"), duration and row count. Spans feed
+// process-wide latency histograms and, inside a route wrapped with
+// withServerTiming, the response's Server-Timing header. Recording is a few
+// array pushes per call, so it stays on in production.
+import { AsyncLocalStorage } from 'async_hooks';
+import { reportRoundTrips, roundTripBudgetsEnabled } from './round-trip-budget';
+
+export type SpanKind = 'db' | 'escrow';
+
+export interface Span {
+  kind: SpanKind;
+  name: string;
+  startMs: number; // relative to the start of the request
+  durationMs: number;
+  rows: number | null;
+}
+
+export interface RequestTiming {
+  startedAt: number;
+  spans: Span[];
+}
+
+export interface TimingHistogram {
+  kind: SpanKind;
+  name: string;
+  count: number;
+  sumMs: number;
+  maxMs: number;
+  rows: number;
+  buckets: { le: number; count: number }[]; // cumulative, Prometheus-style
+}
+
+// Upper bounds in ms; the last bucket is +Inf
+export const HISTOGRAM_BUCKETS_MS = [1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000];
+
+const MAX_SPANS_PER_REQUEST = 200;
+const MAX_SERVER_TIMING_ENTRIES = 20;
+// Bounds histogram memory if names ever become high-cardinality
+const MAX_HISTOGRAMS = 500;
+
+const requestTiming = new AsyncLocalStorage<RequestTiming>();
+
+interface HistogramState {
+  kind: SpanKind;
+  name: string;
+  count: number;
+  sumMs: number;
+  maxMs: number;
+  rows: number;
+  buckets: number[]; // non-cumulative, one extra slot for +Inf
+}
+
+const histograms = new Map<string, HistogramState>();
+
+// Record a call that started at `startedAt` (performance.now()) and just finished
+export function recordSpan(kind: SpanKind, name: string, startedAt: number, rows: number | null = null): void {
+  const durationMs = performance.now() - startedAt;
+  const timing = requestTiming.getStore();
+  if (timing && timing.spans.length < MAX_SPANS_PER_REQUEST) {
+    timing.spans.push({ kind, name, startMs: startedAt - timing.startedAt, durationMs, rows });
+  }
+
+  const key = `${kind}:${name}`;
+  let histogram = histograms.get(key);
+  if (!histogram) {
+    if (histograms.size >= MAX_HISTOGRAMS) return;
+    histogram = {
+      kind,
+      name,
+      count: 0,
+      sumMs: 0,
+      maxMs: 0,
+      rows: 0,
+      buckets: new Array(HISTOGRAM_BUCKETS_MS.length + 1).fill(0),
+    };
+    histograms.set(key, histogram);
+  }
+
+  histogram.count++;
+  histogram.sumMs += durationMs;
+  histogram.maxMs = Math.max(histogram.maxMs, durationMs);
+  histogram.rows += rows ?? 0;
+
+  let bucket = HISTOGRAM_BUCKETS_MS.findIndex(bound => durationMs <= bound);
+  if (bucket === -1) bucket = HISTOGRAM_BUCKETS_MS.length;
+  histogram.buckets[bucket]++;
+}
+
+// Time an async call as a span, whether it resolves or rejects
+export async function timed<T>(kind: SpanKind, name: string, fn: () => Promise<T>): Promise<T> {
+  const started = performance.now();
+  try {
+    return await fn();
+  } finally {
+    recordSpan(kind, name, started);
+  }
+}
+
+// Label a PostgREST / storage request, e.g. "select milestones", "rpc transition_milestone"
+export function describeSupabaseRequest(url: string, method: string): string {
+  const { pathname } = new URL(url);
+  const rest = /^\/rest\/v1\/(rpc\/)?([^/]+)/.exec(pathname);
+
+  if (rest) {
+    if (rest[1]) return `rpc ${rest[2]}`;
+    const op = { GET: 'select', HEAD: 'count', POST: 'insert', PATCH: 'update', DELETE: 'delete' }[method] ?? method.toLowerCase();
+    return `${op} ${rest[2]}`;
+  }
+
+  const service = /^\/(storage|auth|functions)\/v1\//.exec(pathname);
+  return service ? `${service[1]} ${method.toLowerCase()}` : `${method.toLowerCase()} ${pathname}`;
+}
+
+// Rows returned, from PostgREST's Content-Range ("0-24/*" or "0-24/312")
+function rowCount(response: Response): number | null {
+  const range = response.headers.get('content-range');
+  if (!range) return null;
+
+  const match = /^(\d+)-(\d+)/.exec(range);
+  return match ? Number(match[2]) - Number(match[1]) + 1 : 0;
+}
+
+// fetch for the shared Supabase client: records a db span per request
+export const timedFetch: typeof fetch = async (input, init) => {
+  const url = typeof input === 'string' ? input : input instanceof URL ? input.href : input.url;
+  const method = (init?.method ?? (input instanceof Request ? input.method : 'GET')).toUpperCase();
+  const started = performance.now();
+
+  try {
+    const response = await fetch(input, init);
+    recordSpan('db', describeSupabaseRequest(url, method), started, rowCount(response));
+    return response;
+  } catch (error) {
+    recordSpan('db', describeSupabaseRequest(url, method), started);
+    throw error;
+  }
+};
+
+function serverTimingHeader(timing: RequestTiming): string {
+  const grouped = new Map<string, { kind: SpanKind; name: string; durationMs: number; calls: number }>();
+
+  for (const span of timing.spans) {
+    const key = `${span.kind}:${span.name}`;
+    const entry = grouped.get(key) ?? { kind: span.kind, name: span.name, durationMs: 0, calls: 0 };
+    entry.durationMs += span.durationMs;
+    entry.calls++;
+    grouped.set(key, entry);
+  }
+
+  const entries = [...grouped.values()]
+    .sort((a, b) => b.durationMs - a.durationMs)
+    .slice(0, MAX_SERVER_TIMING_ENTRIES)
+    .map((entry, index) => {
+      const desc = `${entry.name}${entry.calls > 1 ? ` x${entry.calls}` : ''}`.replace(/["\\]/g, '');
+      return `${entry.kind}-${index};dur=${entry.durationMs.toFixed(1)};desc="${desc}"`;
+    });
+
+  const total = (kind: SpanKind) =>
+    timing.spans.filter(span => span.kind === kind).reduce((sum, span) => sum + span.durationMs, 0);
+
+  return [
+    `total;dur=${(performance.now() - timing.startedAt).toFixed(1)}`,
+    `db;dur=${total('db').toFixed(1)};desc="${timing.spans.filter(span => span.kind === 'db').length} calls"`,
+    `escrow;dur=${total('escrow').toFixed(1)}`,
+    ...entries,
+  ].join(', ');
+}
+
+// Run `fn` outside the current request's timing context. Background work a
+// request starts (worker drains, flush timers, polling intervals) would
+// otherwise inherit the request's store: its calls would be counted against
+// the request, and the store would stay reachable for as long as the timer
+// or loop keeps running.
+export function outsideRequest<T>(fn: () => T): T {
+  return requestTiming.exit(fn);
+}
+
+// Wrap a route handler so the spans it records are reported in Server-Timing
+// (and, outside production, checked against the route's round-trip budget)
+export function withServerTiming<A extends unknown[], R extends Response>(
+  handler: (...args: A) => Promise<R>
+): (...args: A) => Promise<R> {
+  return (...args: A) => {
+    const timing: RequestTiming = { startedAt: performance.now(), spans: [] };
+
+    return requestTiming.run(timing, async () => {
+      const response = await handler(...args);
+
+      try {
+        response.headers.set('Server-Timing', serverTimingHeader(timing));
+
+        if (roundTripBudgetsEnabled() && args[0] instanceof Request) {
+          reportRoundTrips(args[0], response, timing);
+        }
+      } catch {
+        // Immutable headers (e.g. Response.redirect); skip the header
+      }
+
+      return response;
+    });
+  };
+}
+
+export function getTimingHistograms(): TimingHistogram[] {
+  return [...histograms.values()].map(histogram => {
+    let cumulative = 0;
+    return {
+      kind: histogram.kind,
+      name: histogram.name,
+      count: histogram.count,
+      sumMs: histogram.sumMs,
+      maxMs: histogram.maxMs,
+      rows: histogram.rows,
+      buckets: histogram.buckets.map((count, index) => {
+        cumulative += count;
+        return { le: HISTOGRAM_BUCKETS_MS[index] ?? Infinity, count: cumulative };
+      }),
+    };
+  });
+}
+
+// Prometheus text exposition of the histograms
+export function formatTimingHistograms(): string {
+  const lines = [
+    '# HELP workbridge_call_duration_ms Duration of database and escrow provider calls',
+    '# TYPE workbridge_call_duration_ms histogram',
+  ];
+
+  for (const histogram of getTimingHistograms()) {
+    const labels = `kind="${histogram.kind}",name="${histogram.name.replace(/["\\\n]/g, '_')}"`;
+    for (const bucket of histogram.buckets) {
+      const le = bucket.le === Infinity ? '+Inf' : String(bucket.le);
+      lines.push(`workbridge_call_duration_ms_bucket{${labels},le="${le}"} ${bucket.count}`);
+    }
+    lines.push(`workbridge_call_duration_ms_sum{${labels}} ${histogram.sumMs.toFixed(3)}`);
+    lines.push(`workbridge_call_duration_ms_count{${labels}} ${histogram.count}`);
+  }
+
+  return lines.join('\n') + '\n';
+}
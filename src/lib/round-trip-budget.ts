@@ -0,0 +1,150 @@
+// Database round-trip budgets for development and test runs
+// Each budgeted route declares how many database calls it may make, and
+// optionally how many sequential waves they may span (calls that overlap in
+// time share a wave). When enabled, withServerTiming reports the counts and
+// heuristic findings - repeated calls that could be merged, back-to-back
+// reads that might run concurrently - as X-Db-* / X-Round-Trip-* response
+// headers, and logs a warning when a route goes over budget. The benchmark
+// harness (round_trip_budget_test.py) reads the headers and fails the run.
+//
+// On by default outside production; ROUND_TRIP_BUDGETS=on|off overrides.
+import type { RequestTiming, Span } from './request-timing';
+
+export interface RoundTripBudget {
+  roundTrips: number;
+  waves?: number;
+}
+
+export interface RoundTripReport {
+  route: string | null;
+  budget: RoundTripBudget | null;
+  roundTrips: number;
+  waves: number;
+  exceeded: boolean;
+  findings: string[];
+}
+
+// Keyed by "METHOD /api/path", with [param] for dynamic segments. Counts
+// assume a warm session/profile cache; a cold profile lookup adds one call.
+export const ROUND_TRIP_BUDGETS: Record<string, RoundTripBudget> = {
+  'POST /api/auth/send-otp': { roundTrips: 4 },
+  'POST /api/auth/verify-otp': { roundTrips: 6 },
+  'POST /api/login': { roundTrips: 1 },
+  'POST /api/signup': { roundTrips: 2 },
+  'GET /api/user/me': { roundTrips: 1 },
+  'POST /api/user/update-role': { roundTrips: 1 },
+  'GET /api/dashboard/bootstrap': { roundTrips: 1 },
+  'GET /api/projects': { roundTrips: 1 },
+  'POST /api/projects': { roundTrips: 2 },
+  'GET /api/projects/[id]': { roundTrips: 1 },
+  'GET /api/projects/[id]/milestones': { roundTrips: 2 },
+  'POST /api/projects/[id]/milestones': { roundTrips: 2 },
+  'POST /api/projects/[id]/milestones/bulk': { roundTrips: 2 },
+  'POST /api/milestones/[id]/fund': { roundTrips: 3 },
+  'POST /api/milestones/[id]/release': { roundTrips: 3 },
+  'POST /api/milestones/[id]/refund': { roundTrips: 3 },
+  'GET /api/transactions': { roundTrips: 2 },
+  'GET /api/disputes': { roundTrips: 1 },
+  'POST /api/disputes': { roundTrips: 4 },
+  'POST /api/disputes/[id]/resolve': { roundTrips: 4 },
+  'GET /api/chat/conversations': { roundTrips: 1 },
+  'POST /api/chat/conversations': { roundTrips: 3 },
+  'GET /api/chat/conversations/[id]/messages': { roundTrips: 3 },
+  'POST /api/chat/conversations/[id]/messages': { roundTrips: 3 },
+};
+
+const MAX_FINDINGS_HEADER_LENGTH = 1000;
+
+const routePatterns = Object.keys(ROUND_TRIP_BUDGETS).map(route => {
+  const [method, path] = route.split(' ');
+  const pattern = new RegExp(`^${path.replace(/\[[^\]]+\]/g, '[^/]+')}/?$`);
+  return { route, method, pattern };
+});
+
+export function roundTripBudgetsEnabled(): boolean {
+  const setting = process.env.ROUND_TRIP_BUDGETS;
+  if (setting) return setting === 'on';
+  return process.env.NODE_ENV !== 'production';
+}
+
+export function findRoundTripBudget(method: string, pathname: string): { route: string; budget: RoundTripBudget } | null {
+  const match = routePatterns.find(entry => entry.method === method && entry.pattern.test(pathname));
+  return match ? { route: match.route, budget: ROUND_TRIP_BUDGETS[match.route] } : null;
+}
+
+// Group calls into waves: a call that starts after everything in the current
+// wave has finished begins the next one
+export function groupIntoWaves(spans: Span[]): Span[][] {
+  const waves: Span[][] = [];
+  let waveEnd = -Infinity;
+
+  for (const span of [...spans].sort((a, b) => a.startMs - b.startMs)) {
+    if (waves.length === 0 || span.startMs >= waveEnd) {
+      waves.push([span]);
+      waveEnd = span.startMs + span.durationMs;
+    } else {
+      waves[waves.length - 1].push(span);
+      waveEnd = Math.max(waveEnd, span.startMs + span.durationMs);
+    }
+  }
+
+  return waves;
+}
+
+const isRead = (span: Span) => span.name.startsWith('select ') || span.name.startsWith('count ');
+
+export function analyzeRoundTrips(spans: Span[], budget: RoundTripBudget | null): Omit<RoundTripReport, 'route'> {
+  const db = spans.filter(span => span.kind === 'db');
+  const waves = groupIntoWaves(db);
+  const findings: string[] = [];
+
+  // The same call more than once: a batch (.in()) or an embed could merge them
+  const counts = new Map<string, number>();
+  for (const span of db) counts.set(span.name, (counts.get(span.name) ?? 0) + 1);
+  for (const [name, count] of counts) {
+    if (count > 1) findings.push(`repeated: ${name} x${count}`);
+  }
+
+  // Consecutive single-read waves on different tables: independent unless the
+  // second query needs the first one's result, in which case an embed may do
+  for (let i = 1; i < waves.length; i++) {
+    const [previous, current] = [waves[i - 1], waves[i]];
+    if (previous.every(isRead) && current.every(isRead) && previous[0].name !== current[0].name) {
+      findings.push(`sequential reads: ${previous.map(span => span.name).join(' + ')} -> ${current.map(span => span.name).join(' + ')}`);
+    }
+  }
+
+  const exceeded = budget !== null
+    && (db.length > budget.roundTrips || (budget.waves !== undefined && waves.length > budget.waves));
+
+  return { budget, roundTrips: db.length, waves: waves.length, exceeded, findings };
+}
+
+// Annotate the response with the request's round-trip report
+export function reportRoundTrips(request: Request, response: Response, timing: RequestTiming): RoundTripReport {
+  const { pathname } = new URL(request.url);
+  const declared = findRoundTripBudget(request.method, pathname);
+  const report = { route: declared?.route ?? null, ...analyzeRoundTrips(timing.spans, declared?.budget ?? null) };
+
+  response.headers.set('X-Db-Round-Trips', String(report.roundTrips));
+  response.headers.set('X-Db-Waves', String(report.waves));
+
+  if (report.budget) {
+    const { roundTrips, waves } = report.budget;
+    response.headers.set('X-Round-Trip-Budget', waves === undefined ? String(roundTrips) : `${roundTrips};waves=${waves}`);
+    response.headers.set('X-Round-Trip-Budget-Exceeded', report.exceeded ? '1' : '0');
+  }
+
+  if (report.findings.length > 0) {
+    response.headers.set('X-Round-Trip-Findings', report.findings.join('; ').slice(0, MAX_FINDINGS_HEADER_LENGTH));
+  }
+
+  if (report.exceeded) {
+    console.warn(
+      `Round-trip budget exceeded for ${report.route}: ${report.roundTrips} calls in ${report.waves} wave(s)`,
+      timing.spans.filter(span => span.kind === 'db').map(span => span.name)
+    );
+  }
+
+  return report;
+}
@@ -0,0 +1,111 @@
+// Session resolution
+// One place that knows how sessions are issued and read: the cookie name and
+// options, token signing, and claim verification. Verified claims are memoized
+// per request and cached process-wide per token, so a request that checks the
+// session several times (or many requests with the same cookie) pay for one
+// HMAC verification.
+import { cookies } from 'next/headers';
+import type { NextRequest, NextResponse } from 'next/server';
+import { signJwt, verifyJwt, type JwtPayload } from './jwt';
+
+export const SESSION_COOKIE = 'auth-token';
+// Older builds set the session under this name; still accepted, cleared on logout
+const LEGACY_SESSION_COOKIE = 'token';
+
+const SESSION_MAX_AGE = 7 * 24 * 60 * 60; // 7 days, matches the JWT expiry
+
+const VERIFIED_TTL_MS = 5 * 60 * 1000; // re-verify at least every 5 minutes
+const REJECTED_TTL_MS = 30 * 1000;     // remember bad tokens briefly
+const CACHE_MAX_ENTRIES = 10_000;
+
+interface CachedVerification {
+  claims: JwtPayload | null;
+  expiresAt: number;
+}
+
+// Process-wide, LRU-ordered (Map iteration order = least recently used first)
+const verificationCache = new Map<string, CachedVerification>();
+
+type CookieSource = Pick<NextRequest['cookies'], 'get'>;
+
+// Per-request memo, keyed by the request's cookie store
+const requestSessions = new WeakMap<object, Promise<JwtPayload | null>>();
+
+export async function verifySessionToken(token: string): Promise<JwtPayload | null> {
+  const now = Date.now();
+  const cached = verificationCache.get(token);
+
+  if (cached && cached.expiresAt > now) {
+    verificationCache.delete(token);
+    verificationCache.set(token, cached);
+    return cached.claims;
+  }
+
+  const claims = await verifyJwt(token);
+  const tokenExpiry = claims?.exp ? claims.exp * 1000 : Infinity;
+
+  verificationCache.delete(token);
+  verificationCache.set(token, {
+    claims,
+    expiresAt: claims ? Math.min(now + VERIFIED_TTL_MS, tokenExpiry) : now + REJECTED_TTL_MS,
+  });
+
+  if (verificationCache.size > CACHE_MAX_ENTRIES) {
+    verificationCache.delete(verificationCache.keys().next().value!);
+  }
+
+  return claims;
+}
+
+export function getSessionToken(cookieStore: CookieSource): string | undefined {
+  return cookieStore.get(SESSION_COOKIE)?.value || cookieStore.get(LEGACY_SESSION_COOKIE)?.value;
+}
+
+// Resolve the signed-in user's claims. Pass the request in route handlers that
+// have one; otherwise the cookies of the current request are read from
+// next/headers. Returns null when there is no valid session.
+export async function getSession(request?: NextRequest): Promise<JwtPayload | null> {
+  try {
+    const cookieStore: CookieSource = request ? request.cookies : await cookies();
+
+    let session = requestSessions.get(cookieStore);
+    if (!session) {
+      const token = getSessionToken(cookieStore);
+      session = token ? verifySessionToken(token) : Promise.resolve(null);
+      requestSessions.set(cookieStore, session);
+    }
+
+    return await session;
+  } catch {
+    return null;
+  }
+}
+
+export async function createSessionToken(claims: { userId: string; email: string; role: string }): Promise<string> {
+  return signJwt({ userId: claims.userId, email: claims.email, role: claims.role });
+}
+
+export function setSessionCookie(response: NextResponse, token: string): void {
+  response.cookies.set(SESSION_COOKIE, token, {
+    httpOnly: true,
+    secure: process.env.NODE_ENV === 'production',
+    sameSite: 'lax',
+    maxAge: SESSION_MAX_AGE,
+    path: '/',
+  });
+}
+
+export function clearSessionCookie(response: NextResponse, token?: string): void {
+  if (token) {
+    verificationCache.delete(token);
+  }
+
+  for (const name of [SESSION_COOKIE, LEGACY_SESSION_COOKIE]) {
+    response.cookies.set(name, '', {
+      httpOnly: true,
+      secure: process.env.NODE_ENV === 'production',
+      path: '/',
+      expires: new Date(0), // expire immediately
+    });
+  }
+}
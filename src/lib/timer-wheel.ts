@@ -0,0 +1,156 @@
+// Hierarchical timer wheel
+// Schedules large numbers of timers with O(1) insert/cancel and a single
+// interval driving the whole wheel, instead of one setTimeout per timer.
+//
+// Level 0 has `wheelSize` slots of `tickMs` each; every higher level has
+// `wheelSize` slots covering a full rotation of the level below. Timers are
+// placed on the coarsest level that fits and cascade down as their slot comes
+// due. Timers further out than the top level wait in an overflow list.
+
+interface TimerEntry<T> {
+  id: number;
+  expiresAtTick: number;
+  item: T;
+  cancelled: boolean;
+}
+
+export class TimerWheel<T> {
+  private readonly tickMs: number;
+  private readonly wheelSize: number;
+  private readonly levels: TimerEntry<T>[][][];
+  private readonly spans: number[]; // ticks covered by one slot at each level
+  private readonly entries: Map<number, TimerEntry<T>> = new Map();
+  private overflow: TimerEntry<T>[] = [];
+  private currentTick: number;
+  private readonly startedAt: number;
+  private nextId = 1;
+  private interval: ReturnType<typeof setInterval> | null = null;
+
+  constructor(tickMs: number = 10, wheelSize: number = 64, levelCount: number = 4) {
+    this.tickMs = tickMs;
+    this.wheelSize = wheelSize;
+    this.levels = Array.from({ length: levelCount }, () =>
+      Array.from({ length: wheelSize }, () => [] as TimerEntry<T>[])
+    );
+    this.spans = Array.from({ length: levelCount }, (_, level) => wheelSize ** level);
+    this.startedAt = Date.now();
+    this.currentTick = 0;
+  }
+
+  get size(): number {
+    return this.entries.size;
+  }
+
+  // Schedule `item` to expire after `delayMs`. Returns a handle for cancel().
+  schedule(delayMs: number, item: T): number {
+    const ticks = Math.max(1, Math.ceil(delayMs / this.tickMs));
+    const entry: TimerEntry<T> = {
+      id: this.nextId++,
+      expiresAtTick: this.nowTick() + ticks,
+      item,
+      cancelled: false,
+    };
+
+    this.entries.set(entry.id, entry);
+    this.place(entry);
+    return entry.id;
+  }
+
+  cancel(id: number): boolean {
+    const entry = this.entries.get(id);
+    if (!entry) return false;
+
+    // Lazy removal: the slot drops it when it is next visited
+    entry.cancelled = true;
+    this.entries.delete(id);
+    return true;
+  }
+
+  // Advance the wheel to `now`, returning every item that expired on the way.
+  advance(now: number = Date.now()): T[] {
+    const targetTick = Math.floor((now - this.startedAt) / this.tickMs);
+    const expired: T[] = [];
+
+    while (this.currentTick < targetTick) {
+      this.currentTick++;
+
+      // Cascade coarse slots whose window starts at this tick, top level first
+      for (let level = this.levels.length - 1; level >= 1; level--) {
+        if (this.currentTick % this.spans[level] === 0) {
+          if (level === this.levels.length - 1) {
+            this.drainOverflow();
+          }
+          const slotIndex = Math.floor(this.currentTick / this.spans[level]) % this.wheelSize;
+          const slot = this.levels[level][slotIndex];
+          this.levels[level][slotIndex] = [];
+          for (const entry of slot) {
+            if (!entry.cancelled) this.place(entry);
+          }
+        }
+      }
+
+      const slotIndex = this.currentTick % this.wheelSize;
+      const slot = this.levels[0][slotIndex];
+      this.levels[0][slotIndex] = [];
+      for (const entry of slot) {
+        if (entry.cancelled) continue;
+        this.entries.delete(entry.id);
+        expired.push(entry.item);
+      }
+    }
+
+    return expired;
+  }
+
+  // Drive the wheel from a single interval, invoking `onExpire` per item.
+  start(onExpire: (item: T) => void): void {
+    if (this.interval) return;
+
+    this.interval = setInterval(() => {
+      for (const item of this.advance()) {
+        try {
+          onExpire(item);
+        } catch (error) {
+          console.error('Timer wheel callback error:', error);
+        }
+      }
+    }, this.tickMs);
+    this.interval.unref?.();
+  }
+
+  stop(): void {
+    if (this.interval) {
+      clearInterval(this.interval);
+      this.interval = null;
+    }
+  }
+
+  private nowTick(): number {
+    return Math.max(this.currentTick, Math.floor((Date.now() - this.startedAt) / this.tickMs));
+  }
+
+  private place(entry: TimerEntry<T>): void {
+    // Entries cascading into the current tick land in the level-0 slot that
+    // advance() is about to expire, so they fire on time
+    const expiresAtTick = Math.max(entry.expiresAtTick, this.currentTick);
+    const remaining = expiresAtTick - this.currentTick;
+
+    for (let level = 0; level < this.levels.length; level++) {
+      if (remaining < this.spans[level] * this.wheelSize) {
+        const slotIndex = Math.floor(expiresAtTick / this.spans[level]) % this.wheelSize;
+        this.levels[level][slotIndex].push(entry);
+        return;
+      }
+    }
+
+    this.overflow.push(entry);
+  }
+
+  private drainOverflow(): void {
+    const pending = this.overflow;
+    this.overflow = [];
+    for (const entry of pending) {
+      if (!entry.cancelled) this.place(entry);
+    }
+  }
+}
@@ -0,0 +1,88 @@
+// Process-wide cache of the user fields that can change after sign-in
+// JWT claims are fixed for the life of the token, so role and KYC changes
+// need a users read to be seen. This cache keeps that read off the hot path:
+// entries live for a short TTL and are dropped explicitly by the routes that
+// change them (update-role, which also sets skills, verify-otp, KYC
+// submission). Other instances only see a change once their entry expires,
+// which bounds staleness to the TTL.
+import { supabase } from '@/app/lib/supabase';
+import type { DBUser } from '@/types/db';
+
+export interface UserProfile {
+  id: string;
+  email: string;
+  role: DBUser['role'];
+  kyc_status: DBUser['kyc_status'] | null;
+  email_verified: boolean | null;
+  skills: string[] | null;
+}
+
+const PROFILE_TTL_MS = Number(process.env.USER_PROFILE_CACHE_TTL_MS || 60 * 1000);
+const CACHE_MAX_ENTRIES = 10_000;
+
+interface CachedProfile {
+  profile: UserProfile | null;
+  expiresAt: number;
+}
+
+// LRU-ordered (Map iteration order = least recently used first)
+const profiles = new Map<string, CachedProfile>();
+// Concurrent misses for the same user share one query. Invalidation drops the
+// entry, so a query that started before it is returned but not cached.
+const inflight = new Map<string, Promise<UserProfile | null>>();
+
+async function loadProfile(userId: string): Promise<UserProfile | null> {
+  const { data, error } = await supabase
+    .from('users')
+    .select('id, email, role, kyc_status, email_verified, skills')
+    .eq('id', userId)
+    .maybeSingle();
+
+  if (error) {
+    throw new Error(`Failed to load user profile: ${error.message}`);
+  }
+
+  return data as UserProfile | null;
+}
+
+// Current profile for a user, or null if the user no longer exists
+export async function getUserProfile(userId: string): Promise<UserProfile | null> {
+  const cached = profiles.get(userId);
+  if (cached && cached.expiresAt > Date.now()) {
+    profiles.delete(userId);
+    profiles.set(userId, cached);
+    return cached.profile;
+  }
+
+  let pending = inflight.get(userId);
+  if (!pending) {
+    const query: Promise<UserProfile | null> = loadProfile(userId)
+      .then(profile => {
+        if (inflight.get(userId) === query) {
+          profiles.delete(userId);
+          profiles.set(userId, { profile, expiresAt: Date.now() + PROFILE_TTL_MS });
+
+          if (profiles.size > CACHE_MAX_ENTRIES) {
+            profiles.delete(profiles.keys().next().value!);
+          }
+        }
+        return profile;
+      })
+      .finally(() => {
+        if (inflight.get(userId) === query) {
+          inflight.delete(userId);
+        }
+      });
+
+    inflight.set(userId, query);
+    pending = query;
+  }
+
+  return pending;
+}
+
+// Drop a user's cached profile after changing their row
+export function invalidateUserProfile(userId: string): void {
+  profiles.delete(userId);
+  inflight.delete(userId);
+}
@@ -33,7 +33,8 @@ export interface Milestone {
   title: string;
   description?: string;
   amount: number;
-  status: 'pending' | 'in_progress' | 'submitted' | 'approved' | 'paid' | 'disputed';
+  status: 'pending' | 'in_progress' | 'submitted' | 'approved' | 'paid' | 'disputed' | 'cancelled';
+  version?: number;
   due_date?: string;
   submitted_at?: string;
   approved_at?: string;
@@ -45,7 +46,8 @@ export interface Escrow {
   id: string;
   milestone_id: string;
   amount: number;
-  status: 'created' | 'funded' | 'released' | 'refunded' | 'disputed';
+  status: 'created' | 'funded' | 'released' | 'refunded' | 'disputed' | 'failed';
+  version?: number;
   external_escrow_id?: string;
   funded_at?: string;
   released_at?: string;
@@ -75,6 +77,7 @@ export interface Dispute {
   raised_by: string;
   reason: string;
   status: 'open' | 'under_review' | 'resolved_release' | 'resolved_refund' | 'closed';
+  version?: number;
   admin_notes?: string;
   resolution?: 'release_funds' | 'refund_client' | 'partial_release';
   resolved_by?: string;
@@ -96,4 +99,15 @@ export interface AuditEvent {
   ip_address?: string;
   user_agent?: string;
   created_at?: string;
-}
\ No newline at end of file
+}
+
+export interface ProjectFinancials {
+  project_id: string;
+  milestone_count: number;
+  total_amount: number;
+  funded_amount: number;
+  released_amount: number;
+  refunded_amount: number;
+  open_disputes: number;
+  updated_at?: string;
+}
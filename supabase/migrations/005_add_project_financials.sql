@@ -0,0 +1,68 @@
+-- Per-project financial rollups
+-- Keeps milestone/escrow/dispute totals per project so list and detail views
+-- don't have to embed and sum milestones and escrows on every render.
+
+CREATE TABLE IF NOT EXISTS project_financials (
+    project_id UUID PRIMARY KEY REFERENCES projects(id) ON DELETE CASCADE,
+    milestone_count INTEGER NOT NULL DEFAULT 0,
+    total_amount DECIMAL(12,2) NOT NULL DEFAULT 0,
+    funded_amount DECIMAL(12,2) NOT NULL DEFAULT 0,
+    released_amount DECIMAL(12,2) NOT NULL DEFAULT 0,
+    refunded_amount DECIMAL(12,2) NOT NULL DEFAULT 0,
+    open_disputes INTEGER NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+-- Recompute the rollup for a single project. Bounded by the number of
+-- milestones on that project, so it is cheap to call after every write.
+CREATE OR REPLACE FUNCTION refresh_project_financials(p_project_id UUID)
+RETURNS project_financials AS $$
+DECLARE
+    result project_financials;
+BEGIN
+    INSERT INTO project_financials (
+        project_id,
+        milestone_count,
+        total_amount,
+        funded_amount,
+        released_amount,
+        refunded_amount,
+        open_disputes,
+        updated_at
+    )
+    SELECT
+        p_project_id,
+        (SELECT COUNT(*) FROM milestones m WHERE m.project_id = p_project_id),
+        COALESCE((SELECT SUM(m.amount) FROM milestones m WHERE m.project_id = p_project_id), 0),
+        COALESCE(SUM(e.amount) FILTER (WHERE e.status IN ('funded', 'released', 'refunded')), 0),
+        COALESCE(SUM(e.amount) FILTER (WHERE e.status = 'released'), 0),
+        COALESCE(SUM(e.amount) FILTER (WHERE e.status = 'refunded'), 0),
+        (
+            SELECT COUNT(*)
+            FROM disputes d
+            JOIN milestones m ON m.id = d.milestone_id
+            WHERE m.project_id = p_project_id
+              AND d.status IN ('open', 'under_review')
+        ),
+        NOW()
+    FROM escrows e
+    JOIN milestones m ON m.id = e.milestone_id
+    WHERE m.project_id = p_project_id
+    ON CONFLICT (project_id) DO UPDATE SET
+        milestone_count = EXCLUDED.milestone_count,
+        total_amount = EXCLUDED.total_amount,
+        funded_amount = EXCLUDED.funded_amount,
+        released_amount = EXCLUDED.released_amount,
+        refunded_amount = EXCLUDED.refunded_amount,
+        open_disputes = EXCLUDED.open_disputes,
+        updated_at = EXCLUDED.updated_at
+    RETURNING * INTO result;
+
+    RETURN result;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Backfill rollups for existing projects
+SELECT refresh_project_financials(id) FROM projects;
+
+ALTER TABLE project_financials ENABLE ROW LEVEL SECURITY;
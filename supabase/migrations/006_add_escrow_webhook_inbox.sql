@@ -0,0 +1,70 @@
+-- Durable inbox for escrow provider webhooks
+-- The webhook endpoint only verifies and persists the raw event here; a worker
+-- pool claims and processes events per escrow in arrival order.
+
+CREATE TABLE IF NOT EXISTS escrow_webhook_inbox (
+    id UUID DEFAULT gen_random_uuid() PRIMARY KEY,
+    provider TEXT NOT NULL DEFAULT 'mock_escrow',
+    event_id TEXT NOT NULL,
+    event_type TEXT NOT NULL,
+    external_escrow_id TEXT NOT NULL,
+    payload JSONB NOT NULL DEFAULT '{}',
+    status TEXT NOT NULL DEFAULT 'pending' CHECK (status IN ('pending', 'processing', 'processed', 'dead')),
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL DEFAULT 5,
+    next_attempt_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    locked_by TEXT,
+    locked_at TIMESTAMP WITH TIME ZONE,
+    last_error TEXT,
+    received_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    processed_at TIMESTAMP WITH TIME ZONE
+);
+
+-- Only unfinished events are ever scanned by the claim query
+CREATE INDEX IF NOT EXISTS idx_escrow_webhook_inbox_open
+    ON escrow_webhook_inbox(external_escrow_id, received_at)
+    WHERE status IN ('pending', 'processing');
+CREATE INDEX IF NOT EXISTS idx_escrow_webhook_inbox_dead
+    ON escrow_webhook_inbox(received_at)
+    WHERE status = 'dead';
+
+-- Claim up to p_limit events for a worker. Only the oldest unfinished event of
+-- each escrow is eligible, so events for one escrow are processed in order
+-- while different escrows run in parallel. Events held by a worker longer than
+-- p_lease_seconds are reclaimed (at-least-once delivery).
+CREATE OR REPLACE FUNCTION claim_escrow_webhook_events(
+    p_worker TEXT,
+    p_limit INTEGER DEFAULT 20,
+    p_lease_seconds INTEGER DEFAULT 300
+)
+RETURNS SETOF escrow_webhook_inbox AS $$
+BEGIN
+    RETURN QUERY
+    WITH heads AS (
+        SELECT DISTINCT ON (external_escrow_id) id, status, next_attempt_at, locked_at
+        FROM escrow_webhook_inbox
+        WHERE status IN ('pending', 'processing')
+        ORDER BY external_escrow_id, received_at, id
+    ),
+    claimable AS (
+        SELECT i.id
+        FROM escrow_webhook_inbox i
+        JOIN heads h ON h.id = i.id
+        WHERE (h.status = 'pending' AND h.next_attempt_at <= NOW())
+           OR (h.status = 'processing' AND h.locked_at < NOW() - make_interval(secs => p_lease_seconds))
+        ORDER BY i.received_at
+        LIMIT p_limit
+        FOR UPDATE OF i SKIP LOCKED
+    )
+    UPDATE escrow_webhook_inbox i
+    SET status = 'processing',
+        attempts = i.attempts + 1,
+        locked_by = p_worker,
+        locked_at = NOW()
+    FROM claimable c
+    WHERE i.id = c.id
+    RETURNING i.*;
+END;
+$$ LANGUAGE plpgsql;
+
+ALTER TABLE escrow_webhook_inbox ENABLE ROW LEVEL SECURITY;
@@ -0,0 +1,28 @@
+-- Idempotency keys for processed provider events
+-- Replaces the audit_events lookup on data->>escrowId (an unindexed JSONB
+-- path) with a primary-key probe on (provider, event_id).
+
+CREATE TABLE IF NOT EXISTS processed_events (
+    provider TEXT NOT NULL,
+    event_id TEXT NOT NULL,
+    event_type TEXT NOT NULL,
+    processed_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    PRIMARY KEY (provider, event_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_processed_events_processed_at ON processed_events(processed_at);
+
+-- Carry over events already recorded in audit_events so they are not replayed
+INSERT INTO processed_events (provider, event_id, event_type, processed_at)
+SELECT DISTINCT ON (event_type, data->>'escrowId')
+    'mock_escrow',
+    event_type || '_' || (data->>'escrowId'),
+    event_type,
+    created_at
+FROM audit_events
+WHERE data ? 'escrowId'
+  AND event_type IN ('escrow.created', 'payin.success', 'payin.failed', 'payout.success', 'refund.success')
+ORDER BY event_type, data->>'escrowId', created_at
+ON CONFLICT (provider, event_id) DO NOTHING;
+
+ALTER TABLE processed_events ENABLE ROW LEVEL SECURITY;
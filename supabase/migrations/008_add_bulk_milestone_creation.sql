@@ -0,0 +1,50 @@
+-- Transactional milestone + escrow creation
+-- Creates milestones, their escrows and the audit rows in one transaction so a
+-- failed escrow insert can no longer leave an orphan milestone behind.
+--
+-- p_milestones is a JSON array of
+--   { id, title, description, amount, due_date, external_escrow_id }
+-- where id is generated by the caller so provider escrows can be opened
+-- before the transaction starts.
+
+CREATE OR REPLACE FUNCTION create_milestones_with_escrows(
+    p_project_id UUID,
+    p_user_id UUID,
+    p_milestones JSONB
+)
+RETURNS SETOF milestones AS $$
+BEGIN
+    INSERT INTO milestones (id, project_id, title, description, amount, due_date, status)
+    SELECT
+        (m->>'id')::UUID,
+        p_project_id,
+        m->>'title',
+        m->>'description',
+        (m->>'amount')::DECIMAL(10,2),
+        (m->>'due_date')::TIMESTAMP WITH TIME ZONE,
+        'pending'
+    FROM jsonb_array_elements(p_milestones) AS m;
+
+    INSERT INTO escrows (milestone_id, amount, status, external_escrow_id)
+    SELECT (m->>'id')::UUID, (m->>'amount')::DECIMAL(10,2), 'created', m->>'external_escrow_id'
+    FROM jsonb_array_elements(p_milestones) AS m;
+
+    INSERT INTO audit_events (event_type, user_id, project_id, milestone_id, data)
+    SELECT
+        'milestone_created',
+        p_user_id,
+        p_project_id,
+        (m->>'id')::UUID,
+        jsonb_build_object('title', m->>'title', 'amount', (m->>'amount')::DECIMAL(10,2))
+    FROM jsonb_array_elements(p_milestones) AS m;
+
+    PERFORM refresh_project_financials(p_project_id);
+
+    -- Return the new milestones in input order
+    RETURN QUERY
+    SELECT ms.*
+    FROM jsonb_array_elements(p_milestones) WITH ORDINALITY AS m(value, position)
+    JOIN milestones ms ON ms.id = (m.value->>'id')::UUID
+    ORDER BY m.position;
+END;
+$$ LANGUAGE plpgsql;
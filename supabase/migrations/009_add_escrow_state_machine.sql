@@ -0,0 +1,164 @@
+-- Milestone / escrow state machine with optimistic concurrency
+-- Every milestone, escrow and dispute row carries a version that is bumped on
+-- each update. Money-moving routes claim a transition by compare-and-set on
+-- those versions (transition_milestone) before calling the escrow provider, so
+-- concurrent release/refund/resolve calls cannot both pass their status checks.
+
+-- Statuses the application already writes but the original constraints missed
+ALTER TABLE milestones DROP CONSTRAINT IF EXISTS milestones_status_check;
+ALTER TABLE milestones ADD CONSTRAINT milestones_status_check
+    CHECK (status IN ('pending', 'in_progress', 'submitted', 'approved', 'paid', 'disputed', 'cancelled'));
+
+ALTER TABLE escrows DROP CONSTRAINT IF EXISTS escrows_status_check;
+ALTER TABLE escrows ADD CONSTRAINT escrows_status_check
+    CHECK (status IN ('created', 'funded', 'released', 'refunded', 'disputed', 'failed'));
+
+ALTER TABLE milestones ADD COLUMN IF NOT EXISTS version INTEGER NOT NULL DEFAULT 0;
+ALTER TABLE escrows ADD COLUMN IF NOT EXISTS version INTEGER NOT NULL DEFAULT 0;
+ALTER TABLE disputes ADD COLUMN IF NOT EXISTS version INTEGER NOT NULL DEFAULT 0;
+
+-- Bump the row version on every update, including writes that don't go
+-- through transition_milestone (webhook handlers, submissions, ...)
+CREATE OR REPLACE FUNCTION bump_row_version()
+RETURNS TRIGGER AS $$
+BEGIN
+    NEW.version = OLD.version + 1;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS bump_milestones_version ON milestones;
+CREATE TRIGGER bump_milestones_version
+    BEFORE UPDATE ON milestones
+    FOR EACH ROW
+    EXECUTE FUNCTION bump_row_version();
+
+DROP TRIGGER IF EXISTS bump_escrows_version ON escrows;
+CREATE TRIGGER bump_escrows_version
+    BEFORE UPDATE ON escrows
+    FOR EACH ROW
+    EXECUTE FUNCTION bump_row_version();
+
+DROP TRIGGER IF EXISTS bump_disputes_version ON disputes;
+CREATE TRIGGER bump_disputes_version
+    BEFORE UPDATE ON disputes
+    FOR EACH ROW
+    EXECUTE FUNCTION bump_row_version();
+
+-- Apply one milestone transition atomically.
+--
+-- The escrow (and dispute, when given) rows are only matched at the expected
+-- version and status; the milestone is moved with a single conditional update.
+-- If any row has moved on, nothing is written and the current state is returned
+-- with applied = false so the caller can report a conflict.
+--
+-- p_dispute, when not null, is
+--   { id, version, from: [...], status, resolution, admin_notes, resolved_by }
+-- p_audit is
+--   { event_type, user_id, data }
+CREATE OR REPLACE FUNCTION transition_milestone(
+    p_milestone_id UUID,
+    p_milestone_version INTEGER,
+    p_milestone_from TEXT[],
+    p_milestone_to TEXT,
+    p_escrow_id UUID,
+    p_escrow_version INTEGER,
+    p_escrow_from TEXT[],
+    p_dispute JSONB,
+    p_audit JSONB
+)
+RETURNS JSONB AS $$
+DECLARE
+    v_project_id UUID;
+    v_milestone_version INTEGER;
+    v_dispute_id UUID := (p_dispute->>'id')::UUID;
+    v_dispute_version INTEGER;
+BEGIN
+    -- Row locks (not table locks) keep the escrow and dispute checks valid
+    -- until commit; a concurrent writer makes the version check fail instead
+    PERFORM 1 FROM escrows
+    WHERE id = p_escrow_id
+      AND version = p_escrow_version
+      AND status = ANY(p_escrow_from)
+    FOR UPDATE;
+
+    IF NOT FOUND THEN
+        RETURN transition_conflict('escrow', p_milestone_id, p_escrow_id, v_dispute_id);
+    END IF;
+
+    IF v_dispute_id IS NOT NULL THEN
+        UPDATE disputes
+        SET status = p_dispute->>'status',
+            resolution = p_dispute->>'resolution',
+            resolved_by = (p_dispute->>'resolved_by')::UUID,
+            resolved_at = CASE WHEN p_dispute->>'resolved_by' IS NULL THEN NULL ELSE NOW() END,
+            admin_notes = COALESCE(p_dispute->>'admin_notes', admin_notes),
+            updated_at = NOW()
+        WHERE id = v_dispute_id
+          AND version = (p_dispute->>'version')::INTEGER
+          AND status = ANY(ARRAY(SELECT jsonb_array_elements_text(p_dispute->'from')))
+        RETURNING version INTO v_dispute_version;
+
+        IF NOT FOUND THEN
+            RETURN transition_conflict('dispute', p_milestone_id, p_escrow_id, v_dispute_id);
+        END IF;
+    END IF;
+
+    UPDATE milestones
+    SET status = p_milestone_to,
+        approved_at = CASE WHEN p_milestone_to = 'paid' THEN NOW() ELSE approved_at END,
+        updated_at = NOW()
+    WHERE id = p_milestone_id
+      AND version = p_milestone_version
+      AND status = ANY(p_milestone_from)
+    RETURNING project_id, version INTO v_project_id, v_milestone_version;
+
+    IF NOT FOUND THEN
+        -- Undo the dispute update; the escrow row was only locked
+        RAISE EXCEPTION USING ERRCODE = 'serialization_failure', MESSAGE = 'milestone_conflict';
+    END IF;
+
+    INSERT INTO audit_events (event_type, user_id, project_id, milestone_id, escrow_id, dispute_id, data)
+    VALUES (
+        p_audit->>'event_type',
+        (p_audit->>'user_id')::UUID,
+        v_project_id,
+        p_milestone_id,
+        p_escrow_id,
+        v_dispute_id,
+        COALESCE(p_audit->'data', '{}'::JSONB)
+    );
+
+    PERFORM refresh_project_financials(v_project_id);
+
+    RETURN jsonb_build_object(
+        'applied', TRUE,
+        'milestone_version', v_milestone_version,
+        'escrow_version', p_escrow_version,
+        'dispute_version', v_dispute_version
+    );
+EXCEPTION
+    WHEN serialization_failure THEN
+        IF SQLERRM = 'milestone_conflict' THEN
+            RETURN transition_conflict('milestone', p_milestone_id, p_escrow_id, v_dispute_id);
+        END IF;
+        RAISE;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Current state of the rows involved in a rejected transition
+CREATE OR REPLACE FUNCTION transition_conflict(
+    p_entity TEXT,
+    p_milestone_id UUID,
+    p_escrow_id UUID,
+    p_dispute_id UUID
+)
+RETURNS JSONB AS $$
+    SELECT jsonb_build_object(
+        'applied', FALSE,
+        'conflict', p_entity,
+        'milestone', (SELECT jsonb_build_object('status', status, 'version', version) FROM milestones WHERE id = p_milestone_id),
+        'escrow', (SELECT jsonb_build_object('status', status, 'version', version) FROM escrows WHERE id = p_escrow_id),
+        'dispute', (SELECT jsonb_build_object('status', status, 'version', version) FROM disputes WHERE id = p_dispute_id)
+    );
+$$ LANGUAGE sql STABLE;
@@ -0,0 +1,111 @@
+-- Batch dispute resolution
+-- Claims many dispute resolutions at once with set-based updates instead of
+-- one transition_milestone round-trip per dispute. Same compare-and-set rules:
+-- an item is only applied if its dispute, milestone and escrow are all still
+-- at the versions the caller read.
+--
+-- p_items is a JSON array of
+--   { dispute_id, dispute_version, dispute_status, resolution, admin_notes,
+--     milestone_id, milestone_version, milestone_to,
+--     escrow_id, escrow_version }
+
+CREATE OR REPLACE FUNCTION claim_dispute_resolutions(
+    p_user_id UUID,
+    p_items JSONB
+)
+RETURNS TABLE (
+    dispute_id UUID,
+    applied BOOLEAN,
+    dispute_version INTEGER,
+    milestone_version INTEGER,
+    escrow_version INTEGER
+) AS $$
+#variable_conflict use_column
+DECLARE
+    v_claimed UUID[];
+BEGIN
+    -- Lock every row whose version still matches, in a stable order to avoid
+    -- deadlocks with concurrent batches. Rows changed by someone else drop out.
+    SELECT COALESCE(array_agg(locked.dispute_id), '{}')
+    INTO v_claimed
+    FROM (
+        SELECT i.dispute_id
+        FROM jsonb_to_recordset(p_items) AS i(
+            dispute_id UUID, dispute_version INTEGER,
+            milestone_id UUID, milestone_version INTEGER,
+            escrow_id UUID, escrow_version INTEGER
+        )
+        JOIN disputes d ON d.id = i.dispute_id AND d.version = i.dispute_version
+        JOIN milestones m ON m.id = i.milestone_id AND m.version = i.milestone_version
+        JOIN escrows e ON e.id = i.escrow_id AND e.version = i.escrow_version
+        WHERE d.status IN ('open', 'under_review')
+          AND d.milestone_id = m.id
+          AND e.milestone_id = m.id
+          AND m.status IN ('pending', 'in_progress', 'submitted', 'approved', 'disputed')
+          AND e.status = 'funded'
+        ORDER BY i.dispute_id
+        FOR UPDATE OF d, m, e
+    ) AS locked;
+
+    UPDATE disputes d
+    SET status = i.dispute_status,
+        resolution = i.resolution,
+        resolved_by = p_user_id,
+        resolved_at = NOW(),
+        admin_notes = COALESCE(i.admin_notes, d.admin_notes),
+        updated_at = NOW()
+    FROM jsonb_to_recordset(p_items) AS i(
+        dispute_id UUID, dispute_status TEXT, resolution TEXT, admin_notes TEXT
+    )
+    WHERE d.id = i.dispute_id
+      AND d.id = ANY(v_claimed);
+
+    UPDATE milestones m
+    SET status = i.milestone_to,
+        approved_at = CASE WHEN i.milestone_to = 'paid' THEN NOW() ELSE m.approved_at END,
+        updated_at = NOW()
+    FROM jsonb_to_recordset(p_items) AS i(dispute_id UUID, milestone_id UUID, milestone_to TEXT)
+    WHERE m.id = i.milestone_id
+      AND i.dispute_id = ANY(v_claimed);
+
+    INSERT INTO audit_events (event_type, user_id, project_id, milestone_id, escrow_id, dispute_id, data)
+    SELECT
+        'dispute_resolved',
+        p_user_id,
+        m.project_id,
+        i.milestone_id,
+        i.escrow_id,
+        i.dispute_id,
+        jsonb_build_object(
+            'resolution', i.resolution,
+            'admin_notes', i.admin_notes,
+            'previous_status', 'open',
+            'batch', TRUE
+        )
+    FROM jsonb_to_recordset(p_items) AS i(
+        dispute_id UUID, milestone_id UUID, escrow_id UUID, resolution TEXT, admin_notes TEXT
+    )
+    JOIN milestones m ON m.id = i.milestone_id
+    WHERE i.dispute_id = ANY(v_claimed);
+
+    PERFORM refresh_project_financials(project_id)
+    FROM (
+        SELECT DISTINCT m.project_id
+        FROM jsonb_to_recordset(p_items) AS i(dispute_id UUID, milestone_id UUID)
+        JOIN milestones m ON m.id = i.milestone_id
+        WHERE i.dispute_id = ANY(v_claimed)
+    ) AS touched;
+
+    RETURN QUERY
+    SELECT
+        i.dispute_id,
+        i.dispute_id = ANY(v_claimed),
+        d.version,
+        m.version,
+        e.version
+    FROM jsonb_to_recordset(p_items) AS i(dispute_id UUID, milestone_id UUID, escrow_id UUID)
+    LEFT JOIN disputes d ON d.id = i.dispute_id
+    LEFT JOIN milestones m ON m.id = i.milestone_id
+    LEFT JOIN escrows e ON e.id = i.escrow_id;
+END;
+$$ LANGUAGE plpgsql;
@@ -0,0 +1,59 @@
+-- Flat dispute listing
+-- GET /api/disputes used to embed milestone -> project -> client/freelancer plus
+-- the raised_by/resolved_by users with full rows. dispute_list exposes only the
+-- list-level columns and participant emails; full detail is loaded per dispute
+-- by GET /api/disputes/[id].
+
+CREATE OR REPLACE VIEW dispute_list
+WITH (security_invoker = true) AS
+SELECT
+    d.id,
+    d.status,
+    d.reason,
+    d.resolution,
+    d.created_at,
+    d.resolved_at,
+    d.milestone_id,
+    m.title AS milestone_title,
+    m.amount,
+    m.project_id,
+    p.title AS project_title,
+    p.client_id,
+    client.email AS client_email,
+    p.freelancer_id,
+    freelancer.email AS freelancer_email,
+    d.raised_by,
+    raised_by.email AS raised_by_email,
+    d.resolved_by,
+    resolved_by.email AS resolved_by_email
+FROM disputes d
+JOIN milestones m ON m.id = d.milestone_id
+JOIN projects p ON p.id = m.project_id
+LEFT JOIN users client ON client.id = p.client_id
+LEFT JOIN users freelancer ON freelancer.id = p.freelancer_id
+LEFT JOIN users raised_by ON raised_by.id = d.raised_by
+LEFT JOIN users resolved_by ON resolved_by.id = d.resolved_by;
+
+-- Keyset pagination indexes: newest first, optionally within one status
+CREATE INDEX IF NOT EXISTS idx_disputes_status_created_at ON disputes(status, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_disputes_created_at ON disputes(created_at DESC, id DESC);
+
+-- One page of disputes, newest first. Pass the (created_at, id) of the last
+-- row of the previous page to continue; p_participant_id limits the list to
+-- disputes on projects where that user is the client or freelancer.
+CREATE OR REPLACE FUNCTION list_disputes(
+    p_participant_id UUID DEFAULT NULL,
+    p_status TEXT DEFAULT NULL,
+    p_before_created_at TIMESTAMP WITH TIME ZONE DEFAULT NULL,
+    p_before_id UUID DEFAULT NULL,
+    p_limit INTEGER DEFAULT 20
+)
+RETURNS SETOF dispute_list AS $$
+    SELECT *
+    FROM dispute_list
+    WHERE (p_status IS NULL OR status = p_status)
+      AND (p_participant_id IS NULL OR client_id = p_participant_id OR freelancer_id = p_participant_id)
+      AND (p_before_created_at IS NULL OR (created_at, id) < (p_before_created_at, p_before_id))
+    ORDER BY created_at DESC, id DESC
+    LIMIT p_limit;
+$$ LANGUAGE sql STABLE;
@@ -0,0 +1,19 @@
+-- Refund request pagination
+-- The admin refund queue is paged newest-first on (created_at, id), usually
+-- within one status; the summary counts requests per status for the tabs.
+
+CREATE INDEX IF NOT EXISTS idx_refund_requests_status_created_at
+    ON refund_requests(status, created_at DESC, id DESC);
+
+-- Refund request counts per status, optionally within a created_at range
+CREATE OR REPLACE FUNCTION count_refund_requests_by_status(
+    p_from TIMESTAMP WITH TIME ZONE DEFAULT NULL,
+    p_to TIMESTAMP WITH TIME ZONE DEFAULT NULL
+)
+RETURNS TABLE (status TEXT, count BIGINT) AS $$
+    SELECT r.status, COUNT(*)
+    FROM refund_requests r
+    WHERE (p_from IS NULL OR r.created_at >= p_from)
+      AND (p_to IS NULL OR r.created_at < p_to)
+    GROUP BY r.status;
+$$ LANGUAGE sql STABLE;
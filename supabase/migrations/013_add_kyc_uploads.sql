@@ -0,0 +1,67 @@
+-- Resumable KYC document uploads
+-- An upload session tracks how many bytes of a document have reached storage,
+-- so a client on a flaky connection can resume from the last acknowledged
+-- offset instead of starting over. Chunks are streamed straight through to a
+-- resumable storage upload; nothing is buffered on the app server.
+
+CREATE TABLE IF NOT EXISTS kyc_uploads (
+    id UUID DEFAULT gen_random_uuid() PRIMARY KEY,
+    user_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    document_type TEXT NOT NULL DEFAULT 'aadhaar',
+    document_number TEXT NOT NULL,
+    total_size INTEGER NOT NULL CHECK (total_size > 0),
+    received_bytes INTEGER NOT NULL DEFAULT 0,
+    content_type TEXT, -- sniffed from the first bytes, not trusted from the client
+    storage_path TEXT,
+    storage_upload_url TEXT, -- resumable upload handle at the storage backend
+    status TEXT NOT NULL DEFAULT 'uploading' CHECK (status IN ('uploading', 'completed', 'failed')),
+    kyc_verification_id UUID REFERENCES kyc_verifications(id) ON DELETE SET NULL,
+    expires_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT (NOW() + INTERVAL '24 hours'),
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_kyc_uploads_user_id ON kyc_uploads(user_id);
+CREATE INDEX IF NOT EXISTS idx_kyc_uploads_expires_at ON kyc_uploads(expires_at) WHERE status = 'uploading';
+
+CREATE OR REPLACE TRIGGER update_kyc_uploads_updated_at
+    BEFORE UPDATE ON kyc_uploads
+    FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
+
+ALTER TABLE kyc_uploads ENABLE ROW LEVEL SECURITY;
+
+-- Finish an upload: create the verification row and mark the user pending in
+-- one transaction. Returns the new kyc_verifications row.
+CREATE OR REPLACE FUNCTION complete_kyc_upload(p_upload_id UUID)
+RETURNS kyc_verifications AS $$
+DECLARE
+    v_upload kyc_uploads;
+    v_verification kyc_verifications;
+BEGIN
+    SELECT * INTO v_upload
+    FROM kyc_uploads
+    WHERE id = p_upload_id
+      AND status = 'uploading'
+      AND received_bytes = total_size
+    FOR UPDATE;
+
+    IF NOT FOUND THEN
+        RAISE EXCEPTION 'KYC upload % is not ready to complete', p_upload_id;
+    END IF;
+
+    INSERT INTO kyc_verifications (user_id, document_type, document_number, document_url, status, submitted_at)
+    VALUES (v_upload.user_id, v_upload.document_type, v_upload.document_number, v_upload.storage_path, 'pending', NOW())
+    RETURNING * INTO v_verification;
+
+    UPDATE kyc_uploads
+    SET status = 'completed',
+        kyc_verification_id = v_verification.id
+    WHERE id = p_upload_id;
+
+    UPDATE users
+    SET kyc_status = 'pending'
+    WHERE id = v_upload.user_id;
+
+    RETURN v_verification;
+END;
+$$ LANGUAGE plpgsql;
@@ -0,0 +1,60 @@
+-- Background KYC document processing
+-- Every new kyc_verifications row starts with processing_status = 'pending' and
+-- is picked up by the KYC processing worker, which stores a compressed review
+-- preview and thumbnail next to the original, hashes the document and flags
+-- re-submissions of a document already on file.
+
+ALTER TABLE kyc_verifications
+    ADD COLUMN IF NOT EXISTS processing_status TEXT NOT NULL DEFAULT 'pending'
+        CHECK (processing_status IN ('pending', 'processing', 'processed', 'failed')),
+    ADD COLUMN IF NOT EXISTS processing_attempts INTEGER NOT NULL DEFAULT 0,
+    ADD COLUMN IF NOT EXISTS processing_error TEXT,
+    ADD COLUMN IF NOT EXISTS locked_by TEXT,
+    ADD COLUMN IF NOT EXISTS locked_at TIMESTAMP WITH TIME ZONE,
+    ADD COLUMN IF NOT EXISTS processed_at TIMESTAMP WITH TIME ZONE,
+    ADD COLUMN IF NOT EXISTS content_hash TEXT,
+    ADD COLUMN IF NOT EXISTS content_type TEXT,
+    ADD COLUMN IF NOT EXISTS file_size INTEGER,
+    ADD COLUMN IF NOT EXISTS preview_url TEXT,
+    ADD COLUMN IF NOT EXISTS thumbnail_url TEXT,
+    ADD COLUMN IF NOT EXISTS duplicate_of UUID REFERENCES kyc_verifications(id) ON DELETE SET NULL;
+
+-- Existing documents were reviewed without previews; don't reprocess history
+UPDATE kyc_verifications SET processing_status = 'processed' WHERE processing_status = 'pending';
+
+CREATE INDEX IF NOT EXISTS idx_kyc_verifications_processing
+    ON kyc_verifications(created_at)
+    WHERE processing_status IN ('pending', 'processing');
+CREATE INDEX IF NOT EXISTS idx_kyc_verifications_content_hash
+    ON kyc_verifications(content_hash)
+    WHERE content_hash IS NOT NULL;
+
+-- Claim up to p_limit documents for a worker, oldest first. Documents held by a
+-- worker longer than p_lease_seconds are reclaimed.
+CREATE OR REPLACE FUNCTION claim_kyc_documents(
+    p_worker TEXT,
+    p_limit INTEGER DEFAULT 10,
+    p_lease_seconds INTEGER DEFAULT 300
+)
+RETURNS SETOF kyc_verifications AS $$
+BEGIN
+    RETURN QUERY
+    WITH claimable AS (
+        SELECT id
+        FROM kyc_verifications
+        WHERE processing_status = 'pending'
+           OR (processing_status = 'processing' AND locked_at < NOW() - make_interval(secs => p_lease_seconds))
+        ORDER BY created_at
+        LIMIT p_limit
+        FOR UPDATE SKIP LOCKED
+    )
+    UPDATE kyc_verifications k
+    SET processing_status = 'processing',
+        processing_attempts = k.processing_attempts + 1,
+        locked_by = p_worker,
+        locked_at = NOW()
+    FROM claimable c
+    WHERE k.id = c.id
+    RETURNING k.*;
+END;
+$$ LANGUAGE plpgsql;
@@ -0,0 +1,79 @@
+-- Daily audit event counts
+-- The admin audit page shows event counts per type for the last 30 days.
+-- Counting raw audit_events grows with event volume, so counts are rolled up
+-- per (UTC day, event_type) as events are written and the summary reads at
+-- most 30 x (number of event types) rows.
+
+CREATE TABLE IF NOT EXISTS audit_event_daily_counts (
+    day DATE NOT NULL,
+    event_type VARCHAR(100) NOT NULL,
+    count BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (day, event_type)
+);
+
+ALTER TABLE audit_event_daily_counts ENABLE ROW LEVEL SECURITY;
+
+-- Statement-level so a multi-row insert touches each (day, event_type) once
+CREATE OR REPLACE FUNCTION audit_events_count_inserted()
+RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO audit_event_daily_counts (day, event_type, count)
+    SELECT (created_at AT TIME ZONE 'UTC')::date, event_type, COUNT(*)
+    FROM inserted_events
+    WHERE created_at IS NOT NULL
+    GROUP BY 1, 2
+    ORDER BY 1, 2 -- consistent lock order between concurrent statements
+    ON CONFLICT (day, event_type)
+    DO UPDATE SET count = audit_event_daily_counts.count + EXCLUDED.count;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION audit_events_count_deleted()
+RETURNS TRIGGER AS $$
+BEGIN
+    UPDATE audit_event_daily_counts c
+    SET count = c.count - d.count
+    FROM (
+        SELECT (created_at AT TIME ZONE 'UTC')::date AS day, event_type, COUNT(*) AS count
+        FROM deleted_events
+        WHERE created_at IS NOT NULL
+        GROUP BY 1, 2
+    ) d
+    WHERE c.day = d.day
+      AND c.event_type = d.event_type;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS audit_events_count_inserted ON audit_events;
+CREATE TRIGGER audit_events_count_inserted
+    AFTER INSERT ON audit_events
+    REFERENCING NEW TABLE AS inserted_events
+    FOR EACH STATEMENT EXECUTE FUNCTION audit_events_count_inserted();
+
+DROP TRIGGER IF EXISTS audit_events_count_deleted ON audit_events;
+CREATE TRIGGER audit_events_count_deleted
+    AFTER DELETE ON audit_events
+    REFERENCING OLD TABLE AS deleted_events
+    FOR EACH STATEMENT EXECUTE FUNCTION audit_events_count_deleted();
+
+-- Backfill from existing events
+INSERT INTO audit_event_daily_counts (day, event_type, count)
+SELECT (created_at AT TIME ZONE 'UTC')::date, event_type, COUNT(*)
+FROM audit_events
+WHERE created_at IS NOT NULL
+GROUP BY 1, 2
+ON CONFLICT (day, event_type) DO UPDATE SET count = EXCLUDED.count;
+
+-- Event counts per type since p_since (whole UTC days, including p_since's day)
+CREATE OR REPLACE FUNCTION audit_event_summary(p_since TIMESTAMP WITH TIME ZONE)
+RETURNS TABLE (event_type VARCHAR, count BIGINT) AS $$
+    SELECT c.event_type, SUM(c.count)::BIGINT
+    FROM audit_event_daily_counts c
+    WHERE c.day >= (p_since AT TIME ZONE 'UTC')::date
+    GROUP BY c.event_type
+    HAVING SUM(c.count) > 0;
+$$ LANGUAGE sql STABLE;
@@ -0,0 +1,187 @@
+-- Month-partitioned audit_events
+-- Nearly every mutating route and webhook appends to audit_events, and reads
+-- are by recent time range. Partitioning by month keeps each partition's
+-- indexes small, lets range queries prune to the months they cover, and makes
+-- retention a partition drop instead of a bulk DELETE.
+--
+-- Partitions are named audit_events_pYYYYMM and cover UTC months. The app keeps
+-- the next few months created ahead of time (ensure_audit_event_partitions);
+-- rows outside every partition land in audit_events_default and are moved into
+-- their month when it is created. Cold months are exported by
+-- scripts/archive-audit-events.ts and then dropped with
+-- drop_audit_event_partition.
+--
+-- The primary key has to include the partition key, so it becomes
+-- (id, created_at); nothing references audit_events by foreign key.
+
+ALTER TABLE audit_events RENAME TO audit_events_unpartitioned;
+
+CREATE TABLE audit_events (
+    id UUID NOT NULL DEFAULT uuid_generate_v4(),
+    event_type VARCHAR(100) NOT NULL,
+    user_id UUID REFERENCES users(id) ON DELETE SET NULL,
+    project_id UUID REFERENCES projects(id) ON DELETE SET NULL,
+    milestone_id UUID REFERENCES milestones(id) ON DELETE SET NULL,
+    escrow_id UUID REFERENCES escrows(id) ON DELETE SET NULL,
+    dispute_id UUID REFERENCES disputes(id) ON DELETE SET NULL,
+    data JSONB NOT NULL DEFAULT '{}',
+    ip_address INET,
+    user_agent TEXT,
+    created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (id, created_at)
+) PARTITION BY RANGE (created_at);
+
+CREATE TABLE audit_events_default PARTITION OF audit_events DEFAULT;
+
+-- Create the partition for the month containing p_month, moving any rows for
+-- that month out of the default partition. Returns the partition name, or NULL
+-- if it already existed.
+CREATE OR REPLACE FUNCTION create_audit_event_partition(p_month DATE)
+RETURNS TEXT AS $$
+DECLARE
+    v_start DATE := date_trunc('month', p_month)::date;
+    v_end DATE := (date_trunc('month', p_month) + INTERVAL '1 month')::date;
+    v_name TEXT := 'audit_events_p' || to_char(p_month, 'YYYYMM');
+    v_from TIMESTAMP WITH TIME ZONE := v_start::timestamp AT TIME ZONE 'UTC';
+    v_to TIMESTAMP WITH TIME ZONE := v_end::timestamp AT TIME ZONE 'UTC';
+BEGIN
+    IF to_regclass(v_name) IS NOT NULL THEN
+        RETURN NULL;
+    END IF;
+
+    -- Serialize with concurrent callers creating the same month
+    PERFORM pg_advisory_xact_lock(hashtext(v_name));
+    IF to_regclass(v_name) IS NOT NULL THEN
+        RETURN NULL;
+    END IF;
+
+    EXECUTE format('CREATE TABLE %I (LIKE audit_events INCLUDING DEFAULTS INCLUDING CONSTRAINTS)', v_name);
+
+    -- Statement triggers on audit_events don't fire for statements on its
+    -- partitions, so the daily counts are unaffected by the move
+    EXECUTE format(
+        'WITH moved AS (DELETE FROM audit_events_default WHERE created_at >= %L AND created_at < %L RETURNING *)
+         INSERT INTO %I SELECT * FROM moved',
+        v_from, v_to, v_name
+    );
+
+    EXECUTE format('ALTER TABLE %I ADD CONSTRAINT %I CHECK (created_at >= %L AND created_at < %L)',
+        v_name, v_name || '_range', v_from, v_to);
+    EXECUTE format('ALTER TABLE audit_events ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)',
+        v_name, v_from, v_to);
+    -- Only needed to let ATTACH skip its validation scan
+    EXECUTE format('ALTER TABLE %I DROP CONSTRAINT %I', v_name, v_name || '_range');
+
+    RETURN v_name;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Make sure partitions exist from the current month through p_months_ahead
+-- months ahead. Returns the partitions created.
+CREATE OR REPLACE FUNCTION ensure_audit_event_partitions(p_months_ahead INTEGER DEFAULT 3)
+RETURNS SETOF TEXT AS $$
+DECLARE
+    v_month DATE;
+    v_created TEXT;
+BEGIN
+    FOR v_month IN
+        SELECT generate_series(
+            date_trunc('month', NOW() AT TIME ZONE 'UTC'),
+            date_trunc('month', NOW() AT TIME ZONE 'UTC') + make_interval(months => p_months_ahead),
+            INTERVAL '1 month'
+        )::date
+    LOOP
+        v_created := create_audit_event_partition(v_month);
+        IF v_created IS NOT NULL THEN
+            RETURN NEXT v_created;
+        END IF;
+    END LOOP;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Monthly partitions, oldest first, with their UTC ranges
+CREATE OR REPLACE FUNCTION list_audit_event_partitions()
+RETURNS TABLE (partition_name TEXT, range_start TIMESTAMP WITH TIME ZONE, range_end TIMESTAMP WITH TIME ZONE) AS $$
+    SELECT
+        c.relname::text,
+        to_date(substring(c.relname from 'p(\d{6})$'), 'YYYYMM')::timestamp AT TIME ZONE 'UTC',
+        (to_date(substring(c.relname from 'p(\d{6})$'), 'YYYYMM') + INTERVAL '1 month')::timestamp AT TIME ZONE 'UTC'
+    FROM pg_inherits i
+    JOIN pg_class c ON c.oid = i.inhrelid
+    WHERE i.inhparent = 'audit_events'::regclass
+      AND c.relname ~ '^audit_events_p\d{6}$'
+    ORDER BY c.relname;
+$$ LANGUAGE sql STABLE;
+
+-- Detach and drop an archived monthly partition. Dropping fires no delete
+-- triggers, so audit_event_daily_counts keeps the month's totals.
+CREATE OR REPLACE FUNCTION drop_audit_event_partition(p_partition TEXT)
+RETURNS VOID AS $$
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM list_audit_event_partitions() WHERE partition_name = p_partition
+    ) THEN
+        RAISE EXCEPTION '% is not an audit_events monthly partition', p_partition;
+    END IF;
+
+    IF date_trunc('month', NOW() AT TIME ZONE 'UTC') <= to_date(substring(p_partition from 'p(\d{6})$'), 'YYYYMM') THEN
+        RAISE EXCEPTION 'Refusing to drop current or future partition %', p_partition;
+    END IF;
+
+    EXECUTE format('ALTER TABLE audit_events DETACH PARTITION %I', p_partition);
+    EXECUTE format('DROP TABLE %I', p_partition);
+END;
+$$ LANGUAGE plpgsql;
+
+-- Only the service role may create or drop partitions (Supabase grants new
+-- functions to anon and authenticated by default)
+DO $$
+DECLARE
+    v_role TEXT;
+BEGIN
+    FOREACH v_role IN ARRAY ARRAY['PUBLIC', 'anon', 'authenticated'] LOOP
+        IF v_role = 'PUBLIC' OR EXISTS (SELECT 1 FROM pg_roles WHERE rolname = v_role) THEN
+            EXECUTE format('REVOKE EXECUTE ON FUNCTION create_audit_event_partition(DATE) FROM %s', v_role);
+            EXECUTE format('REVOKE EXECUTE ON FUNCTION ensure_audit_event_partitions(INTEGER) FROM %s', v_role);
+            EXECUTE format('REVOKE EXECUTE ON FUNCTION drop_audit_event_partition(TEXT) FROM %s', v_role);
+        END IF;
+    END LOOP;
+END;
+$$;
+
+-- Partitions for every month with existing events, plus the months ahead
+SELECT create_audit_event_partition(month::date)
+FROM (
+    SELECT DISTINCT date_trunc('month', created_at AT TIME ZONE 'UTC') AS month
+    FROM audit_events_unpartitioned
+    WHERE created_at IS NOT NULL
+) months;
+SELECT ensure_audit_event_partitions(3);
+
+-- Copy existing events. The daily counts already include them, and the count
+-- triggers are only created on the new table below.
+INSERT INTO audit_events (id, event_type, user_id, project_id, milestone_id, escrow_id, dispute_id,
+                          data, ip_address, user_agent, created_at)
+SELECT id, event_type, user_id, project_id, milestone_id, escrow_id, dispute_id,
+       data, ip_address, user_agent, COALESCE(created_at, NOW())
+FROM audit_events_unpartitioned;
+
+DROP TABLE audit_events_unpartitioned;
+
+-- Created on the parent, so every partition gets its own copy
+CREATE INDEX IF NOT EXISTS idx_audit_events_created_at ON audit_events(created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_audit_events_event_type ON audit_events(event_type, created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_audit_events_user_id ON audit_events(user_id, created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_audit_events_project_id ON audit_events(project_id, created_at DESC);
+
+CREATE TRIGGER audit_events_count_inserted
+    AFTER INSERT ON audit_events
+    REFERENCING NEW TABLE AS inserted_events
+    FOR EACH STATEMENT EXECUTE FUNCTION audit_events_count_inserted();
+
+CREATE TRIGGER audit_events_count_deleted
+    AFTER DELETE ON audit_events
+    REFERENCING OLD TABLE AS deleted_events
+    FOR EACH STATEMENT EXECUTE FUNCTION audit_events_count_deleted();
+
+ALTER TABLE audit_events ENABLE ROW LEVEL SECURITY;
@@ -0,0 +1,9 @@
+-- Keyset indexes for streaming exports
+-- Transaction exports walk (created_at, id) in ascending order, across all
+-- users for admins and within one user otherwise. audit_events already has
+-- (created_at, id) per partition (migration 016).
+
+CREATE INDEX IF NOT EXISTS idx_transactions_created_at_id
+    ON transactions(created_at, id);
+CREATE INDEX IF NOT EXISTS idx_transactions_user_id_created_at_id
+    ON transactions(user_id, created_at, id);
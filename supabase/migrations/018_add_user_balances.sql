@@ -0,0 +1,216 @@
+-- Per-user ledger balance projections
+-- Dashboards and the transactions summary used to sum a user's whole
+-- transaction history on every read. user_balances keeps the running totals,
+-- updated by a trigger in the same transaction that writes the ledger row, so
+-- reading a balance is a primary-key lookup.
+--
+-- Only completed transactions count. Per type:
+--   escrow_fund     client: in_escrow += amount, lifetime_funded += amount
+--   escrow_release  freelancer (row owner): available += amount, lifetime_earned += amount
+--                   client of the escrow: in_escrow -= escrow amount, lifetime_spent += escrow amount
+--   escrow_refund   client: in_escrow -= amount, lifetime_refunded += amount
+--   withdrawal      available -= amount
+--   fee_deduction   no effect (releases are recorded net of fees)
+--
+-- ledger_balance_drift recomputes every balance from the ledger with the same
+-- rules and reports users whose projection disagrees.
+
+CREATE TABLE IF NOT EXISTS user_balances (
+    user_id UUID PRIMARY KEY REFERENCES users(id) ON DELETE CASCADE,
+    available DECIMAL(14,2) NOT NULL DEFAULT 0,
+    in_escrow DECIMAL(14,2) NOT NULL DEFAULT 0,
+    lifetime_earned DECIMAL(14,2) NOT NULL DEFAULT 0,
+    lifetime_funded DECIMAL(14,2) NOT NULL DEFAULT 0,
+    lifetime_spent DECIMAL(14,2) NOT NULL DEFAULT 0,
+    lifetime_refunded DECIMAL(14,2) NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+ALTER TABLE user_balances ENABLE ROW LEVEL SECURITY;
+
+-- Balance changes caused by one completed transaction (none otherwise)
+CREATE OR REPLACE FUNCTION transaction_balance_deltas(p_tx transactions)
+RETURNS TABLE (
+    user_id UUID,
+    available DECIMAL,
+    in_escrow DECIMAL,
+    lifetime_earned DECIMAL,
+    lifetime_funded DECIMAL,
+    lifetime_spent DECIMAL,
+    lifetime_refunded DECIMAL
+) AS $$
+    SELECT p_tx.user_id, 0, p_tx.amount, 0, p_tx.amount, 0, 0
+    WHERE p_tx.status = 'completed' AND p_tx.type = 'escrow_fund' AND p_tx.user_id IS NOT NULL
+    UNION ALL
+    SELECT p_tx.user_id, p_tx.amount, 0, p_tx.amount, 0, 0, 0
+    WHERE p_tx.status = 'completed' AND p_tx.type = 'escrow_release' AND p_tx.user_id IS NOT NULL
+    UNION ALL
+    SELECT p.client_id, 0, -e.amount, 0, 0, e.amount, 0
+    FROM escrows e
+    JOIN milestones m ON m.id = e.milestone_id
+    JOIN projects p ON p.id = m.project_id
+    WHERE p_tx.status = 'completed' AND p_tx.type = 'escrow_release'
+      AND e.id = p_tx.escrow_id AND p.client_id IS NOT NULL
+    UNION ALL
+    SELECT p_tx.user_id, 0, -p_tx.amount, 0, 0, 0, p_tx.amount
+    WHERE p_tx.status = 'completed' AND p_tx.type = 'escrow_refund' AND p_tx.user_id IS NOT NULL
+    UNION ALL
+    SELECT p_tx.user_id, -p_tx.amount, 0, 0, 0, 0, 0
+    WHERE p_tx.status = 'completed' AND p_tx.type = 'withdrawal' AND p_tx.user_id IS NOT NULL;
+$$ LANGUAGE sql STABLE;
+
+-- Add (p_sign = 1) or remove (p_sign = -1) a transaction's effect
+CREATE OR REPLACE FUNCTION apply_transaction_balance(p_tx transactions, p_sign INTEGER)
+RETURNS VOID AS $$
+    INSERT INTO user_balances AS b (
+        user_id, available, in_escrow, lifetime_earned, lifetime_funded, lifetime_spent, lifetime_refunded, updated_at
+    )
+    SELECT
+        d.user_id,
+        SUM(d.available) * p_sign,
+        SUM(d.in_escrow) * p_sign,
+        SUM(d.lifetime_earned) * p_sign,
+        SUM(d.lifetime_funded) * p_sign,
+        SUM(d.lifetime_spent) * p_sign,
+        SUM(d.lifetime_refunded) * p_sign,
+        NOW()
+    FROM transaction_balance_deltas(p_tx) d
+    GROUP BY d.user_id
+    ORDER BY d.user_id -- consistent lock order when a release touches two users
+    ON CONFLICT (user_id) DO UPDATE SET
+        available = b.available + EXCLUDED.available,
+        in_escrow = b.in_escrow + EXCLUDED.in_escrow,
+        lifetime_earned = b.lifetime_earned + EXCLUDED.lifetime_earned,
+        lifetime_funded = b.lifetime_funded + EXCLUDED.lifetime_funded,
+        lifetime_spent = b.lifetime_spent + EXCLUDED.lifetime_spent,
+        lifetime_refunded = b.lifetime_refunded + EXCLUDED.lifetime_refunded,
+        updated_at = EXCLUDED.updated_at;
+$$ LANGUAGE sql;
+
+CREATE OR REPLACE FUNCTION transactions_update_balances()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM apply_transaction_balance(OLD, -1);
+    END IF;
+
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        PERFORM apply_transaction_balance(NEW, 1);
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS transactions_update_balances ON transactions;
+CREATE TRIGGER transactions_update_balances
+    AFTER INSERT OR DELETE OR UPDATE OF user_id, escrow_id, type, amount, status ON transactions
+    FOR EACH ROW EXECUTE FUNCTION transactions_update_balances();
+
+-- Balances recomputed from the whole ledger
+CREATE OR REPLACE FUNCTION compute_user_balances(p_user_id UUID DEFAULT NULL)
+RETURNS TABLE (
+    user_id UUID,
+    available DECIMAL,
+    in_escrow DECIMAL,
+    lifetime_earned DECIMAL,
+    lifetime_funded DECIMAL,
+    lifetime_spent DECIMAL,
+    lifetime_refunded DECIMAL
+) AS $$
+    SELECT
+        d.user_id,
+        SUM(d.available),
+        SUM(d.in_escrow),
+        SUM(d.lifetime_earned),
+        SUM(d.lifetime_funded),
+        SUM(d.lifetime_spent),
+        SUM(d.lifetime_refunded)
+    FROM transactions t
+    CROSS JOIN LATERAL transaction_balance_deltas(t) d
+    WHERE t.status = 'completed'
+      AND (p_user_id IS NULL OR d.user_id = p_user_id)
+    GROUP BY d.user_id;
+$$ LANGUAGE sql STABLE;
+
+-- Users whose projection differs from the ledger, worst first. With
+-- p_repair, the projections are overwritten with the recomputed values.
+CREATE OR REPLACE FUNCTION ledger_balance_drift(p_repair BOOLEAN DEFAULT FALSE, p_limit INTEGER DEFAULT 100)
+RETURNS TABLE (
+    user_id UUID,
+    field TEXT,
+    projected DECIMAL,
+    actual DECIMAL
+) AS $$
+#variable_conflict use_column
+BEGIN
+    CREATE TEMP TABLE ledger_drift ON COMMIT DROP AS
+    WITH actual AS (
+        SELECT * FROM compute_user_balances()
+    ),
+    compared AS (
+        SELECT
+            COALESCE(a.user_id, b.user_id) AS user_id,
+            f.field,
+            f.projected,
+            f.actual
+        FROM actual a
+        FULL JOIN user_balances b ON b.user_id = a.user_id
+        CROSS JOIN LATERAL (VALUES
+            ('available', COALESCE(b.available, 0), COALESCE(a.available, 0)),
+            ('in_escrow', COALESCE(b.in_escrow, 0), COALESCE(a.in_escrow, 0)),
+            ('lifetime_earned', COALESCE(b.lifetime_earned, 0), COALESCE(a.lifetime_earned, 0)),
+            ('lifetime_funded', COALESCE(b.lifetime_funded, 0), COALESCE(a.lifetime_funded, 0)),
+            ('lifetime_spent', COALESCE(b.lifetime_spent, 0), COALESCE(a.lifetime_spent, 0)),
+            ('lifetime_refunded', COALESCE(b.lifetime_refunded, 0), COALESCE(a.lifetime_refunded, 0))
+        ) AS f(field, projected, actual)
+    )
+    SELECT * FROM compared WHERE projected <> actual;
+
+    IF p_repair THEN
+        -- Lock drifted balances first so concurrent ledger writes queue
+        -- behind the repair instead of interleaving with it
+        PERFORM 1 FROM user_balances b
+        WHERE b.user_id IN (SELECT DISTINCT d.user_id FROM ledger_drift d)
+        ORDER BY b.user_id
+        FOR UPDATE;
+
+        INSERT INTO user_balances AS b (
+            user_id, available, in_escrow, lifetime_earned, lifetime_funded, lifetime_spent, lifetime_refunded, updated_at
+        )
+        SELECT c.user_id, c.available, c.in_escrow, c.lifetime_earned, c.lifetime_funded, c.lifetime_spent, c.lifetime_refunded, NOW()
+        FROM compute_user_balances() c
+        WHERE c.user_id IN (SELECT DISTINCT d.user_id FROM ledger_drift d)
+        ON CONFLICT (user_id) DO UPDATE SET
+            available = EXCLUDED.available,
+            in_escrow = EXCLUDED.in_escrow,
+            lifetime_earned = EXCLUDED.lifetime_earned,
+            lifetime_funded = EXCLUDED.lifetime_funded,
+            lifetime_spent = EXCLUDED.lifetime_spent,
+            lifetime_refunded = EXCLUDED.lifetime_refunded,
+            updated_at = EXCLUDED.updated_at;
+
+        -- Projections for users with no completed transactions left
+        UPDATE user_balances b
+        SET available = 0, in_escrow = 0, lifetime_earned = 0, lifetime_funded = 0,
+            lifetime_spent = 0, lifetime_refunded = 0, updated_at = NOW()
+        WHERE b.user_id IN (SELECT DISTINCT d.user_id FROM ledger_drift d)
+          AND NOT EXISTS (SELECT 1 FROM compute_user_balances(b.user_id));
+    END IF;
+
+    RETURN QUERY
+    SELECT d.user_id, d.field, d.projected, d.actual
+    FROM ledger_drift d
+    ORDER BY abs(d.projected - d.actual) DESC
+    LIMIT p_limit;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Backfill from the existing ledger
+INSERT INTO user_balances (
+    user_id, available, in_escrow, lifetime_earned, lifetime_funded, lifetime_spent, lifetime_refunded
+)
+SELECT c.user_id, c.available, c.in_escrow, c.lifetime_earned, c.lifetime_funded, c.lifetime_spent, c.lifetime_refunded
+FROM compute_user_balances() c
+JOIN users u ON u.id = c.user_id
+ON CONFLICT (user_id) DO NOTHING;
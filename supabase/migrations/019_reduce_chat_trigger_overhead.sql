@@ -0,0 +1,43 @@
+-- Cheaper chat writes
+-- Sending a message used to bump chat_conversations.updated_at from the API
+-- on every message: an extra round-trip and a full row rewrite, each paying
+-- for chat_closure_trigger and the updated_at trigger.
+--
+-- Last activity is now bumped by a statement-level trigger on chat_messages,
+-- and only when the conversation's updated_at is more than a minute behind.
+-- A busy thread rewrites its conversation at most once a minute, and
+-- updated_at ("last activity" on the support dashboard) stays accurate to
+-- within that window.
+--
+-- chat_closure_trigger only ever acts on status or support agent changes, so
+-- it no longer fires for any other update.
+
+CREATE OR REPLACE FUNCTION chat_messages_touch_conversations()
+RETURNS TRIGGER AS $$
+BEGIN
+    UPDATE chat_conversations c
+    SET updated_at = m.last_message_at
+    FROM (
+        SELECT conversation_id, MAX(created_at) AS last_message_at
+        FROM inserted_messages
+        GROUP BY conversation_id
+    ) m
+    WHERE c.id = m.conversation_id
+      AND c.updated_at < m.last_message_at - INTERVAL '1 minute';
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS chat_messages_touch_conversations ON chat_messages;
+CREATE TRIGGER chat_messages_touch_conversations
+    AFTER INSERT ON chat_messages
+    REFERENCING NEW TABLE AS inserted_messages
+    FOR EACH STATEMENT EXECUTE FUNCTION chat_messages_touch_conversations();
+
+DROP TRIGGER IF EXISTS chat_closure_trigger ON chat_conversations;
+CREATE TRIGGER chat_closure_trigger
+    BEFORE UPDATE OF status, support_agent_id ON chat_conversations
+    FOR EACH ROW
+    WHEN (OLD.status IS DISTINCT FROM NEW.status OR OLD.support_agent_id IS DISTINCT FROM NEW.support_agent_id)
+    EXECUTE FUNCTION calculate_resolution_time();
@@ -0,0 +1,31 @@
+-- Idempotent escrow webhook effects
+-- The webhook handlers used to claim the event's processed_events key before
+-- applying it and release the key if applying failed. Neither half was in a
+-- transaction with the effects: a crash after the claim dropped the event, and
+-- a failure after the ledger insert let the retry insert the row again (and
+-- user_balances counted it twice).
+--
+-- The key is now recorded only after the event has been applied, and applying
+-- it again is harmless: each escrow has at most one completed ledger row per
+-- transaction type, so a retried insert conflicts instead of double counting.
+
+-- Earlier retries may already have written duplicates. Keep the first row and
+-- mark the rest failed, which also takes them out of user_balances.
+UPDATE transactions t
+SET status = 'failed',
+    metadata = COALESCE(t.metadata, '{}'::jsonb) || jsonb_build_object('duplicate_of', d.first_id)
+FROM (
+    SELECT id, FIRST_VALUE(id) OVER (PARTITION BY escrow_id, type ORDER BY created_at, id) AS first_id
+    FROM transactions
+    WHERE status = 'completed'
+      AND escrow_id IS NOT NULL
+      AND type IN ('escrow_fund', 'escrow_release', 'escrow_refund')
+) d
+WHERE t.id = d.id
+  AND d.id <> d.first_id;
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_transactions_escrow_effect
+    ON transactions(escrow_id, type)
+    WHERE status = 'completed'
+      AND escrow_id IS NOT NULL
+      AND type IN ('escrow_fund', 'escrow_release', 'escrow_refund');
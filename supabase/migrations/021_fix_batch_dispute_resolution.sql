@@ -0,0 +1,117 @@
+-- Batch dispute resolution fixes
+-- claim_dispute_resolutions deduplicated its batch by dispute only: two open
+-- disputes on the same milestone could both be claimed, moving the milestone
+-- and its escrow twice. Only the first item per milestone (by dispute id) is
+-- now claimed; the rest come back as not applied.
+--
+-- The dispute_resolved audit event also recorded every claimed dispute's
+-- previous status as 'open', including disputes that were under review. It now
+-- records the status the claim locked.
+
+CREATE OR REPLACE FUNCTION claim_dispute_resolutions(
+    p_user_id UUID,
+    p_items JSONB
+)
+RETURNS TABLE (
+    dispute_id UUID,
+    applied BOOLEAN,
+    dispute_version INTEGER,
+    milestone_version INTEGER,
+    escrow_version INTEGER
+) AS $$
+#variable_conflict use_column
+DECLARE
+    v_claimed UUID[];
+    v_previous_status JSONB;
+BEGIN
+    -- Lock every row whose version still matches, in a stable order to avoid
+    -- deadlocks with concurrent batches. Rows changed by someone else drop out,
+    -- as do later items for a milestone already in the batch.
+    SELECT COALESCE(array_agg(locked.dispute_id), '{}'),
+           COALESCE(jsonb_object_agg(locked.dispute_id, locked.status), '{}')
+    INTO v_claimed, v_previous_status
+    FROM (
+        SELECT i.dispute_id, d.status
+        FROM (
+            SELECT DISTINCT ON (r.milestone_id) r.*
+            FROM jsonb_to_recordset(p_items) AS r(
+                dispute_id UUID, dispute_version INTEGER,
+                milestone_id UUID, milestone_version INTEGER,
+                escrow_id UUID, escrow_version INTEGER
+            )
+            ORDER BY r.milestone_id, r.dispute_id
+        ) AS i
+        JOIN disputes d ON d.id = i.dispute_id AND d.version = i.dispute_version
+        JOIN milestones m ON m.id = i.milestone_id AND m.version = i.milestone_version
+        JOIN escrows e ON e.id = i.escrow_id AND e.version = i.escrow_version
+        WHERE d.status IN ('open', 'under_review')
+          AND d.milestone_id = m.id
+          AND e.milestone_id = m.id
+          AND m.status IN ('pending', 'in_progress', 'submitted', 'approved', 'disputed')
+          AND e.status = 'funded'
+        ORDER BY i.dispute_id
+        FOR UPDATE OF d, m, e
+    ) AS locked;
+
+    UPDATE disputes d
+    SET status = i.dispute_status,
+        resolution = i.resolution,
+        resolved_by = p_user_id,
+        resolved_at = NOW(),
+        admin_notes = COALESCE(i.admin_notes, d.admin_notes),
+        updated_at = NOW()
+    FROM jsonb_to_recordset(p_items) AS i(
+        dispute_id UUID, dispute_status TEXT, resolution TEXT, admin_notes TEXT
+    )
+    WHERE d.id = i.dispute_id
+      AND d.id = ANY(v_claimed);
+
+    UPDATE milestones m
+    SET status = i.milestone_to,
+        approved_at = CASE WHEN i.milestone_to = 'paid' THEN NOW() ELSE m.approved_at END,
+        updated_at = NOW()
+    FROM jsonb_to_recordset(p_items) AS i(dispute_id UUID, milestone_id UUID, milestone_to TEXT)
+    WHERE m.id = i.milestone_id
+      AND i.dispute_id = ANY(v_claimed);
+
+    INSERT INTO audit_events (event_type, user_id, project_id, milestone_id, escrow_id, dispute_id, data)
+    SELECT
+        'dispute_resolved',
+        p_user_id,
+        m.project_id,
+        i.milestone_id,
+        i.escrow_id,
+        i.dispute_id,
+        jsonb_build_object(
+            'resolution', i.resolution,
+            'admin_notes', i.admin_notes,
+            'previous_status', v_previous_status ->> i.dispute_id::TEXT,
+            'batch', TRUE
+        )
+    FROM jsonb_to_recordset(p_items) AS i(
+        dispute_id UUID, milestone_id UUID, escrow_id UUID, resolution TEXT, admin_notes TEXT
+    )
+    JOIN milestones m ON m.id = i.milestone_id
+    WHERE i.dispute_id = ANY(v_claimed);
+
+    PERFORM refresh_project_financials(project_id)
+    FROM (
+        SELECT DISTINCT m.project_id
+        FROM jsonb_to_recordset(p_items) AS i(dispute_id UUID, milestone_id UUID)
+        JOIN milestones m ON m.id = i.milestone_id
+        WHERE i.dispute_id = ANY(v_claimed)
+    ) AS touched;
+
+    RETURN QUERY
+    SELECT
+        i.dispute_id,
+        i.dispute_id = ANY(v_claimed),
+        d.version,
+        m.version,
+        e.version
+    FROM jsonb_to_recordset(p_items) AS i(dispute_id UUID, milestone_id UUID, escrow_id UUID)
+    LEFT JOIN disputes d ON d.id = i.dispute_id
+    LEFT JOIN milestones m ON m.id = i.milestone_id
+    LEFT JOIN escrows e ON e.id = i.escrow_id;
+END;
+$$ LANGUAGE plpgsql;
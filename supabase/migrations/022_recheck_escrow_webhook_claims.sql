@@ -0,0 +1,54 @@
+-- Recheck webhook claim eligibility against the locked row
+-- claim_escrow_webhook_events tested status, next_attempt_at and locked_at on
+-- the heads CTE, a snapshot taken before the row lock. When FOR UPDATE waits
+-- on a row another worker has just claimed or finished, EvalPlanQual only
+-- rechecks conditions on the locked table, so the stale snapshot let the row
+-- be claimed a second time. The predicate now reads the inbox row itself.
+--
+-- An event whose lease expired was also reclaimed however many attempts it
+-- had used, so an event that crashes or hangs the worker looped forever.
+-- Expired leases that have used up max_attempts are now dead-lettered.
+
+CREATE OR REPLACE FUNCTION claim_escrow_webhook_events(
+    p_worker TEXT,
+    p_limit INTEGER DEFAULT 20,
+    p_lease_seconds INTEGER DEFAULT 300
+)
+RETURNS SETOF escrow_webhook_inbox AS $$
+BEGIN
+    UPDATE escrow_webhook_inbox
+    SET status = 'dead',
+        locked_by = NULL,
+        locked_at = NULL,
+        last_error = 'Processing lease expired after ' || attempts || ' attempts'
+    WHERE status = 'processing'
+      AND locked_at < NOW() - make_interval(secs => p_lease_seconds)
+      AND attempts >= max_attempts;
+
+    RETURN QUERY
+    WITH heads AS (
+        SELECT DISTINCT ON (external_escrow_id) id
+        FROM escrow_webhook_inbox
+        WHERE status IN ('pending', 'processing')
+        ORDER BY external_escrow_id, received_at, id
+    ),
+    claimable AS (
+        SELECT i.id
+        FROM escrow_webhook_inbox i
+        JOIN heads h ON h.id = i.id
+        WHERE (i.status = 'pending' AND i.next_attempt_at <= NOW())
+           OR (i.status = 'processing' AND i.locked_at < NOW() - make_interval(secs => p_lease_seconds))
+        ORDER BY i.received_at
+        LIMIT p_limit
+        FOR UPDATE OF i SKIP LOCKED
+    )
+    UPDATE escrow_webhook_inbox i
+    SET status = 'processing',
+        attempts = i.attempts + 1,
+        locked_by = p_worker,
+        locked_at = NOW()
+    FROM claimable c
+    WHERE i.id = c.id
+    RETURNING i.*;
+END;
+$$ LANGUAGE plpgsql;
@@ -0,0 +1,45 @@
+-- Cap KYC processing attempts on expired leases
+-- A document whose worker died or hung mid-processing (e.g. an image that
+-- exhausts memory) was reclaimed every time its lease expired, with no limit.
+-- Expired leases that have used up p_max_attempts are now marked failed
+-- instead of being handed to another worker.
+
+DROP FUNCTION IF EXISTS claim_kyc_documents(TEXT, INTEGER, INTEGER);
+
+CREATE OR REPLACE FUNCTION claim_kyc_documents(
+    p_worker TEXT,
+    p_limit INTEGER DEFAULT 10,
+    p_lease_seconds INTEGER DEFAULT 300,
+    p_max_attempts INTEGER DEFAULT 3
+)
+RETURNS SETOF kyc_verifications AS $$
+BEGIN
+    UPDATE kyc_verifications
+    SET processing_status = 'failed',
+        processing_error = 'Processing lease expired after ' || processing_attempts || ' attempts',
+        locked_by = NULL,
+        locked_at = NULL
+    WHERE processing_status = 'processing'
+      AND locked_at < NOW() - make_interval(secs => p_lease_seconds)
+      AND processing_attempts >= p_max_attempts;
+
+    RETURN QUERY
+    WITH claimable AS (
+        SELECT id
+        FROM kyc_verifications
+        WHERE processing_status = 'pending'
+           OR (processing_status = 'processing' AND locked_at < NOW() - make_interval(secs => p_lease_seconds))
+        ORDER BY created_at
+        LIMIT p_limit
+        FOR UPDATE SKIP LOCKED
+    )
+    UPDATE kyc_verifications k
+    SET processing_status = 'processing',
+        processing_attempts = k.processing_attempts + 1,
+        locked_by = p_worker,
+        locked_at = NOW()
+    FROM claimable c
+    WHERE k.id = c.id
+    RETURNING k.*;
+END;
+$$ LANGUAGE plpgsql;
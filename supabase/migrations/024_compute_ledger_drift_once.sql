@@ -0,0 +1,91 @@
+-- Recompute the ledger once per drift check
+-- ledger_balance_drift(p_repair => TRUE) recomputed every balance from the
+-- ledger up to three times: for the comparison, for the repair upsert, and
+-- once more per drifted user (NOT EXISTS over compute_user_balances(user)) to
+-- find projections with no completed transactions left. The recomputed
+-- balances are now materialized once into a temp table that all three steps
+-- read, and the last one is a plain anti-join against it.
+--
+-- A repair also used to compute the totals before locking the balances it
+-- overwrote, so a ledger write committed in between was lost. It now locks
+-- the ledger against writes first.
+
+CREATE OR REPLACE FUNCTION ledger_balance_drift(p_repair BOOLEAN DEFAULT FALSE, p_limit INTEGER DEFAULT 100)
+RETURNS TABLE (
+    user_id UUID,
+    field TEXT,
+    projected DECIMAL,
+    actual DECIMAL
+) AS $$
+#variable_conflict use_column
+BEGIN
+    DROP TABLE IF EXISTS ledger_actual, ledger_drift;
+
+    -- A repair overwrites balances with the totals computed below, so no
+    -- ledger write may commit between computing them and writing them back:
+    -- its trigger delta would be lost. SHARE mode blocks ledger writes (they
+    -- queue behind the repair) but not readers, and is taken before the
+    -- totals are computed so they include everything already committed.
+    IF p_repair THEN
+        LOCK TABLE transactions IN SHARE MODE;
+    END IF;
+
+    CREATE TEMP TABLE ledger_actual ON COMMIT DROP AS
+    SELECT * FROM compute_user_balances();
+
+    CREATE TEMP TABLE ledger_drift ON COMMIT DROP AS
+    SELECT
+        COALESCE(a.user_id, b.user_id) AS user_id,
+        f.field,
+        f.projected,
+        f.actual
+    FROM ledger_actual a
+    FULL JOIN user_balances b ON b.user_id = a.user_id
+    CROSS JOIN LATERAL (VALUES
+        ('available', COALESCE(b.available, 0), COALESCE(a.available, 0)),
+        ('in_escrow', COALESCE(b.in_escrow, 0), COALESCE(a.in_escrow, 0)),
+        ('lifetime_earned', COALESCE(b.lifetime_earned, 0), COALESCE(a.lifetime_earned, 0)),
+        ('lifetime_funded', COALESCE(b.lifetime_funded, 0), COALESCE(a.lifetime_funded, 0)),
+        ('lifetime_spent', COALESCE(b.lifetime_spent, 0), COALESCE(a.lifetime_spent, 0)),
+        ('lifetime_refunded', COALESCE(b.lifetime_refunded, 0), COALESCE(a.lifetime_refunded, 0))
+    ) AS f(field, projected, actual)
+    WHERE f.projected <> f.actual;
+
+    IF p_repair THEN
+        -- Ledger writes are already blocked; this also keeps any other
+        -- balance writer out until the repair commits
+        PERFORM 1 FROM user_balances b
+        WHERE b.user_id IN (SELECT DISTINCT d.user_id FROM ledger_drift d)
+        ORDER BY b.user_id
+        FOR UPDATE;
+
+        INSERT INTO user_balances AS b (
+            user_id, available, in_escrow, lifetime_earned, lifetime_funded, lifetime_spent, lifetime_refunded, updated_at
+        )
+        SELECT a.user_id, a.available, a.in_escrow, a.lifetime_earned, a.lifetime_funded, a.lifetime_spent, a.lifetime_refunded, NOW()
+        FROM ledger_actual a
+        WHERE a.user_id IN (SELECT DISTINCT d.user_id FROM ledger_drift d)
+        ON CONFLICT (user_id) DO UPDATE SET
+            available = EXCLUDED.available,
+            in_escrow = EXCLUDED.in_escrow,
+            lifetime_earned = EXCLUDED.lifetime_earned,
+            lifetime_funded = EXCLUDED.lifetime_funded,
+            lifetime_spent = EXCLUDED.lifetime_spent,
+            lifetime_refunded = EXCLUDED.lifetime_refunded,
+            updated_at = EXCLUDED.updated_at;
+
+        -- Projections for users with no completed transactions left
+        UPDATE user_balances b
+        SET available = 0, in_escrow = 0, lifetime_earned = 0, lifetime_funded = 0,
+            lifetime_spent = 0, lifetime_refunded = 0, updated_at = NOW()
+        WHERE b.user_id IN (SELECT DISTINCT d.user_id FROM ledger_drift d)
+          AND NOT EXISTS (SELECT 1 FROM ledger_actual a WHERE a.user_id = b.user_id);
+    END IF;
+
+    RETURN QUERY
+    SELECT d.user_id, d.field, d.projected, d.actual
+    FROM ledger_drift d
+    ORDER BY abs(d.projected - d.actual) DESC
+    LIMIT p_limit;
+END;
+$$ LANGUAGE plpgsql;
@@ -0,0 +1,30 @@
+-- Zero financials row for every new project
+-- project_financials rows were only written by refresh_project_financials,
+-- which runs after milestone, escrow and dispute writes. A project with no
+-- milestones yet had no row, so list and detail views embedded
+-- financials: null for it. New projects now get an all-zero row in the same
+-- statement that creates them.
+
+CREATE OR REPLACE FUNCTION projects_create_financials()
+RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO project_financials (project_id)
+    SELECT id FROM inserted_projects
+    ON CONFLICT (project_id) DO NOTHING;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS projects_create_financials ON projects;
+CREATE TRIGGER projects_create_financials
+    AFTER INSERT ON projects
+    REFERENCING NEW TABLE AS inserted_projects
+    FOR EACH STATEMENT EXECUTE FUNCTION projects_create_financials();
+
+-- Projects created since the rollups were backfilled
+INSERT INTO project_financials (project_id)
+SELECT p.id
+FROM projects p
+WHERE NOT EXISTS (SELECT 1 FROM project_financials f WHERE f.project_id = p.id)
+ON CONFLICT (project_id) DO NOTHING;
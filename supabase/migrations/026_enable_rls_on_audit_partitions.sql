@@ -0,0 +1,65 @@
+-- Row-level security on audit_events partitions
+-- RLS on a partitioned table only applies to queries against the parent.
+-- audit_events_default and the monthly partitions had none, and Supabase
+-- grants public tables to anon and authenticated, so the audit log could be
+-- read through PostgREST by naming a partition. Every existing partition gets
+-- RLS (with no policies, so only the service role reads them), and
+-- create_audit_event_partition enables it on each partition it creates.
+
+-- Create the partition for the month containing p_month, moving any rows for
+-- that month out of the default partition. Returns the partition name, or NULL
+-- if it already existed.
+CREATE OR REPLACE FUNCTION create_audit_event_partition(p_month DATE)
+RETURNS TEXT AS $$
+DECLARE
+    v_start DATE := date_trunc('month', p_month)::date;
+    v_end DATE := (date_trunc('month', p_month) + INTERVAL '1 month')::date;
+    v_name TEXT := 'audit_events_p' || to_char(p_month, 'YYYYMM');
+    v_from TIMESTAMP WITH TIME ZONE := v_start::timestamp AT TIME ZONE 'UTC';
+    v_to TIMESTAMP WITH TIME ZONE := v_end::timestamp AT TIME ZONE 'UTC';
+BEGIN
+    IF to_regclass(v_name) IS NOT NULL THEN
+        RETURN NULL;
+    END IF;
+
+    -- Serialize with concurrent callers creating the same month
+    PERFORM pg_advisory_xact_lock(hashtext(v_name));
+    IF to_regclass(v_name) IS NOT NULL THEN
+        RETURN NULL;
+    END IF;
+
+    EXECUTE format('CREATE TABLE %I (LIKE audit_events INCLUDING DEFAULTS INCLUDING CONSTRAINTS)', v_name);
+    -- The parent's row-level security does not cover queries that name the
+    -- partition directly
+    EXECUTE format('ALTER TABLE %I ENABLE ROW LEVEL SECURITY', v_name);
+
+    -- Statement triggers on audit_events don't fire for statements on its
+    -- partitions, so the daily counts are unaffected by the move
+    EXECUTE format(
+        'WITH moved AS (DELETE FROM audit_events_default WHERE created_at >= %L AND created_at < %L RETURNING *)
+         INSERT INTO %I SELECT * FROM moved',
+        v_from, v_to, v_name
+    );
+
+    EXECUTE format('ALTER TABLE %I ADD CONSTRAINT %I CHECK (created_at >= %L AND created_at < %L)',
+        v_name, v_name || '_range', v_from, v_to);
+    EXECUTE format('ALTER TABLE audit_events ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)',
+        v_name, v_from, v_to);
+    -- Only needed to let ATTACH skip its validation scan
+    EXECUTE format('ALTER TABLE %I DROP CONSTRAINT %I', v_name, v_name || '_range');
+
+    RETURN v_name;
+END;
+$$ LANGUAGE plpgsql;
+
+DO $$
+DECLARE
+    v_partition REGCLASS;
+BEGIN
+    FOR v_partition IN
+        SELECT inhrelid::regclass FROM pg_inherits WHERE inhparent = 'audit_events'::regclass
+    LOOP
+        EXECUTE format('ALTER TABLE %s ENABLE ROW LEVEL SECURITY', v_partition);
+    END LOOP;
+END;
+$$;